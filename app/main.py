@@ -1,4 +1,5 @@
 import sys, os
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
 
 # 直接加载基于 .ui 的主窗口
@@ -14,4 +15,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # 转码进程池在打包（PyInstaller）后需要该调用才能正常派生子进程
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,122 @@
+"""对接本地镜像的最小客户端，接口与 AlbumDownloader 使用的 jmcomic 客户端一致。
+
+专辑 → 章节 → 图片的对象属性与 jmcomic 相同（album_id/name/page_count、photo_id/album_index、
+filename/index/download_url），这样基准测试走的是真实的下载引擎：重试、主机限速、进度、清单、转码全部参与。
+"""
+import http.client
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+
+class HttpStatusError(Exception):
+    """非 200 响应；带 response（status_code/headers），供重试策略与主机限速识别 429/5xx"""
+
+    def __init__(self, status: int, headers: Dict[str, str]):
+        super().__init__(f"HTTP {status}")
+        self.response = type('Response', (), {'status_code': status, 'headers': headers})()
+
+
+class _Image:
+    def __init__(self, base_url: str, photo_id: str, index: int, filename: str):
+        self.index = index
+        self.filename = filename
+        self.download_url = f"{base_url}/media/photos/{photo_id}/{filename}"
+        self.img_url = self.download_url
+
+
+class _Photo:
+    def __init__(self, data: Dict):
+        self.photo_id = data['photo_id']
+        self.album_index = data['album_index']
+        self.name = data.get('name', '')
+        self.images: List[_Image] = []
+
+    def __iter__(self):
+        return iter(self.images)
+
+    def __len__(self):
+        return len(self.images)
+
+
+class _Album:
+    def __init__(self, data: Dict):
+        self.album_id = data['album_id']
+        self.name = data['name']
+        self.page_count = data.get('page_count', 0)
+        self.photos = [_Photo(p) for p in data['photos']]
+
+    def __iter__(self):
+        return iter(self.photos)
+
+    def __len__(self):
+        return len(self.photos)
+
+
+class BenchClient:
+    """每个线程一条保持连接的 HTTPConnection；成功的图片请求记录耗时，用于统计分位数"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0, latencies: List[float] = None):
+        self.base_url = base_url.rstrip('/')
+        parts = urlsplit(self.base_url)
+        self.host, self.port = parts.hostname, parts.port
+        self.timeout = timeout
+        self.latencies = latencies if latencies is not None else []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _get(self, path: str) -> bytes:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request('GET', path)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+        if resp.status != 200:
+            raise HttpStatusError(resp.status, dict(resp.getheaders()))
+        return body
+
+    def get_album_detail(self, album_id) -> _Album:
+        return _Album(json.loads(self._get(f"/api/album/{album_id}")))
+
+    def check_photo(self, photo: _Photo) -> None:
+        data = json.loads(self._get(f"/api/photo/{photo.photo_id}"))
+        photo.images = [_Image(self.base_url, photo.photo_id, i, name)
+                        for i, name in enumerate(data['images'], 1)]
+
+    def download_by_image_detail(self, image: _Image, path: str, decode_image: bool = False) -> None:
+        start = time.perf_counter()
+        body = self._get(urlsplit(image.download_url).path)
+        tmp = f"{path}.part"
+        with open(tmp, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, path)
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+
+    def search(self, keyword: str, page: int = 1) -> bytes:
+        from urllib.parse import quote_plus
+        return self._get(f"/search/photos?search_query={quote_plus(keyword)}&page={page}")
+
+
+class BenchOption:
+    """代替 JmOption：build_jm_client() 返回共享同一延迟记录的客户端"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.latencies: List[float] = []
+
+    def build_jm_client(self) -> BenchClient:
+        return BenchClient(self.base_url, self.timeout, self.latencies)
+
+    def decide_download_image_decode(self, _image) -> bool:
+        return False
@@ -0,0 +1,220 @@
+"""本地镜像替身：用合成数据模拟搜索页、封面、专辑/章节接口与图片，供离线基准测试使用。
+
+可配置延迟、带宽、错误率与 429 限流注入，所有随机数据由 seed 决定，同一配置多次运行结果可比。
+"""
+import html
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+
+@dataclass
+class MirrorConfig:
+    albums: int = 8
+    chapters: int = 4
+    images: int = 20  # 每章图片数
+    image_kb: int = 300
+    latency_ms: float = 30.0  # 每个请求的首字节延迟
+    bandwidth_mbps: float = 0.0  # 每个连接的带宽上限（Mbit/s），0 为不限
+    error_rate: float = 0.0  # 返回 500 的概率
+    throttle_rate: float = 0.0  # 返回 429 的概率
+    retry_after: float = 1.0  # 429 响应的 Retry-After 秒数
+    results_per_page: int = 20
+    seed: int = 1
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def synthetic_jpeg(size: int, seed: int) -> bytes:
+    """指定大小的“JPEG”：带 SOI/APP0 头与 EOI 尾，中间为确定性填充（不可解码，仅用于传输）"""
+    head = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+    tail = b'\xff\xd9'
+    n = max(0, size - len(head) - len(tail))
+    body = random.Random(seed).getrandbits(n * 8).to_bytes(n, 'little') if n else b''
+    return head + body + tail
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # 保持连接，与真实站点一致
+    disable_nagle_algorithm = True  # 头与正文分两次写出，避免小响应被 Nagle + 延迟 ACK 拖慢 40ms
+    server: '_Server'
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        cfg = self.server.config
+        stats = self.server.stats
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        if cfg.latency_ms:
+            time.sleep(cfg.latency_ms / 1000.0)
+        rnd = self.server.rng()
+        if rnd < cfg.throttle_rate:
+            stats.bump('throttled')
+            return self._send(429, b'Too Many Requests', 'text/plain', {'Retry-After': f"{cfg.retry_after:g}"})
+        if rnd < cfg.throttle_rate + cfg.error_rate:
+            stats.bump('errors')
+            return self._send(500, b'Internal Server Error', 'text/plain')
+        try:
+            if parts[:2] == ['search', 'photos']:
+                q = parse_qs(url.query)
+                page = int((q.get('page') or ['1'])[0])
+                return self._send(200, self.server.search_page(q.get('search_query', [''])[0], page),
+                                  'text/html; charset=utf-8', kind='search')
+            if parts[:2] == ['api', 'album'] and len(parts) == 3:
+                return self._send(200, json.dumps(self.server.album(int(parts[2]))).encode(), 'application/json')
+            if parts[:2] == ['api', 'photo'] and len(parts) == 3:
+                return self._send(200, json.dumps(self.server.photo(int(parts[2]))).encode(), 'application/json')
+            if parts[:2] == ['media', 'albums'] and len(parts) == 3:
+                return self._send(200, self.server.image_bytes(16 * 1024), 'image/jpeg', kind='cover')
+            if parts[:2] == ['media', 'photos'] and len(parts) == 4:
+                return self._send(200, self.server.image_bytes(cfg.image_kb * 1024), 'image/jpeg', kind='image')
+        except (KeyError, ValueError):
+            pass
+        self._send(404, b'Not Found', 'text/plain')
+
+    def _send(self, status: int, body: bytes, ctype: str, headers: Optional[Dict] = None, kind: str = ''):
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        bw = self.server.config.bandwidth_mbps
+        try:
+            if bw > 0:
+                # 按带宽分块写出，模拟慢速链路
+                chunk = 16 * 1024
+                per_chunk = chunk * 8 / (bw * 1_000_000)
+                for i in range(0, len(body), chunk):
+                    self.wfile.write(body[i:i + chunk])
+                    time.sleep(per_chunk)
+            else:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        self.server.stats.bump('requests')
+        if kind:
+            self.server.stats.bump(kind)
+            self.server.stats.bump('bytes', len(body))
+
+
+class _Stats:
+    def __init__(self):
+        self.data: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.data[key] = self.data.get(key, 0) + n
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.data)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, config: MirrorConfig):
+        super().__init__(addr, _Handler)
+        self.config = config
+        self.stats = _Stats()
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        self._images: Dict[int, bytes] = {}
+
+    def rng(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def image_bytes(self, size: int) -> bytes:
+        data = self._images.get(size)
+        if data is None:
+            data = self._images[size] = synthetic_jpeg(size, self.config.seed + size)
+        return data
+
+    # 专辑 ID 从 100001 起连续编号，章节 ID = 专辑 ID * 100 + 章节序号
+    def album(self, album_id: int) -> Dict:
+        n = album_id - 100000
+        if not 1 <= n <= self.config.albums:
+            raise KeyError(album_id)
+        return {
+            'album_id': str(album_id),
+            'name': f"Bench Album {n}",
+            'page_count': self.config.chapters * self.config.images,
+            'photos': [{'photo_id': str(album_id * 100 + i), 'album_index': i, 'name': f"第{i}话"}
+                       for i in range(1, self.config.chapters + 1)],
+        }
+
+    def photo(self, photo_id: int) -> Dict:
+        album_id, index = divmod(photo_id, 100)
+        self.album(album_id)
+        return {'photo_id': str(photo_id), 'album_index': index,
+                'images': [f"{i:05d}.jpg" for i in range(1, self.config.images + 1)]}
+
+    def search_page(self, keyword: str, page: int) -> bytes:
+        # 结构仿照站点搜索页卡片：缩略图链接、标题链接、作者链接、标签与评分
+        per = self.config.results_per_page
+        keyword = html.escape(keyword)
+        cards = []
+        for i in range(per):
+            aid = 200000 + (page - 1) * per + i
+            cards.append(
+                f'<div class="col-xs-6 col-sm-4 col-md-3 list-col"><div class="thumb-overlay-albums">'
+                f'<a href="/album/{aid}/" title="{keyword} 第{aid}本"><img class="lazy_img" '
+                f'data-original="/media/albums/{aid}_3x4.jpg" src="/static/blank.jpg"></a></div>'
+                f'<div class="video-title title-truncate">{keyword} 第{aid}本</div>'
+                f'<div class="title-truncate"><a href="/search/photos?main_tag=2&amp;search_query=author{i}">author{i}</a></div>'
+                f'<div class="tags"><a class="tag" href="/search/photos?search_query=t1">标签{i % 5}</a>'
+                f'<a class="tag" href="/search/photos?search_query=t2">全彩</a></div>'
+                f'<span class="label-score">{(i % 10) / 2 + 5:.1f}</span></div>'
+            )
+        page_html = ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>search</title></head><body>'
+                '<div class="row">' + ''.join(cards) + '</div>'
+                f'<ul class="pagination"><li><a href="/search/photos?search_query={quote_plus(keyword)}'
+                f'&amp;page={page + 1}">下一页</a></li></ul></body></html>')
+        return page_html.encode('utf-8')
+
+
+class MirrorServer:
+    """在后台线程运行的本地镜像：with MirrorServer(cfg) as srv: srv.base_url"""
+
+    def __init__(self, config: Optional[MirrorConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MirrorConfig()
+        self._server = _Server((host, port), self.config)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._server.stats.snapshot()
+
+    def album_ids(self):
+        return [str(100000 + n) for n in range(1, self.config.albums + 1)]
+
+    def start(self) -> 'MirrorServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='bench-mirror', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.stop()
@@ -0,0 +1,107 @@
+"""搜索结果页解析微基准：用保存的 HTML 样本对比各解析引擎的正确性与单页耗时。
+
+    python -m bench.parse_bench                       # 全部样本、全部可用引擎
+    python -m bench.parse_bench --rounds 500 --min-speedup 5
+    python -m bench.parse_bench --engines fast        # 未安装 bs4 时只校验 fast 的输出
+    python -m bench.parse_bench --update              # 用 bs4 参考实现重新生成期望结果
+
+样本位于 bench/fixtures/search/*.html，期望结果为同名 .json（bs4 实现的输出）。
+任一引擎输出与期望不一致，或 fast 相对 bs4 的加速比低于 --min-speedup 时退出码为 1。
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from bench.run_bench import percentile
+from core.search_parser import ENGINES, FALLBACK_ENGINE
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures' / 'search'
+BASE_URL = 'https://18comic.vip'
+
+
+def load_fixtures(names: List[str] = None) -> Dict[str, str]:
+    fixtures = {}
+    for path in sorted(FIXTURES_DIR.glob('*.html')):
+        if names and path.stem not in names:
+            continue
+        fixtures[path.stem] = path.read_text(encoding='utf-8')
+    return fixtures
+
+
+def time_engine(parser, html: str, rounds: int) -> List[float]:
+    parser(html, BASE_URL)  # 预热（正则编译、导入等）
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        parser(html, BASE_URL)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run(args) -> Dict:
+    engines = [e for e in (args.engines.split(',') if args.engines else sorted(ENGINES)) if e in ENGINES]
+    report = {'engines': engines, 'rounds': args.rounds, 'fixtures': {}}
+    ok = True
+    for name, html in load_fixtures(args.fixture).items():
+        expected_path = FIXTURES_DIR / f"{name}.json"
+        expected = json.loads(expected_path.read_text(encoding='utf-8')) if expected_path.exists() else None
+        entry = {'bytes': len(html.encode('utf-8')), 'engines': {}}
+        for engine in engines:
+            parser = ENGINES[engine]
+            items = parser(html, BASE_URL)
+            durations = time_engine(parser, html, args.rounds)
+            match = expected is None or items == expected
+            ok = ok and match
+            entry['engines'][engine] = {
+                'results': len(items),
+                'matches_expected': match if expected is not None else None,
+                'p50_ms': round(percentile(durations, 50) * 1000, 3),
+                'p99_ms': round(percentile(durations, 99) * 1000, 3),
+            }
+        timing = entry['engines']
+        if 'fast' in timing and FALLBACK_ENGINE in timing and timing['fast']['p50_ms']:
+            entry['speedup'] = round(timing[FALLBACK_ENGINE]['p50_ms'] / timing['fast']['p50_ms'], 1)
+            if args.min_speedup and entry['speedup'] < args.min_speedup:
+                ok = False
+        report['fixtures'][name] = entry
+    report['ok'] = ok
+    return report
+
+
+def update_expected(names: List[str] = None) -> int:
+    if FALLBACK_ENGINE not in ENGINES:
+        print("需要安装 beautifulsoup4 才能生成期望结果", file=sys.stderr)
+        return 1
+    for name, html in load_fixtures(names).items():
+        items = ENGINES[FALLBACK_ENGINE](html, BASE_URL)
+        out = FIXTURES_DIR / f"{name}.json"
+        out.write_text(json.dumps(items, ensure_ascii=False, indent=1) + '\n', encoding='utf-8')
+        print(f"{out.name}: {len(items)} 条", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='python -m bench.parse_bench', description="搜索结果页解析微基准")
+    p.add_argument('--rounds', type=int, default=200, help="每个样本、每个引擎的解析次数")
+    p.add_argument('--engines', help="逗号分隔的引擎名（默认全部可用引擎）")
+    p.add_argument('--fixture', action='append', help="只跑指定样本（文件名去掉 .html），可重复")
+    p.add_argument('--min-speedup', type=float, default=3.0,
+                   help="fast 相对 bs4 的最低加速比（0 为不检查；未安装 bs4 时不检查）")
+    p.add_argument('--update', action='store_true', help="用 bs4 实现重新生成期望结果后退出")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.update:
+        return update_expected(args.fixture)
+    report = run(args)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""离线下载/搜索基准测试：启动本地镜像替身，用真实下载引擎批量下载合成专辑并记录指标。
+
+    python -m bench.run_bench                        # 默认场景
+    python -m bench.run_bench --scenario throttled --jobs 4
+    python -m bench.run_bench --compare bench/results/a.json bench/results/b.json
+
+结果写入 bench/results/<时间>_<场景>.json（albums/min、MB/s、单图耗时 p50/p99、峰值 RSS 等），
+不同版本的结果文件可用 --compare 对比，便于发现性能回退。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bench.bench_client import BenchClient, BenchOption
+from bench.mirror_server import MirrorConfig, MirrorServer
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+SCENARIOS = {
+    # 低延迟、无错误：衡量引擎自身开销
+    'baseline': dict(latency_ms=10, error_rate=0.0, throttle_rate=0.0),
+    # 典型跨境链路：较高延迟与单连接带宽上限
+    'wan': dict(latency_ms=120, bandwidth_mbps=40),
+    # 不稳定镜像：5% 服务端错误
+    'lossy': dict(latency_ms=60, error_rate=0.05),
+    # 限流镜像：3% 请求返回 429 + Retry-After
+    'throttled': dict(latency_ms=40, throttle_rate=0.03, retry_after=0.5),
+}
+
+# 各场景的主机限速参数（见 core.rate_limit.HostThrottle）。显式设置并写入结果文件，
+# 不随应用默认值（8 次/秒/主机）变化，不同版本的结果才可比较
+LIMITS = {
+    # 限速器不成为瓶颈：只衡量引擎自身开销
+    'baseline': dict(rate=200.0, burst=200.0, concurrency=16.0, max_rate=200.0),
+    # 其余场景与应用默认一致，衡量真实设置下的表现
+    'wan': dict(rate=8.0, burst=16.0, concurrency=4.0, max_rate=32.0),
+    'lossy': dict(rate=8.0, burst=16.0, concurrency=4.0, max_rate=32.0),
+    'throttled': dict(rate=8.0, burst=16.0, concurrency=4.0, max_rate=32.0),
+}
+
+# 与 RESULTS 比较时“越大越好”的指标，其余视为越小越好
+HIGHER_IS_BETTER = {'albums_per_min', 'mb_per_s', 'images_per_s', 'searches_per_s'}
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """进程峰值常驻内存（MB）；Linux 的 ru_maxrss 单位为 KB，macOS 为字节"""
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024.0 * 1024.0) if sys.platform == 'darwin' else rss / 1024.0
+    except Exception:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024.0 * 1024.0)
+    except Exception:
+        return None
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).resolve().parent,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip()
+    except Exception:
+        return ''
+
+
+def bench_downloads(server: MirrorServer, jobs: int, output: str, image_format: str, save_dir: str) -> Dict:
+    from core.album_downloader import AlbumDownloader
+    from core.retry import RetryPolicy
+    from core.transcoder import Transcoder
+
+    option = BenchOption(server.base_url)
+    results = []
+
+    def run_one(album_id: str):
+        engine = AlbumDownloader(album_id, option, save_dir, resume=False, retry=RetryPolicy(5),
+                                 transcoder=Transcoder(image_format), output=output)
+        ok, _msg = engine.run()
+        results.append((ok, engine.progress.bytes_done, engine.images_done, engine.images_retried))
+
+    ids = server.album_ids()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        list(pool.map(run_one, ids))
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(r[1] for r in results)
+    images = sum(r[2] for r in results)
+    lat = option.latencies
+    return {
+        'albums': len(ids),
+        'albums_ok': sum(1 for r in results if r[0]),
+        'images': images,
+        'retries': sum(r[3] for r in results),
+        'bytes': total_bytes,
+        'elapsed_s': round(elapsed, 3),
+        'albums_per_min': round(len(ids) / elapsed * 60, 2) if elapsed else 0.0,
+        'mb_per_s': round(total_bytes / elapsed / (1024 * 1024), 3) if elapsed else 0.0,
+        'images_per_s': round(images / elapsed, 2) if elapsed else 0.0,
+        'image_latency_p50_ms': round(percentile(lat, 50) * 1000, 2) if lat else None,
+        'image_latency_p99_ms': round(percentile(lat, 99) * 1000, 2) if lat else None,
+    }
+
+
+def bench_search(server: MirrorServer, rounds: int) -> Dict:
+    """优先走 SearchWorker 的抓取与解析（需要 PyQt5 与 cloudscraper/requests），否则只测原始请求"""
+    durations = []
+    mode = 'raw'
+    try:
+        from core.search_worker import SCRAPER_AVAILABLE, SearchWorker
+        if not SCRAPER_AVAILABLE:
+            raise ImportError('cloudscraper/requests')
+        mode = 'search_worker'
+    except Exception:
+        SearchWorker = None
+    client = BenchClient(server.base_url)
+    count = 0
+    for i in range(rounds):
+        start = time.perf_counter()
+        if SearchWorker is not None:
+            worker = SearchWorker('bench', i + 1, mirrors=[server.base_url])
+            count += len(worker._scrape_search('bench', i + 1))
+        else:
+            client.search('bench', i + 1)
+        durations.append(time.perf_counter() - start)
+    total = sum(durations)
+    return {
+        'mode': mode,
+        'rounds': rounds,
+        'results': count,
+        'searches_per_s': round(rounds / total, 2) if total else 0.0,
+        'search_p50_ms': round(percentile(durations, 50) * 1000, 2) if durations else None,
+        'search_p99_ms': round(percentile(durations, 99) * 1000, 2) if durations else None,
+    }
+
+
+def run(args) -> Dict:
+    cfg = MirrorConfig(albums=args.albums, chapters=args.chapters, images=args.images, image_kb=args.image_kb,
+                       seed=args.seed, **SCENARIOS[args.scenario])
+    for key in ('latency_ms', 'bandwidth_mbps', 'error_rate', 'throttle_rate'):
+        value = getattr(args, key)
+        if value is not None:
+            setattr(cfg, key, value)
+    limits = dict(LIMITS[args.scenario])
+    if args.limiter_rate is not None:
+        limits['rate'] = args.limiter_rate
+        limits['max_rate'] = max(limits['max_rate'], args.limiter_rate)
+    from core.rate_limit import limiter
+    limiter.configure(**limits)
+    # 镜像健康统计只留在内存，不写入用户的 mirrors.json
+    from core.mirror_health import mirror_health
+    mirror_health.configure(None)
+    save_dir = tempfile.mkdtemp(prefix='jm_bench_')
+    try:
+        with MirrorServer(cfg) as server:
+            download = bench_downloads(server, args.jobs, args.output, args.image_format, save_dir)
+            search = bench_search(server, args.search_rounds) if args.search_rounds else None
+            served = server.stats
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+    from core.http_pool import http_pool
+    return {
+        'scenario': args.scenario,
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': dict(cfg.to_dict(), jobs=args.jobs, output=args.output, image_format=args.image_format,
+                       limiter=limits),
+        'download': download,
+        'search': search,
+        'server': served,
+        'limiter': limiter.stats(),
+        'http_pool': http_pool.stats(),
+        'mirrors': mirror_health.stats(),
+        'peak_rss_mb': round(peak_rss_mb() or 0, 1) or None,
+    }
+
+
+def flatten(result: Dict) -> Dict[str, float]:
+    flat = {}
+    for section in ('download', 'search'):
+        for k, v in (result.get(section) or {}).items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                flat[k] = v
+    if result.get('peak_rss_mb') is not None:
+        flat['peak_rss_mb'] = result['peak_rss_mb']
+    return flat
+
+
+def compare(old_path: str, new_path: str, threshold: float = 0.1) -> int:
+    """逐项对比两个结果文件；任一指标变差超过 threshold（默认 10%）时返回 1"""
+    old = flatten(json.loads(Path(old_path).read_text(encoding='utf-8')))
+    new = flatten(json.loads(Path(new_path).read_text(encoding='utf-8')))
+    regressed = False
+    for key in sorted(set(old) & set(new)):
+        a, b = old[key], new[key]
+        change = (b - a) / a if a else 0.0
+        worse = change < -threshold if key in HIGHER_IS_BETTER else change > threshold
+        if key in ('albums', 'images', 'bytes', 'rounds', 'results', 'albums_ok'):
+            worse = False
+        regressed = regressed or worse
+        print(f"{key:24s} {a:>12g} -> {b:>12g}  {change:+7.1%}{'  <-- 回退' if worse else ''}")
+    return 1 if regressed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='python -m bench.run_bench', description="离线下载/搜索基准测试")
+    p.add_argument('--scenario', choices=sorted(SCENARIOS), default='baseline')
+    p.add_argument('--albums', type=int, default=8)
+    p.add_argument('--chapters', type=int, default=4)
+    p.add_argument('--images', type=int, default=20, help="每章图片数")
+    p.add_argument('--image-kb', type=int, default=300)
+    p.add_argument('--jobs', type=int, default=3, help="同时下载的专辑数")
+    p.add_argument('--output', choices=('folder', 'cbz'), default='folder')
+    p.add_argument('--image-format', default='原始格式', help="转码格式（JPG/PNG/WEBP/AVIF），默认不转码")
+    p.add_argument('--latency-ms', type=float)
+    p.add_argument('--bandwidth-mbps', type=float)
+    p.add_argument('--error-rate', type=float)
+    p.add_argument('--throttle-rate', type=float)
+    p.add_argument('--limiter-rate', type=float, help="覆盖场景的限速器初始速率（次/秒/主机）")
+    p.add_argument('--search-rounds', type=int, default=20)
+    p.add_argument('--seed', type=int, default=1)
+    p.add_argument('--out', help="结果文件路径（默认 bench/results/<时间>_<场景>.json）")
+    p.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="对比两个结果文件后退出")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.compare:
+        return compare(*args.compare)
+    result = run(args)
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{time.strftime('%Y%m%d_%H%M%S')}_{args.scenario}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"结果已写入 {out}", file=sys.stderr)
+    return 0 if result['download']['albums_ok'] == result['download']['albums'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
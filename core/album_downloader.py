@@ -0,0 +1,511 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from core.album_manifest import AlbumManifest
+from core.cbz_writer import CBZ_SUFFIX, CbzWriter
+from core.cancellation import CancelToken, DownloadCancelled
+from core.dedupe_store import ContentStore
+from core.image_verify import verify_image
+from core.jm_option import call_api
+from core.mirror_health import mirror_health
+from core.progress import ProgressTracker, format_bytes
+from core.rate_limit import limiter
+from core.retry import RetryPolicy, TransientError, status_of
+from core.transcoder import Transcoder, needs_transcode, shared_pool
+
+try:
+    import jmcomic
+    JM_AVAILABLE = True
+except Exception:
+    jmcomic = None
+    JM_AVAILABLE = False
+
+
+_INVALID_CHARS = re.compile(r'[\\/:*?"<>|\r\n\t]')
+
+
+def safe_dirname(name: str, fallback: str = '') -> str:
+    name = _INVALID_CHARS.sub('_', str(name or '')).strip().rstrip('.')
+    return name[:120] or fallback
+
+
+def album_dir_for(save_path, album) -> Path:
+    # 根目录 / 专辑标题 / 章节序号 /
+    return Path(save_path) / safe_dirname(getattr(album, 'name', ''), str(getattr(album, 'album_id', '')))
+
+
+def image_key(photo, image) -> str:
+    return f"{photo.photo_id}/{image.filename}"
+
+
+def image_path_for(album_dir: Path, photo, image) -> Path:
+    return album_dir / str(photo.album_index) / image.filename
+
+
+OUTPUT_FOLDER = 'folder'
+OUTPUT_CBZ = 'cbz'
+
+
+class _FolderSink:
+    """散图输出：图片直接落在 专辑目录/章节序号/，专辑清单记录每张图片。
+
+    每章下载完后统一校验完整性，结果写入清单；整本校验通过后在清单元数据中标记，
+    之后续传只比对文件大小，不再重新读取整本专辑。
+    """
+    kind = OUTPUT_FOLDER
+    commit_before_transcode = True
+    verify_after_chapter = True
+
+    def __init__(self, album_dir: Path, album_id: str, store: Optional[ContentStore] = None):
+        self.album_dir = album_dir
+        self.library_path = album_dir
+        self.manifest = AlbumManifest(album_dir, album_id)
+        self.store = store
+
+    def open(self, resume: bool) -> None:
+        self.manifest.load()
+        self.manifest.open()
+
+    def close(self, complete: bool) -> None:
+        self.manifest.close()
+
+    def meta(self, **fields) -> None:
+        self.manifest.update_meta(**fields)
+
+    def prepare_chapter(self, photo) -> None:
+        (self.album_dir / str(photo.album_index)).mkdir(parents=True, exist_ok=True)
+
+    def target_path(self, photo, image) -> Path:
+        return image_path_for(self.album_dir, photo, image)
+
+    def existing(self, key: str, photo, image) -> Optional[Path]:
+        path = self.target_path(photo, image)
+        deep = not self.manifest.meta.get('verified')
+        if self.manifest.is_verified(key, path, deep=deep):
+            return self.manifest.file_of(key, path)
+        return None
+
+    def commit(self, key: str, path, photo, image, **extra) -> int:
+        rec = self.manifest.record(key, path, 'done', photo=photo.photo_id, index=image.index, **extra)
+        return rec.get('size', 0)
+
+    def file_of(self, key: str) -> Optional[Path]:
+        return self.manifest.file_of(key)
+
+    def needs_verify(self, key: str) -> bool:
+        rec = self.manifest.get(key)
+        return not (rec and rec.get('verified'))
+
+    def mark_verified(self, key: str) -> None:
+        self.manifest.update(key, verified=True)
+
+    def fail(self, key: str, path, error: Exception) -> None:
+        self.manifest.record(key, path, 'failed', error=str(error))
+
+    def finalize(self, key: str) -> int:
+        # 最终文件（转码后）登记到内容仓库，复用清单里的 sha1，不再重复哈希
+        rec = self.manifest.get(key)
+        if self.store is None or not rec or not rec.get('sha1'):
+            return 0
+        return self.store.link_in(self.manifest.file_of(key), rec['sha1'])
+
+
+class _CbzSink:
+    """CBZ 输出：每张图片下载（及转码）后立即存入 专辑标题.cbz，不保留散图。
+
+    jmcomic 的解码需要落地文件，图片先写入暂存目录，入包后即删除；
+    归档内已有的条目就是续传依据，不再单独写清单。
+    """
+    kind = OUTPUT_CBZ
+    commit_before_transcode = False
+    verify_after_chapter = False  # 暂存文件入包前逐张校验，损坏的直接重试，不会写进归档
+
+    def __init__(self, save_path, album_dir: Path, album_id: str):
+        self.writer = CbzWriter(album_dir.with_name(album_dir.name + CBZ_SUFFIX), album_id)
+        self.staging = Path(save_path) / '.jm_staging' / str(album_id)
+
+    def open(self, resume: bool) -> None:
+        self.staging.mkdir(parents=True, exist_ok=True)
+        self.writer.open(resume)
+
+    def close(self, complete: bool) -> None:
+        self.writer.close(complete)
+        try:
+            for f in self.staging.iterdir():
+                f.unlink()
+            self.staging.rmdir()
+            self.staging.parent.rmdir()
+        except OSError:
+            pass
+
+    @property
+    def library_path(self) -> Path:
+        return self.writer.path if self.writer.path.exists() else self.writer.part
+
+    def meta(self, **fields) -> None:
+        pass
+
+    def prepare_chapter(self, photo) -> None:
+        pass
+
+    @staticmethod
+    def arcname(photo, name: str) -> str:
+        return f"{photo.album_index}/{name}"
+
+    def target_path(self, photo, image) -> Path:
+        return self.staging / f"{photo.album_index}_{image.filename}"
+
+    def existing(self, key: str, photo, image) -> Optional[Path]:
+        stem = self.arcname(photo, os.path.splitext(image.filename)[0])
+        return self.writer.path if self.writer.has_stem(stem) else None
+
+    def commit(self, key: str, path, photo, image, **extra) -> int:
+        name = self.arcname(photo, os.path.splitext(image.filename)[0] + Path(path).suffix)
+        return self.writer.add_file(path, name)
+
+    def fail(self, key: str, path, error: Exception) -> None:
+        pass
+
+    def finalize(self, key: str) -> int:
+        return 0
+
+
+class AlbumDownloader:
+    """与 Qt 无关的单专辑下载流程：专辑 → 章节 → 图片。
+
+    逐图下载并写入专辑清单（CBZ 模式下直接写入归档）；resume=True 时跳过已校验的图片，只补下缺失或损坏的部分。
+    章节在 chapter_workers 个线程中并行展开，图片共享同一个 image_workers 线程池，
+    大专辑可以占满带宽；单个章节失败不影响其他章节。
+    章节与图片之间检查 token，支持协作式取消与暂停。
+    网络请求按 retry 策略逐个重试：单张图片的临时失败只重试这一张，不会让整本专辑重来。
+    传入 index（LibraryIndex）时，每次运行结束都把专辑登记为库中条目（含是否完整）。
+    """
+
+    def __init__(self, album_id: str, option, save_path: str, resume: bool = True,
+                 image_workers: int = 8, on_status: Optional[Callable[[str], None]] = None,
+                 token: Optional[CancelToken] = None,
+                 on_progress: Optional[Callable[[Dict], None]] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 transcoder: Optional[Transcoder] = None,
+                 output: str = OUTPUT_FOLDER, dedupe: bool = False, chapter_workers: int = 3,
+                 verify_decode: bool = False, index=None):
+        self.album_id = str(album_id)
+        self.index = index
+        self.transcoder = transcoder
+        self.output = output if output in (OUTPUT_FOLDER, OUTPUT_CBZ) else OUTPUT_FOLDER
+        self.dedupe = dedupe
+        self.verify_decode = verify_decode
+        self.token = token or CancelToken()
+        self.retry = retry or RetryPolicy()
+        self.progress = ProgressTracker(on_progress)
+        self._page_estimate = 0
+        self.option = option
+        self.save_path = save_path
+        self.resume = resume
+        self.image_workers = max(1, int(image_workers))
+        self.chapter_workers = max(1, int(chapter_workers))
+        self._image_pool = None
+        self.on_status = on_status or (lambda _msg: None)
+        self.client = None
+        self.sink = None
+        self.images_total = 0
+        self.images_done = 0
+        self.images_skipped = 0
+        self.images_failed = 0
+        self.images_retried = 0
+        self.chapters_failed = 0
+        self.images_corrupt = 0
+        self.bytes_deduped = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def run(self) -> Tuple[bool, str]:
+        if self.option is None:
+            # 调用方可注入任意提供 build_jm_client() 的选项（如基准测试的本地镜像），未注入时才依赖 jmcomic
+            return False, "未安装 jmcomic 库，无法下载"
+        try:
+            self.token.checkpoint()
+            self.client = self.option.build_jm_client()
+            album = call_api(self.client, lambda: self.client.get_album_detail(self.album_id), self.retry,
+                             token=self.token, on_retry=self._on_album_retry)
+            album_dir = album_dir_for(self.save_path, album)
+            # 专辑页给出的总页数作为初始估计，章节展开后再修正
+            try:
+                self._page_estimate = int(getattr(album, 'page_count', 0) or 0)
+            except (TypeError, ValueError):
+                self._page_estimate = 0
+            self.progress.set_total(self._page_estimate)
+            if self.output == OUTPUT_CBZ:
+                self.sink = _CbzSink(self.save_path, album_dir, self.album_id)
+            else:
+                store = ContentStore(self.save_path) if self.dedupe else None
+                self.sink = _FolderSink(album_dir, self.album_id, store)
+            self.sink.open(self.resume)
+            complete = False
+            try:
+                self.sink.meta(album_id=self.album_id, title=getattr(album, 'name', ''), chapters=len(album))
+                if self.transcoder is not None and self.transcoder.error:
+                    self.on_status(self.transcoder.error)
+                photos = list(album)
+                self.progress.set_chapters(len(photos))
+                with ThreadPoolExecutor(max_workers=self.image_workers) as image_pool, \
+                        ThreadPoolExecutor(max_workers=self.chapter_workers) as chapter_pool:
+                    self._image_pool = image_pool
+                    futures = [chapter_pool.submit(self.download_photo, photo) for photo in photos]
+                    for fut in futures:
+                        # 取消时第一个 DownloadCancelled 抛出，其余章节在 checkpoint 处自行结束
+                        fut.result()
+                self.token.checkpoint()
+                complete = True
+                if not self.images_failed and not self.chapters_failed:
+                    # 整本校验通过，下次续传不再逐张哈希
+                    self.sink.meta(verified=True)
+            finally:
+                if self.transcoder is not None:
+                    # 转码与下载重叠进行，这里只等尾部；取消时未开始的转码直接放弃（保持原格式）
+                    self.transcoder.wait(cancel_pending=self.token.cancelled)
+                self._image_pool = None
+                clean = complete and not self.images_failed and not self.chapters_failed
+                self.sink.close(clean)
+                self._record_library(album, clean)
+        except DownloadCancelled:
+            self.progress.flush()
+            return False, f"漫画 {self.album_id} 已停止（已完成 {self.images_done} 张，可续传）"
+        self.progress.flush()
+
+        if self.chapters_failed:
+            return False, (f"漫画 {self.album_id} 有 {self.chapters_failed} 个章节获取失败，"
+                           f"其余章节已完成，重新下载将续传缺失部分")
+        if self.images_failed:
+            return False, (f"漫画 {self.album_id} 部分图片下载失败（{self.images_failed}/{self.images_total}），"
+                           f"重新下载将续传缺失部分")
+        notes = []
+        if self.images_skipped:
+            notes.append(f"续传跳过 {self.images_skipped} 张已校验图片")
+        if self.images_retried:
+            notes.append(f"重试 {self.images_retried} 次")
+        if self.images_corrupt:
+            notes.append(f"校验发现 {self.images_corrupt} 张损坏并已重新下载")
+        if self.bytes_deduped:
+            notes.append(f"去重节省 {format_bytes(self.bytes_deduped)}")
+        if self.transcoder is not None and self.transcoder.files:
+            st = self.transcoder.stats()
+            notes.append(f"转码 {st['files']} 张为 {st['format']}，{format_bytes(st['bytes_in'])} → "
+                         f"{format_bytes(st['bytes_out'])}，{st['files_per_sec']:.1f} 张/秒")
+        if notes:
+            return True, f"漫画 {self.album_id} 下载完成！（{'，'.join(notes)}）"
+        return True, f"漫画 {self.album_id} 下载完成！"
+
+    def _record_library(self, album, complete: bool) -> None:
+        # 登记到已下载索引；索引不可用不影响下载结果
+        if self.index is None:
+            return
+        try:
+            self.index.record(self.save_path, self.album_id, self.sink.library_path, self.sink.kind,
+                              title=getattr(album, 'name', ''), images=self.images_done + self.images_skipped,
+                              complete=complete)
+        except Exception:
+            pass
+
+    def _on_album_retry(self, attempt: int, error: Exception, delay: float) -> None:
+        self.on_status(f"请求失败（{error}），{delay:.1f} 秒后第 {attempt} 次重试")
+
+    def download_photo(self, photo) -> None:
+        """单个章节：获取图片列表后把图片提交到专辑共享的图片线程池，等本章全部结束后汇报"""
+        self.token.checkpoint()
+        self.progress.set_chapter(photo.album_index, getattr(photo, 'name', ''))
+        try:
+            call_api(self.client, lambda: self.client.check_photo(photo), self.retry, token=self.token,
+                     on_retry=self._on_album_retry)
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            self._count('chapters_failed')
+            self.on_status(f"章节 {photo.album_index} 获取失败：{e}")
+            return
+        images = list(photo)
+        self._count('images_total', len(images))
+        self.progress.set_total(max(self._page_estimate, self.images_total))
+        self.on_status(f"章节 {photo.album_index}: {getattr(photo, 'name', '')}（{len(images)} 张）")
+        self.sink.prepare_chapter(photo)
+        if self._image_pool is None:
+            with ThreadPoolExecutor(max_workers=self.image_workers) as pool:
+                results = list(pool.map(lambda img: self.download_image(photo, img), images))
+        else:
+            futures = [self._image_pool.submit(self.download_image, photo, img) for img in images]
+            results = [fut.result() for fut in futures]
+        self.token.checkpoint()
+        if self.sink.verify_after_chapter:
+            results = self._verify_chapter(photo, images, results)
+        self.progress.chapter_done()
+        failed = results.count(False)
+        if failed:
+            self.on_status(f"章节 {photo.album_index} 有 {failed} 张图片失败")
+        else:
+            self.on_status(f"章节 {photo.album_index} 完成")
+
+    def _verify_chapter(self, photo, images, results):
+        """章节结束后的完整性校验：在进程池（完整解码）或图片线程池（只查头尾）中并行执行。
+
+        只有损坏的图片会重新下载一次；通过的图片记入清单，随后才转码/去重。
+        """
+        todo = []
+        for i, (image, ok) in enumerate(zip(images, results)):
+            if not ok:
+                continue
+            key = image_key(photo, image)
+            if self.sink.needs_verify(key):
+                todo.append((i, image, key, self.sink.file_of(key)))
+            else:
+                self._after_verified(key, photo, image)
+        if not todo:
+            return results
+        pool = shared_pool() if self.verify_decode else self._image_pool
+        if pool is None:
+            errors = [verify_image(str(path), self.verify_decode) for _i, _img, _key, path in todo]
+        else:
+            futures = [pool.submit(verify_image, str(path), self.verify_decode) for _i, _img, _key, path in todo]
+            errors = []
+            for fut in futures:
+                try:
+                    errors.append(fut.result())
+                except Exception as e:
+                    errors.append(str(e))
+        results = list(results)
+        for (i, image, key, path), error in zip(todo, errors):
+            if error is None:
+                self.sink.mark_verified(key)
+                self._after_verified(key, photo, image)
+                continue
+            self._count('images_corrupt')
+            self.on_status(f"章节 {photo.album_index} 图片 {image.filename} 校验失败（{error}），重新下载")
+            self.sink.fail(key, path, IOError(error))
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            if self.download_image(photo, image, refetch=True):
+                error = verify_image(str(self.sink.file_of(key)), self.verify_decode)
+                if error is None:
+                    self.sink.mark_verified(key)
+                    self._after_verified(key, photo, image)
+                    continue
+                self.sink.fail(key, path, IOError(error))
+            self._count('images_failed')
+            results[i] = False
+        return results
+
+    def _after_verified(self, key: str, photo, image) -> None:
+        # 校验通过后才转码；无需转码的直接登记去重
+        if not self._submit_transcode(key, self.sink.file_of(key), photo, image):
+            self._finalize(key)
+
+    def download_image(self, photo, image, refetch: bool = False) -> bool:
+        """下载单张图片；refetch=True 为校验失败后的重新下载，不再计入进度与完成数"""
+        if self.token.cancelled:
+            return False
+        self.token.checkpoint()
+        if self.transcoder is not None:
+            # 已完成的转码在本专辑的下载线程中登记
+            self.transcoder.drain()
+        key = image_key(photo, image)
+        if self.resume and not refetch:
+            existing = self.sink.existing(key, photo, image)
+            if existing is not None:
+                self._count('images_skipped')
+                self.progress.image_skipped()
+                return True
+        path = self.sink.target_path(photo, image)
+        try:
+            if os.path.exists(path) and os.stat(path).st_nlink > 1:
+                # 去重后的文件与其他专辑共用 inode，先解除链接再写，避免覆盖别处的图片
+                os.remove(path)
+            decode = True
+            try:
+                decode = self.option.decide_download_image_decode(image)
+            except Exception:
+                pass
+            url = getattr(image, 'download_url', None) or getattr(image, 'img_url', '') or ''
+
+            def fetch():
+                # 每次尝试都经过主机级限速与自适应并发，多本专辑并行时共享同一额度
+                with limiter.slot(url, self.token) as slot:
+                    start = time.monotonic()
+                    try:
+                        self.client.download_by_image_detail(image, str(path), decode_image=decode)
+                    except DownloadCancelled:
+                        raise
+                    except Exception as e:
+                        # jmcomic 把状态码包在异常的 resp 里：写回 slot，429/503 才会触发退让
+                        slot['status'] = status_of(e)
+                        mirror_health.record(url, None, False, str(e))
+                        raise
+                    mirror_health.record(url, time.monotonic() - start, True)
+                if not self.sink.verify_after_chapter:
+                    error = verify_image(str(path), self.verify_decode)
+                    if error:
+                        self._count('images_corrupt')
+                        # 传输中损坏属于临时故障，重新下载
+                        raise TransientError(f"图片校验失败: {error}")
+
+            self.retry.call(fetch, token=self.token, on_retry=lambda *_: self._count('images_retried'))
+            nbytes = os.path.getsize(path)
+            if self.sink.commit_before_transcode:
+                # 散图先登记，章节校验通过后再转码/去重
+                self.sink.commit(key, path, photo, image)
+            elif not self._submit_transcode(key, path, photo, image):
+                self.sink.commit(key, path, photo, image)
+            if not refetch:
+                self._count('images_done')
+                self.progress.image_done(nbytes)
+            return True
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            if not refetch:
+                self._count('images_failed')
+            self.sink.fail(key, path, e)
+            # 残留的不完整文件由清单判定为未完成，下次续传时重新获取
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+            return False
+
+    def _finalize(self, key: str) -> None:
+        n = self.sink.finalize(key)
+        if n:
+            self._count('bytes_deduped', n)
+
+    def _submit_transcode(self, key: str, path: Path, photo, image) -> bool:
+        """提交转码，返回是否已提交；转码结果（失败时为原文件）交由输出端登记"""
+        if self.transcoder is None or not self.transcoder.enabled or not needs_transcode(path, self.transcoder.fmt):
+            return False
+
+        def on_done(dst: str, _n_in: int, _n_out: int):
+            # 散图模式以新文件覆盖清单记录；CBZ 模式此时才入包
+            # 转码结果由 Pillow 重新编码生成，视为已校验
+            try:
+                self.sink.commit(key, dst, photo, image, verified=True)
+                self._finalize(key)
+            except Exception as e:
+                # 登记失败的图片记为失败，整本不标记为完整，下次续传重新获取
+                self._count('images_failed')
+                self.sink.fail(key, dst, e)
+                return
+            self.progress.add_transcoded()
+
+        def on_error(src: str, _error: Exception):
+            if not self.sink.commit_before_transcode and os.path.exists(src):
+                self.sink.commit(key, src, photo, image)
+
+        return self.transcoder.submit(path, on_done, on_error) is not None
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+MANIFEST_NAME = '.jm_manifest.jsonl'
+
+
+def file_sha1(path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AlbumManifest:
+    """专辑下载清单：每完成一张图片追加一行 JSON（图片键、大小、sha1、状态）。
+
+    采用追加写而非整体重写，单张图片的记录开销为 O(1)；进程崩溃最多丢失最后一行。
+    加载时按行回放，同一图片以最后一条记录为准。
+    """
+
+    def __init__(self, album_dir, album_id: str = ''):
+        self.album_dir = Path(album_dir)
+        self.file = self.album_dir / MANIFEST_NAME
+        self.album_id = str(album_id)
+        self.meta: Dict = {}
+        self.images: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._fp = None
+
+    def load(self) -> 'AlbumManifest':
+        self.meta = {}
+        self.images = {}
+        if self.file.exists():
+            try:
+                with self.file.open('r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            rec = json.loads(line)
+                        except Exception:
+                            # 崩溃时可能残留半行，忽略
+                            continue
+                        key = rec.get('key')
+                        if key:
+                            self.images[key] = rec
+                        else:
+                            self.meta.update(rec)
+            except Exception:
+                self.images = {}
+        return self
+
+    def open(self) -> None:
+        self.album_dir.mkdir(parents=True, exist_ok=True)
+        self._fp = self.file.open('a', encoding='utf-8')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fp is not None:
+                try:
+                    self._fp.close()
+                except Exception:
+                    pass
+                self._fp = None
+
+    def _append(self, rec: Dict) -> None:
+        with self._lock:
+            if self._fp is None:
+                return
+            self._fp.write(json.dumps(rec, ensure_ascii=False) + '\n')
+            self._fp.flush()
+
+    def update_meta(self, **fields) -> None:
+        self.meta.update(fields)
+        self._append(dict(fields))
+
+    def record(self, key: str, path, state: str = 'done', **extra) -> Dict:
+        rec = {'key': key, 'state': state}
+        if state == 'done':
+            # 记录实际落盘文件（转码后后缀可能变化），续传校验以此为准
+            rec['file'] = os.path.relpath(path, self.album_dir).replace(os.sep, '/')
+            rec['size'] = os.path.getsize(path)
+            rec['sha1'] = file_sha1(path)
+        rec.update(extra)
+        with self._lock:
+            self.images[key] = rec
+        self._append(rec)
+        return rec
+
+    def update(self, key: str, **fields) -> None:
+        """在已有记录上补充字段（如校验结果），不重新计算大小与 sha1"""
+        with self._lock:
+            rec = dict(self.images.get(key) or {'key': key})
+            rec.update(fields)
+            self.images[key] = rec
+        self._append(rec)
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.images.get(key)
+
+    def file_of(self, key: str, default=None) -> Optional[Path]:
+        rec = self.images.get(key)
+        if rec and rec.get('file'):
+            return self.album_dir / rec['file']
+        return Path(default) if default is not None else None
+
+    def is_verified(self, key: str, path, deep: bool = True) -> bool:
+        """清单记录为完成，且磁盘文件大小与 sha1 均与记录一致；deep=False 时只比对大小"""
+        rec = self.images.get(key)
+        if not rec or rec.get('state') != 'done':
+            return False
+        path = self.file_of(key, path)
+        try:
+            if os.path.getsize(path) != rec.get('size'):
+                return False
+            return not deep or file_sha1(path) == rec.get('sha1')
+        except OSError:
+            return False
+
+    def done_count(self) -> int:
+        return sum(1 for r in self.images.values() if r.get('state') == 'done')
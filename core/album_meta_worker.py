@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.cancellation import CancelToken, DownloadCancelled
+from core.jm_option import call_api
+from core.retry import RetryPolicy
+
+
+def fetch_page_count(client, album_id: str, retry: RetryPolicy, token: CancelToken) -> int:
+    """只请求专辑详情页，返回总页数；站点未给出页数时返回 -1"""
+    album = call_api(client, lambda: client.get_album_detail(album_id), retry, token=token)
+    try:
+        return int(getattr(album, 'page_count', 0) or 0) or -1
+    except (TypeError, ValueError):
+        return -1
+
+
+class AlbumMetaWorker(QThread):
+    """预取排队专辑的页数，供短作业优先排序；不下载任何图片"""
+    meta_ready = pyqtSignal(str, int)  # album_id, 页数（未知或获取失败为 -1）
+
+    def __init__(self, album_ids: List[str], option, retries: int = 1, workers: int = 4):
+        super().__init__()
+        self.album_ids = list(album_ids)
+        self.option = option
+        self.retry = RetryPolicy(retries)
+        self.workers = max(1, int(workers))
+        self.token = CancelToken()
+
+    def stop(self):
+        self.token.cancel()
+
+    def run(self):
+        try:
+            client = self.option.build_jm_client()
+        except Exception:
+            return
+
+        def one(album_id: str) -> None:
+            if self.token.cancelled:
+                return
+            try:
+                pages = fetch_page_count(client, album_id, self.retry, self.token)
+            except DownloadCancelled:
+                return
+            except Exception:
+                pages = -1
+            self.meta_ready.emit(album_id, pages)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(one, self.album_ids))
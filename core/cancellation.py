@@ -0,0 +1,50 @@
+import threading
+
+
+class DownloadCancelled(Exception):
+    """下载被用户取消"""
+
+
+class CancelToken:
+    """协作式取消/暂停令牌：下载流程在章节与图片之间调用 checkpoint()。
+
+    暂停时 checkpoint() 阻塞当前线程（客户端与连接池保持不动），继续后原地往下走；
+    取消时 checkpoint() 抛出 DownloadCancelled，暂停中的线程也会被立即唤醒。
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        # 唤醒暂停中的线程，让其尽快走到取消分支
+        self._resumed.set()
+
+    def pause(self) -> None:
+        if not self.cancelled:
+            self._resumed.clear()
+
+    def resume(self) -> None:
+        self._resumed.set()
+
+    def sleep(self, seconds: float) -> bool:
+        """可被取消打断的等待，返回是否已取消"""
+        return self._cancelled.wait(max(0.0, seconds))
+
+    def checkpoint(self) -> None:
+        if self.cancelled:
+            raise DownloadCancelled()
+        if not self._resumed.is_set():
+            self._resumed.wait()
+            if self.cancelled:
+                raise DownloadCancelled()
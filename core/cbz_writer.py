@@ -0,0 +1,90 @@
+import os
+import threading
+import zipfile
+from pathlib import Path
+from typing import Set
+
+CBZ_SUFFIX = '.cbz'
+PART_SUFFIX = '.part'
+# 归档注释里记录专辑 ID，漫画库索引据此识别，不依赖文件名
+_COMMENT_PREFIX = b'jm:'
+
+
+def read_album_id(path) -> str:
+    with zipfile.ZipFile(path) as zf:
+        comment = zf.comment
+    if comment.startswith(_COMMENT_PREFIX):
+        return comment[len(_COMMENT_PREFIX):].decode('ascii', 'ignore').strip()
+    return ''
+
+
+class CbzWriter:
+    """把图片逐张写入 .cbz（ZIP_STORED，不再压缩）。
+
+    下载期间写入 <name>.cbz.part，正常结束后原子改名为 <name>.cbz。
+    取消/暂停退出时归档会被正常关闭，已写入的条目即为续传依据；
+    若进程崩溃导致 .part 缺少中央目录而无法打开，则丢弃后重新下载。
+    """
+
+    def __init__(self, path, album_id: str = ''):
+        self.path = Path(path)
+        self.album_id = str(album_id or '')
+        self.part = self.path.with_name(self.path.name + PART_SUFFIX)
+        self._zf = None
+        self._names: Set[str] = set()
+        self._stems: Set[str] = set()
+        self._lock = threading.Lock()
+        self.recovered = False
+
+    def open(self, resume: bool = True) -> 'CbzWriter':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if resume:
+                # 已完成的归档补下缺失页：先移回 .part，中途崩溃也不会损坏成品
+                os.replace(self.path, self.part)
+            else:
+                self.path.unlink()
+        # 缺少中央目录的文件以 'a' 模式打开不会报错，而是在其后另起一个归档，须先行判断
+        if self.part.exists() and resume and zipfile.is_zipfile(self.part):
+            try:
+                self._zf = zipfile.ZipFile(self.part, 'a', compression=zipfile.ZIP_STORED)
+                self._names = set(self._zf.namelist())
+                self.recovered = True
+            except (zipfile.BadZipFile, OSError):
+                self._zf = None
+                self.part.unlink()
+        if self._zf is None:
+            if self.part.exists():
+                self.part.unlink()
+            self._zf = zipfile.ZipFile(self.part, 'w', compression=zipfile.ZIP_STORED)
+            self._names = set()
+        self._stems = {os.path.splitext(n)[0] for n in self._names}
+        return self
+
+    def has_stem(self, stem: str) -> bool:
+        # 按不含后缀的名字判断，转码改变后缀不影响续传
+        return stem in self._stems
+
+    def add_file(self, src, arcname: str, remove_src: bool = True) -> int:
+        size = os.path.getsize(src)
+        with self._lock:
+            if arcname not in self._names:
+                self._zf.write(src, arcname, compress_type=zipfile.ZIP_STORED)
+                self._names.add(arcname)
+                self._stems.add(os.path.splitext(arcname)[0])
+        if remove_src:
+            try:
+                os.remove(src)
+            except OSError:
+                pass
+        return size
+
+    def close(self, complete: bool = False) -> None:
+        with self._lock:
+            if self._zf is not None:
+                if self.album_id:
+                    self._zf.comment = _COMMENT_PREFIX + self.album_id.encode('ascii', 'ignore')
+                self._zf.close()
+                self._zf = None
+        if complete and self.part.exists():
+            os.replace(self.part, self.path)
@@ -0,0 +1,265 @@
+"""无界面批量下载入口（不依赖 PyQt5，可在无显示环境的服务器上运行）。
+
+    python -m core.cli download --ids-file ids.txt --jobs 8
+    python -m core.cli download 123456 654321 --output cbz
+
+与图形界面共用同一份设置文件（~/.jmcomic_downloader/settings.json）。
+进度以 JSON Lines 输出到标准输出（每行一个事件），退出码：
+0 全部成功，1 有专辑失败，2 参数或环境错误，130 被中断（可续传）。
+"""
+import argparse
+import json
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.settings_store import SettingsStore
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+CONFIG_DIR = Path.home() / ".jmcomic_downloader"
+
+_ID_RE = re.compile(r'\d+')
+
+
+def parse_ids(lines) -> List[str]:
+    """每行一个专辑 ID（允许 JM 前缀或链接），# 开头为注释，重复 ID 只保留第一次"""
+    ids = []
+    seen = set()
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        m = _ID_RE.search(line)
+        if m and m.group() not in seen:
+            seen.add(m.group())
+            ids.append(m.group())
+    return ids
+
+
+class Reporter:
+    """事件输出：jsonl 为机器可读格式，text 为便于人工查看的单行文本；多线程写入加锁"""
+
+    def __init__(self, fmt: str = 'jsonl', stream=None):
+        self.fmt = fmt
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields) -> None:
+        if self.fmt == 'jsonl':
+            line = json.dumps(dict(event=event, ts=round(time.time(), 3), **fields), ensure_ascii=False)
+        else:
+            line = self._text(event, fields)
+            if line is None:
+                return
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    @staticmethod
+    def _text(event: str, f: Dict) -> Optional[str]:
+        aid = f.get('album_id', '')
+        if event == 'progress':
+            return f"[{aid}] {f.get('images_done', 0)}/{f.get('images_total', 0) or '?'} 张"
+        if event == 'status':
+            return f"[{aid}] {f.get('message', '')}"
+        if event == 'skipped':
+            return f"[{aid}] 跳过：{f.get('message', '')}"
+        if event == 'finished':
+            return f"[{aid}] {'成功' if f.get('ok') else '失败'}：{f.get('message', '')}"
+        if event == 'summary':
+            return f"完成 {f.get('succeeded', 0)}（跳过 {f.get('skipped', 0)}），失败 {f.get('failed', 0)}，耗时 {f.get('elapsed', 0):.1f} 秒"
+        if event == 'error':
+            return f"错误：{f.get('message', '')}"
+        if event == 'warning':
+            return f"警告：{f.get('message', '')}"
+        if event == 'interrupted':
+            return f"中断：{f.get('message', '')}"
+        return None
+
+
+def download(ids: List[str], save_dir: str, jobs: int, settings: SettingsStore, reporter: Reporter,
+             output: Optional[str] = None, resume: Optional[bool] = None, index=None,
+             policy: Optional[str] = None) -> int:
+    """按 jobs 并发下载多本专辑，返回退出码；Ctrl+C 时协作式停止所有专辑。
+
+    传入 index（LibraryIndex）时先查已下载索引：policy=skip 的完整专辑直接记为成功，不发任何请求。
+    """
+    # 下载引擎按需导入，查看帮助等操作无需加载 jmcomic
+    from core.album_downloader import AlbumDownloader
+    from core.cancellation import CancelToken
+    from core.jm_option import JM_AVAILABLE, get_jm_option
+    from core.library_index import POLICY_FORCE, should_skip, skip_message
+    from core.progress import format_bytes
+    from core.retry import RetryPolicy
+    from core.transcoder import Transcoder
+
+    if not JM_AVAILABLE:
+        reporter.emit('error', message="未安装 jmcomic 库，无法下载")
+        return EXIT_USAGE
+    Path(save_dir).mkdir(parents=True, exist_ok=True)
+    option = get_jm_option(settings)
+    if option is not None and option.warning:
+        reporter.emit('warning', message=option.warning)
+    tokens: Dict[str, CancelToken] = {}
+    results: Dict[str, bool] = {}
+    started = time.monotonic()
+    policy = policy or settings.get_existing_policy()
+    default_resume = settings.get_resume_download() if resume is None else resume
+
+    def run_one(album_id: str, album_resume: bool) -> bool:
+        token = tokens[album_id]
+        reporter.emit('started', album_id=album_id)
+        engine = AlbumDownloader(
+            # 同一设置下所有专辑共用一个已配置的客户端
+            album_id, get_jm_option(settings), save_dir,
+            resume=album_resume,
+            on_status=lambda msg: reporter.emit('status', album_id=album_id, message=msg),
+            token=token,
+            on_progress=lambda snap: reporter.emit('progress', album_id=album_id, **snap),
+            retry=RetryPolicy(settings.get_retry_count()),
+            transcoder=Transcoder(settings.get_image_format(), settings.get_image_quality()),
+            output=output or settings.get_output_mode(),
+            dedupe=settings.get_dedupe(),
+            chapter_workers=settings.get_chapter_workers(),
+            verify_decode=settings.get_verify_decode(),
+            image_workers=settings.get_image_threads(),
+            index=index,
+        )
+        try:
+            ok, message = engine.run()
+        except Exception as e:
+            ok, message = False, f"漫画 {album_id} 下载失败: {e}"
+        results[album_id] = ok
+        reporter.emit('finished', album_id=album_id, ok=ok, message=message,
+                      bytes=engine.progress.bytes_done, size=format_bytes(engine.progress.bytes_done))
+        return ok
+
+    interrupted = False
+    skipped = 0
+
+    def interrupt() -> None:
+        nonlocal interrupted
+        if not interrupted:
+            interrupted = True
+            reporter.emit('interrupted', message="正在停止，已下载的部分可续传")
+            for token in list(tokens.values()):
+                token.cancel()
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        pending = set()
+        try:
+            for album_id in ids:
+                entry = index.lookup(save_dir, album_id) if index is not None else None
+                if should_skip(entry, policy):
+                    results[album_id] = True
+                    skipped += 1
+                    reporter.emit('skipped', album_id=album_id, message=skip_message(entry), path=entry['path'])
+                    continue
+                tokens[album_id] = CancelToken()
+                # 强制重新下载：库中已有的专辑不续传
+                album_resume = default_resume and not (policy == POLICY_FORCE and entry is not None)
+                pending.add(pool.submit(run_one, album_id, album_resume))
+        except KeyboardInterrupt:
+            # 派发途中中断：已提交的专辑同样取消，不再提交剩余的
+            interrupt()
+        while pending:
+            try:
+                # 短超时轮询，让主线程能及时响应 Ctrl+C
+                _done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                interrupt()
+
+    succeeded = sum(1 for ok in results.values() if ok)
+    failed = len(ids) - succeeded
+    reporter.emit('summary', total=len(ids), succeeded=succeeded, failed=failed, skipped=skipped,
+                  failed_ids=[i for i in ids if not results.get(i)], elapsed=round(time.monotonic() - started, 3))
+    if interrupted:
+        return EXIT_INTERRUPTED
+    return EXIT_OK if failed == 0 else EXIT_FAILED
+
+
+def cmd_download(args) -> int:
+    settings = SettingsStore(Path(args.config_dir))
+    settings.load()
+    reporter = Reporter(args.format)
+    ids = list(args.ids or [])
+    if args.ids_file:
+        try:
+            if args.ids_file == '-':
+                ids += parse_ids(sys.stdin)
+            else:
+                with open(args.ids_file, 'r', encoding='utf-8') as f:
+                    ids += parse_ids(f)
+        except OSError as e:
+            reporter.emit('error', message=f"无法读取 ID 文件: {e}")
+            return EXIT_USAGE
+    ids = parse_ids(ids)
+    if not ids:
+        reporter.emit('error', message="没有要下载的专辑 ID")
+        return EXIT_USAGE
+    save_dir = args.save_dir or settings.get_download_path()
+    if not save_dir:
+        reporter.emit('error', message="未指定保存目录（--save-dir 或设置中的下载路径）")
+        return EXIT_USAGE
+    jobs = args.jobs or settings.get_thread_count()
+    resume = False if args.no_resume else None
+    from core.library_index import LibraryIndex
+    index = LibraryIndex(Path(args.config_dir)).open()
+    try:
+        # 先增量补录索引，已有的专辑在派发前即可判定
+        index.scan(save_dir)
+        return download(ids, save_dir, jobs, settings, reporter, output=args.output, resume=resume,
+                        index=index, policy=args.existing)
+    finally:
+        index.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m core.cli', description="JM 漫画下载器（无界面）")
+    parser.add_argument('--config-dir', default=str(CONFIG_DIR), help="设置目录（默认与图形界面相同）")
+    # 子命令共用的选项，写在子命令前后均可；子命令层不设默认值，避免覆盖写在前面的取值
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config-dir', default=argparse.SUPPRESS, help="设置目录（默认与图形界面相同）")
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('download', parents=[common], help="批量下载专辑")
+    p.add_argument('ids', nargs='*', help="专辑 ID")
+    p.add_argument('--ids-file', help="ID 列表文件，每行一个；- 表示标准输入")
+    p.add_argument('--jobs', '-j', type=int, default=0, help="同时下载的专辑数（默认取设置中的线程数）")
+    p.add_argument('--save-dir', '-o', default='', help="保存目录（默认取设置中的下载路径）")
+    p.add_argument('--output', choices=('folder', 'cbz'), help="保存方式（默认取设置）")
+    p.add_argument('--no-resume', action='store_true', help="不跳过已下载的图片")
+    p.add_argument('--existing', choices=('skip', 'verify', 'force'),
+                   help="漫画库中已有的专辑：跳过 / 校验并补全 / 强制重新下载（默认取设置）")
+    p.add_argument('--format', choices=('jsonl', 'text'), default='jsonl', help="进度输出格式")
+    p.set_defaults(func=cmd_download)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return EXIT_USAGE
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        # 读取 ID、扫描索引、加载 jmcomic 等阶段被中断（下载阶段由 download() 自行收尾）
+        Reporter(getattr(args, 'format', 'jsonl')).emit('interrupted', message="已中断")
+        return EXIT_INTERRUPTED
+
+
+if __name__ == '__main__':
+    # 转码进程池在 Windows/打包环境下需要
+    multiprocessing.freeze_support()
+    sys.exit(main())
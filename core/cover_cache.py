@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from core.http_pool import http_pool
+from core.mirror_health import mirror_health
+from core.rate_limit import limiter
+from core.retry import RetryPolicy
+
+# 内存中保留的封面总字节数上限（单张封面通常几十 KB）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CoverCache:
+    """封面内存 LRU（URL → 图片字节）：搜索结果渲染与下一页预取共用，翻页回来不再重新下载"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._items: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(url)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(url)
+            self.hits += 1
+            return data
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._items
+
+    def put(self, url: str, data: bytes) -> None:
+        if not url or not data or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(url, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[url] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, dropped = self._items.popitem(last=False)
+                self._size -= len(dropped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._items), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
+
+
+cover_cache = CoverCache()
+
+
+def fetch_cover(url: str, proxy: str = '', timeout: float = 15, retries: int = 3) -> bytes:
+    """下载单张封面（共享会话、按主机限速、记录镜像健康），成功后写入 cover_cache；失败返回 b''"""
+    cached = cover_cache.get(url)
+    if cached is not None:
+        return cached
+    if not http_pool.available:
+        return b''
+
+    def fetch():
+        # 与搜索共用会话：封面与搜索页同主机时直接复用已建立的连接和 Cookie
+        with limiter.slot(url) as slot:
+            start = time.monotonic()
+            try:
+                r = http_pool.get(url, timeout=timeout, proxy=proxy)
+            except Exception as e:
+                mirror_health.record(url, None, False, str(e))
+                raise
+            slot['status'] = r.status_code
+            mirror_health.record(url, time.monotonic() - start, r.status_code == 200, f"HTTP {r.status_code}")
+            return r
+
+    try:
+        # 图床处于隔离期时只试一次，不为封面反复等待超时
+        if mirror_health.is_quarantined(url):
+            retries = 0
+        resp = RetryPolicy(retries).call(fetch, check_response=True)
+    except Exception:
+        return b''
+    if resp.status_code != 200:
+        return b''
+    data = resp.content or b''
+    cover_cache.put(url, data)
+    return data
@@ -0,0 +1,196 @@
+import os
+import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+from core.album_manifest import file_sha1
+from core.cancellation import CancelToken
+
+STORE_DIR = '.jm_store'
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.avif'}
+HASH_CHUNK = 64
+
+
+class ContentStore:
+    """按内容寻址的图片仓库：下载根目录/.jm_store/<sha1 前两位>/<sha1>。
+
+    专辑中的图片与仓库对象互为硬链接；内容相同的图片只占一份磁盘空间。
+    文件系统不支持硬链接（跨盘、FAT 等）时静默退化为普通存储。
+    """
+
+    def __init__(self, root):
+        self.root = Path(root) / STORE_DIR
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def link_in(self, path, digest: Optional[str] = None) -> int:
+        """登记一张图片：仓库已有同内容对象则把 path 替换为硬链接，返回节省的字节数"""
+        path = Path(path)
+        for _ in range(2):
+            try:
+                st = path.stat()
+                digest = digest or file_sha1(path)
+                obj = self.object_path(digest)
+                if obj.exists():
+                    ost = obj.stat()
+                    if (ost.st_ino, ost.st_dev) == (st.st_ino, st.st_dev):
+                        return 0
+                    if ost.st_size != st.st_size:
+                        # 对象与记录不符（被改动或损坏），不冒险替换
+                        return 0
+                    tmp = path.with_name(path.name + '.lnk')
+                    if tmp.exists():
+                        tmp.unlink()
+                    os.link(obj, tmp)
+                    os.replace(tmp, path)
+                    # 原文件还有其他链接时空间并未真正释放
+                    return st.st_size if st.st_nlink == 1 else 0
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                os.link(path, obj)
+                return 0
+            except FileExistsError:
+                # 另一线程刚登记了同内容对象，再走一次替换分支
+                continue
+            except OSError:
+                return 0
+        return 0
+
+    def prune(self) -> int:
+        """删除只剩仓库自身引用的对象（所属专辑已删除或图片已转码），返回释放的字节数"""
+        freed = 0
+        if not self.root.is_dir():
+            return 0
+        for sub in self.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for obj in sub.iterdir():
+                try:
+                    st = obj.stat()
+                    if st.st_nlink <= 1:
+                        obj.unlink()
+                        freed += st.st_size
+                except OSError:
+                    pass
+            try:
+                sub.rmdir()
+            except OSError:
+                pass
+        return freed
+
+
+def delete_album(root, path) -> int:
+    """删除漫画库中的一个条目（CBZ 文件或专辑目录），并清理因此只剩仓库引用的去重对象；返回仓库释放的字节数"""
+    path = Path(path)
+    if path.is_dir():
+        shutil.rmtree(path)
+        return ContentStore(root).prune()
+    path.unlink()
+    return 0
+
+
+def iter_images(root) -> Iterable[Path]:
+    """遍历下载根目录下的散图，跳过隐藏目录（仓库、暂存目录等）"""
+    for r, ds, fs in os.walk(root):
+        ds[:] = [d for d in ds if not d.startswith('.')]
+        for f in fs:
+            if os.path.splitext(f)[1].lower() in IMAGE_EXTS:
+                yield Path(r) / f
+
+
+def dir_usage(path) -> Dict:
+    """目录的文件数、表观大小，以及与其他专辑共享（硬链接数 > 2，即仓库之外还有别的引用）的字节数"""
+    files = 0
+    total = 0
+    shared = 0
+    seen = set()
+    for r, _ds, fs in os.walk(path):
+        for f in fs:
+            try:
+                st = os.stat(os.path.join(r, f))
+            except OSError:
+                continue
+            files += 1
+            total += st.st_size
+            if st.st_nlink > 2 and (st.st_ino, st.st_dev) not in seen:
+                seen.add((st.st_ino, st.st_dev))
+                shared += st.st_size
+    return {'files': files, 'bytes': total, 'shared_bytes': shared}
+
+
+def dedupe_library(root, workers: Optional[int] = None, token: Optional[CancelToken] = None,
+                   on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """对已有漫画库做一次去重：先按大小分组，只对可能重复的文件在多进程中并行计算 sha1，再逐个硬链接入库。
+
+    返回扫描数、哈希数、去重数与回收的字节数（含清理孤立对象释放的空间）。
+    """
+    token = token or CancelToken()
+    on_progress = on_progress or (lambda _done, _total: None)
+    store = ContentStore(root)
+    by_size = defaultdict(list)
+    scanned = 0
+    for p in iter_images(root):
+        token.checkpoint()
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        scanned += 1
+        by_size[st.st_size].append((p, (st.st_ino, st.st_dev), st.st_nlink))
+    # 仓库中已有对象的大小也参与分组，新文件可以直接链接到旧对象
+    store_sizes = set()
+    if store.root.is_dir():
+        for obj in store.root.glob('*/*'):
+            try:
+                store_sizes.add(obj.stat().st_size)
+            except OSError:
+                pass
+    candidates = []
+    for size, items in by_size.items():
+        inodes = {ino for _p, ino, _n in items}
+        if len(inodes) == 1 and items[0][2] > len(items):
+            # 同组文件已是同一 inode 且另有（仓库）引用，上一轮已处理过
+            continue
+        if size and (len(inodes) > 1 or size in store_sizes):
+            candidates.extend(p for p, _ino, _n in items)
+
+    reclaimed = 0
+    linked = 0
+    total = len(candidates)
+    on_progress(0, total)
+    if candidates:
+        workers = workers or max(1, os.cpu_count() or 1)
+        chunks = [candidates[i:i + HASH_CHUNK] for i in range(0, total, HASH_CHUNK)]
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_hash_many, [str(p) for p in chunk]) for chunk in chunks]
+            for chunk, fut in zip(chunks, futures):
+                if token.cancelled:
+                    for f in futures:
+                        f.cancel()
+                    break
+                # 链接在本进程内按顺序完成，哈希在子进程中并行
+                for p, digest in zip(chunk, fut.result()):
+                    if digest:
+                        n = store.link_in(p, digest)
+                        if n:
+                            linked += 1
+                            reclaimed += n
+                done += len(chunk)
+                on_progress(done, total)
+    if not token.cancelled:
+        reclaimed += store.prune()
+    return {'scanned': scanned, 'hashed': total, 'linked': linked, 'bytes_reclaimed': reclaimed,
+            'cancelled': token.cancelled}
+
+
+def _hash_many(paths) -> list:
+    result = []
+    for path in paths:
+        try:
+            result.append(file_sha1(path))
+        except OSError:
+            result.append(None)
+    return result
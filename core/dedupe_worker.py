@@ -0,0 +1,46 @@
+import os
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.cancellation import CancelToken, DownloadCancelled
+from core.dedupe_store import dedupe_library, delete_album
+
+
+class DedupeWorker(QThread):
+    """漫画库后台去重：多进程计算哈希，相同图片硬链接到内容仓库"""
+    progress_updated = pyqtSignal(int, int)  # 已处理 / 待哈希文件数
+    dedupe_finished = pyqtSignal(dict, str)  # dedupe_library() 统计，错误信息
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = root
+        self.token = CancelToken()
+
+    def stop(self):
+        self.token.cancel()
+
+    def run(self):
+        try:
+            stats = dedupe_library(self.root, token=self.token, on_progress=self.progress_updated.emit)
+            self.dedupe_finished.emit(stats, "")
+        except DownloadCancelled:
+            self.dedupe_finished.emit({'cancelled': True, 'bytes_reclaimed': 0}, "")
+        except Exception as e:
+            self.dedupe_finished.emit({}, f"去重失败: {e}")
+
+
+class DeleteWorker(QThread):
+    """后台删除漫画库条目：目录删除与仓库清理都要遍历文件，不放在界面线程"""
+    delete_finished = pyqtSignal(str, int, str)  # 条目名，仓库释放的字节数，错误信息
+
+    def __init__(self, root: str, name: str):
+        super().__init__()
+        self.root = root
+        self.name = name
+
+    def run(self):
+        try:
+            freed = delete_album(self.root, os.path.join(self.root, self.name))
+            self.delete_finished.emit(self.name, freed, "")
+        except Exception as e:
+            self.delete_finished.emit(self.name, 0, f"删除失败: {e}")
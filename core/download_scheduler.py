@@ -0,0 +1,331 @@
+import time
+from typing import Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from core.progress import format_bytes
+from core.queue_store import PRIORITY_HIGH, PRIORITY_NORMAL, QueueStore
+from core.rate_limit import limiter
+
+
+class DownloadScheduler(QObject):
+    """多专辑并发下载调度：按 max_workers 同时运行若干 DownloadWorker，排空持久化队列 QueueStore。
+
+    队列按优先级派发；名额已满时更高优先级的任务（“立即下载”）会抢占：暂停优先级最低、最晚开始的任务
+    让出名额（线程与已下载进度原样保留），高优先级任务结束后再原地继续。
+    shortest_first=True 时同一优先级内页数少的专辑先下，缩短整批的平均完成时间。
+    """
+    # 超过该秒数没有任何图片完成的任务视为停滞（镜像卡死或代理过慢）
+    STALL_SECONDS = 20.0
+    THROUGHPUT_INTERVAL = 0.5
+    job_started = pyqtSignal(str)  # album_id
+    job_status = pyqtSignal(str, str)  # album_id, message
+    job_progress = pyqtSignal(str, dict)  # album_id, ProgressTracker.snapshot()
+    job_finished = pyqtSignal(str, bool, str)  # album_id, success, message
+    job_stopped = pyqtSignal(str, str)  # album_id, message（用户取消）
+    job_skipped = pyqtSignal(str, str)  # album_id, message（已在库中，未派发）
+    job_preempted = pyqtSignal(str)  # album_id（为高优先级任务让出名额，已暂停）
+    job_resumed = pyqtSignal(str)  # album_id（让位结束，继续下载）
+    throughput_changed = pyqtSignal(str)  # 汇总吞吐描述
+    all_finished = pyqtSignal(int, int)  # succeeded, failed
+
+    def __init__(self, worker_factory: Callable[[str], object], store: QueueStore, max_workers: int = 3, parent=None,
+                 precheck: Optional[Callable[[str], Optional[str]]] = None):
+        super().__init__(parent)
+        # worker_factory(album_id) -> 尚未 start 的 DownloadWorker
+        self.worker_factory = worker_factory
+        # precheck(album_id) -> 跳过原因；派发前调用，返回非空时直接记为完成，不创建线程
+        self.precheck = precheck
+        self.store = store
+        self.max_workers = max(1, int(max_workers))
+        self.shortest_first = False
+        self._active: Dict[str, object] = {}
+        # 被抢占而暂停的任务 → 其优先级；仍占用线程，但不计入并发名额
+        self._preempted: Dict[str, int] = {}
+        self._running = False
+        self._paused = False
+        # 本批次尚未发出 all_finished；停止后等最后一个线程退出再汇总
+        self._batch_open = False
+        self._batch_started = 0.0
+        self._succeeded = 0
+        self._failed = 0
+        self._progress: Dict[str, dict] = {}
+        self._progress_at: Dict[str, float] = {}
+        self._bytes_finished = 0
+        self._last_throughput = 0.0
+        self._ticker = QTimer(self)
+        self._ticker.setInterval(1000)
+        self._ticker.timeout.connect(lambda: self._emit_throughput(force=True))
+
+    # ---- 队列 ----
+    def enqueue(self, album_id: str, front: bool = False, priority: int = PRIORITY_NORMAL) -> bool:
+        album_id = str(album_id).strip()
+        if not album_id or album_id in self._active:
+            return False
+        added = self.store.add(album_id, priority=priority, front=front)
+        if added and self._running:
+            self._preempt_if_needed()
+            self._fill()
+        return added
+
+    def download_now(self, album_id: str) -> bool:
+        """以最高优先级插到队首；运行中且名额已满时抢占低优先级任务"""
+        return self.enqueue(album_id, front=True, priority=PRIORITY_HIGH)
+
+    def prioritize(self, album_ids, priority: int = PRIORITY_HIGH) -> int:
+        n = self.store.set_priority([a for a in album_ids if a not in self._active], priority)
+        if n and self._running:
+            self._preempt_if_needed()
+            self._fill()
+        return n
+
+    def set_shortest_first(self, enabled: bool) -> None:
+        self.shortest_first = bool(enabled)
+
+    def pending_count(self) -> int:
+        return self.store.count('queued')
+
+    def active_ids(self):
+        return list(self._active.keys())
+
+    def preempted_ids(self):
+        return list(self._preempted.keys())
+
+    def _slots_used(self) -> int:
+        return len(self._active) - len(self._preempted)
+
+    def _priority_of(self, album_id: str) -> int:
+        rec = self.store.get(album_id)
+        return rec['priority'] if rec else PRIORITY_NORMAL
+
+    def is_running(self) -> bool:
+        return self._running and bool(self._active or self.pending_count())
+
+    # ---- 控制 ----
+    def set_max_workers(self, n: int) -> None:
+        # 运行中调整：调大立即补位；调小则等现有任务自然结束，不打断
+        self.max_workers = max(1, int(n))
+        if self._running:
+            self._fill()
+
+    def start(self) -> None:
+        if not self._running:
+            self._running = True
+            self._batch_open = True
+            self._batch_started = time.monotonic()
+            self._succeeded = 0
+            self._failed = 0
+            self._bytes_finished = 0
+            self._ticker.start()
+        self._fill()
+
+    def is_paused(self) -> bool:
+        return self._paused
+
+    def stop(self) -> None:
+        # 协作式取消：运行中的线程在下一张图片前自行退出，不阻塞界面；排队项保留在队列中
+        self._running = False
+        self._paused = False
+        self._ticker.stop()
+        for worker in list(self._active.values()):
+            try:
+                worker.stop()
+            except Exception:
+                pass
+        # 没有运行中的线程时立即汇总，否则由最后一个线程退出时汇总
+        self._check_all_finished()
+
+    def pause(self) -> None:
+        # 暂停不释放线程：客户端、连接池与已完成进度原样保留
+        self._paused = True
+        for worker in list(self._active.values()):
+            try:
+                worker.pause()
+            except Exception:
+                pass
+
+    def resume(self) -> None:
+        self._paused = False
+        for album_id, worker in list(self._active.items()):
+            if album_id in self._preempted:
+                continue
+            try:
+                worker.resume_download()
+            except Exception:
+                pass
+        self._fill()
+
+    def wait_all(self, msecs: int = 3000) -> bool:
+        """等待运行中的线程退出，返回是否全部已结束。
+        所有线程共用一个截止时间：最多等 msecs 毫秒，而不是每个线程各等一遍"""
+        deadline = time.monotonic() + msecs / 1000.0
+        done = True
+        for worker in list(self._active.values()):
+            # 截止后仍逐个确认（wait(0) 立即返回），已退出的线程不算未结束
+            left = max(0, int((deadline - time.monotonic()) * 1000))
+            try:
+                done = bool(worker.wait(left)) and done
+            except Exception:
+                done = False
+        return done
+
+    def _preempt_if_needed(self) -> None:
+        """名额已满且队首优先级高于某个运行中任务时，暂停其中优先级最低、最晚开始的一个"""
+        if self._paused:
+            return
+        while self._slots_used() >= self.max_workers:
+            head = self.store.next_queued(exclude=self._active.keys(), shortest_first=self.shortest_first)
+            if head is None:
+                return
+            head_priority = self._priority_of(head)
+            running = [(self._priority_of(aid), -order, aid) for order, aid in enumerate(self._active)
+                       if aid not in self._preempted]
+            if not running:
+                return
+            priority, _order, victim = min(running)
+            if priority >= head_priority:
+                return
+            try:
+                self._active[victim].pause()
+            except Exception:
+                return
+            self._preempted[victim] = priority
+            self.job_preempted.emit(victim)
+
+    def _resume_preempted(self, head: Optional[str]) -> bool:
+        """有空闲名额时，被抢占的任务优先于同级或更低优先级的排队项继续"""
+        if not self._preempted:
+            return False
+        album_id = max(self._preempted, key=lambda aid: self._preempted[aid])
+        if head is not None and self._priority_of(head) > self._preempted[album_id]:
+            return False
+        self._preempted.pop(album_id)
+        try:
+            self._active[album_id].resume_download()
+        except Exception:
+            pass
+        self._progress_at[album_id] = time.monotonic()
+        self.job_resumed.emit(album_id)
+        return True
+
+    def _fill(self) -> None:
+        skipped = False
+        while self._running and not self._paused and self._slots_used() < self.max_workers:
+            album_id = self.store.next_queued(exclude=self._active.keys(), shortest_first=self.shortest_first)
+            if self._resume_preempted(album_id):
+                continue
+            if album_id is None:
+                break
+            reason = self._precheck(album_id)
+            if reason:
+                skipped = True
+                self._succeeded += 1
+                self.store.set_state(album_id, 'done')
+                self.job_skipped.emit(album_id, reason)
+                continue
+            self.store.mark_running(album_id)
+            try:
+                worker = self.worker_factory(album_id)
+            except Exception as e:
+                self._failed += 1
+                self.store.set_state(album_id, 'failed', str(e))
+                self.job_finished.emit(album_id, False, f"无法开始下载: {e}")
+                continue
+            self._active[album_id] = worker
+            worker.status_changed.connect(lambda msg, aid=album_id: self.job_status.emit(aid, msg))
+            worker.progress_detail.connect(lambda snap, aid=album_id: self._on_job_progress(aid, snap))
+            self._progress_at[album_id] = time.monotonic()
+            worker.download_finished.connect(lambda ok, msg, aid=album_id: self._on_job_finished(aid, ok, msg))
+            # 仅在线程真正退出后释放引用，避免 QThread 运行中被回收
+            worker.finished.connect(lambda aid=album_id: self._on_thread_finished(aid))
+            worker.start()
+            self.job_started.emit(album_id)
+        self._emit_throughput(force=True)
+        if skipped:
+            # 整批都被跳过时没有线程结束来触发收尾
+            self._check_all_finished()
+
+    def _precheck(self, album_id: str) -> Optional[str]:
+        if self.precheck is None:
+            return None
+        try:
+            return self.precheck(album_id)
+        except Exception:
+            return None
+
+    def _on_job_progress(self, album_id: str, snap: dict) -> None:
+        self._progress[album_id] = snap
+        self._progress_at[album_id] = time.monotonic()
+        self.job_progress.emit(album_id, snap)
+        self._emit_throughput()
+
+    def _on_job_finished(self, album_id: str, success: bool, message: str) -> None:
+        worker = self._active.get(album_id)
+        if not success and worker is not None and getattr(worker, 'cancelled', False):
+            self.store.set_state(album_id, 'stopped', message)
+            self.job_stopped.emit(album_id, message)
+            return
+        if success:
+            self._succeeded += 1
+            self.store.set_state(album_id, 'done')
+        else:
+            self._failed += 1
+            self.store.set_state(album_id, 'failed', message)
+        self.job_finished.emit(album_id, success, message)
+
+    def _on_thread_finished(self, album_id: str) -> None:
+        worker = self._active.pop(album_id, None)
+        self._preempted.pop(album_id, None)
+        if worker is not None:
+            worker.deleteLater()
+        snap = self._progress.pop(album_id, None)
+        self._progress_at.pop(album_id, None)
+        if snap:
+            self._bytes_finished += snap.get('bytes', 0)
+        if worker is not None:
+            rec = self.store.get(album_id)
+            if rec and rec['state'] == 'running':
+                # 线程异常退出且未报告结果
+                self.store.set_state(album_id, 'stopped' if getattr(worker, 'cancelled', False) else 'failed')
+        self._fill()
+        self._check_all_finished()
+
+    def _check_all_finished(self) -> None:
+        # 队列排空，或已停止且最后一个线程已退出（排队项保留）时结束本批次
+        if self._active or (self._running and self.pending_count()):
+            return
+        self._running = False
+        self._ticker.stop()
+        if self._batch_open:
+            self._batch_open = False
+            self.all_finished.emit(self._succeeded, self._failed)
+
+    def stalled_ids(self):
+        now = time.monotonic()
+        if self._paused:
+            return []
+        return [aid for aid in self._active
+                if aid not in self._preempted and now - self._progress_at.get(aid, now) > self.STALL_SECONDS]
+
+    def _emit_throughput(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_throughput < self.THROUGHPUT_INTERVAL:
+            return
+        self._last_throughput = now
+        elapsed = now - self._batch_started if self._batch_started else 0.0
+        done = self._succeeded + self._failed
+        rate = (self._succeeded * 60.0 / elapsed) if elapsed > 0 else 0.0
+        speed = sum(self._progress.get(aid, {}).get('speed', 0.0) for aid in self._active)
+        total_bytes = self._bytes_finished + sum(snap.get('bytes', 0) for snap in self._progress.values())
+        text = (f"进行中 {self._slots_used()}/{self.max_workers}，排队 {self.pending_count()}，"
+                f"已完成 {done}（失败 {self._failed}），{rate:.1f} 本/分钟，"
+                f"{format_bytes(speed)}/s，共 {format_bytes(total_bytes)}")
+        if self._preempted:
+            text += f"，让位暂停 {len(self._preempted)}"
+        stalled = self.stalled_ids()
+        if stalled:
+            text += f"，停滞 {len(stalled)}"
+        throttled = sum(h['throttled'] for h in limiter.stats())
+        if throttled:
+            text += f"，被限流 {throttled} 次"
+        self.throughput_changed.emit(text)
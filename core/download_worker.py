@@ -1,8 +1,9 @@
 import os
-import shutil
-from pathlib import Path
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from core.cancellation import CancelToken
+from core.retry import RetryPolicy
+
 try:
     import jmcomic
     JM_AVAILABLE = True
@@ -13,100 +14,83 @@ except Exception:
 
 class DownloadWorker(QThread):
     """从旧 DownloadThread 迁移的下载线程实现"""
-    progress_updated = pyqtSignal(int, int)  # current, total
+    progress_updated = pyqtSignal(int, int)  # current, total（图片数）
+    progress_detail = pyqtSignal(dict)  # ProgressTracker.snapshot()，已合并节流
     status_changed = pyqtSignal(str)
     download_finished = pyqtSignal(bool, str)
 
-    def __init__(self, album_id: str, save_path: str, option=None, workspace_dir: str = ""):
+    def __init__(self, album_id: str, save_path: str, option=None, workspace_dir: str = "", resume: bool = True,
+                 retries: int = 3, transcoder=None, output: str = 'folder',
+                 dedupe: bool = False, chapter_workers: int = 3,
+                 verify_decode: bool = False, image_workers: int = 8, index=None):
         super().__init__()
         self.album_id = album_id
         self.save_path = save_path
         self.option = option
-        self.workspace_dir = workspace_dir
+        self.workspace_dir = workspace_dir or save_path
+        self.resume = resume
+        self.retry = RetryPolicy(retries)
+        self.transcoder = transcoder
+        self.output = output
+        self.dedupe = dedupe
+        self.chapter_workers = chapter_workers
+        self.verify_decode = verify_decode
+        self.image_workers = image_workers
+        self.index = index
         self.is_running = True
+        self.token = CancelToken()
+
+    # 协作式控制：在章节/图片之间生效，不强杀线程
+    def stop(self):
+        self.is_running = False
+        self.token.cancel()
+        self.requestInterruption()
+
+    def pause(self):
+        self.token.pause()
+
+    def resume_download(self):
+        self.token.resume()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    @property
+    def paused(self) -> bool:
+        return self.token.paused
+
+    def _on_progress(self, snap: dict):
+        self.progress_detail.emit(snap)
+        self.progress_updated.emit(snap.get('images_done', 0), snap.get('images_total', 0))
 
     def run(self):
         try:
             self.status_changed.emit(f"开始下载漫画 {self.album_id}...")
 
             if JM_AVAILABLE:
-                option = self.option if self.option else jmcomic.JmOption.default()
-                old_cwd = os.getcwd()
-                exe_dir = Path(getattr(__import__('sys'), 'frozen', False) and os.path.dirname(__import__('sys').executable) or old_cwd)
-                try:
-                    if self.workspace_dir:
-                        os.makedirs(self.workspace_dir, exist_ok=True)
-                        os.chdir(self.workspace_dir)
-                    jmcomic.download_album(self.album_id, option)
-                finally:
-                    try:
-                        os.chdir(old_cwd)
-                    except Exception:
-                        pass
-
-                # 标记完成
-                self.progress_updated.emit(100, 100)
-
-                # 纠错迁移：若库把内容写到了 EXE 同级的 JMComic 下，迁移到目标 workspace/JMComic
-                try:
-                    target_ws = Path(self.workspace_dir) if self.workspace_dir else Path(old_cwd)
-                    target_jm = target_ws / 'JMComic'
-                    src_jm = exe_dir / 'JMComic'
-                    if src_jm.exists() and src_jm.is_dir() and (src_jm.resolve() != target_jm.resolve()):
-                        target_jm.mkdir(parents=True, exist_ok=True)
-                        for name in os.listdir(src_jm):
-                            s = src_jm / name
-                            d = target_jm / name
-                            if s.is_dir():
-                                if not d.exists():
-                                    shutil.move(str(s), str(d))
-                                else:
-                                    for root, _dirs, files in os.walk(s):
-                                        rel = Path(root).relative_to(s)
-                                        (d / rel).mkdir(parents=True, exist_ok=True)
-                                        for f in files:
-                                            shutil.move(str(Path(root) / f), str(d / rel / f))
-                                    shutil.rmtree(s, ignore_errors=True)
-                            else:
-                                shutil.move(str(s), str(d))
-                        try:
-                            os.rmdir(src_jm)
-                        except Exception:
-                            pass
-                    # 扁平化：若目标 workspace 下仍存在 JMComic 子目录，则将其内容上移至 workspace 根并删除 JMComic
-                    if target_jm.exists() and target_jm.is_dir():
-                        for name in os.listdir(target_jm):
-                            s = target_jm / name
-                            d = target_ws / name
-                            if d.exists():
-                                if s.is_dir():
-                                    for root, _dirs, files in os.walk(s):
-                                        rel = Path(root).relative_to(s)
-                                        (d / rel).mkdir(parents=True, exist_ok=True)
-                                        for f in files:
-                                            shutil.move(str(Path(root) / f), str(d / rel / f))
-                                    shutil.rmtree(s, ignore_errors=True)
-                                else:
-                                    base = d.stem
-                                    ext = d.suffix
-                                    k = 1
-                                    nd = d
-                                    while nd.exists():
-                                        nd = d.with_name(f"{base}_{k}{ext}")
-                                        k += 1
-                                    shutil.move(str(s), str(nd))
-                            else:
-                                shutil.move(str(s), str(d))
-                        try:
-                            os.rmdir(target_jm)
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-
-                self.download_finished.emit(True, f"漫画 {self.album_id} 下载完成！")
+                if self.option is None:
+                    # 未显式传入选项时使用默认网络设置；下载根目录由 workspace_dir 决定，不切换进程工作目录
+                    from core.jm_option import get_jm_option
+                    self.option = get_jm_option()
+                if self.workspace_dir:
+                    os.makedirs(self.workspace_dir, exist_ok=True)
+                # 逐图下载并记录专辑清单，续传时只补下缺失部分
+                from core.album_downloader import AlbumDownloader
+                engine = AlbumDownloader(self.album_id, self.option, self.workspace_dir,
+                                         resume=self.resume, on_status=self.status_changed.emit,
+                                         token=self.token, on_progress=self._on_progress,
+                                         retry=self.retry, transcoder=self.transcoder,
+                                         output=self.output, dedupe=self.dedupe,
+                                         chapter_workers=self.chapter_workers,
+                                         verify_decode=self.verify_decode, image_workers=self.image_workers,
+                                         index=self.index)
+                ok, message = engine.run()
+                self.download_finished.emit(ok, message)
             else:
                 # 未安装 jmcomic：发出失败提示
                 self.download_finished.emit(False, "未安装 jmcomic 库，无法下载")
         except Exception as e:
             self.download_finished.emit(False, f"下载失败: {e}")
+        finally:
+            self.is_running = False
@@ -0,0 +1,106 @@
+import threading
+from typing import Dict, Optional
+
+try:
+    import cloudscraper
+    from cloudscraper import CipherSuiteAdapter
+    CLOUDSCRAPER_AVAILABLE = True
+except Exception:
+    cloudscraper = None
+    CipherSuiteAdapter = None
+    CLOUDSCRAPER_AVAILABLE = False
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except Exception:
+    requests = None
+    HTTPAdapter = None
+    REQUESTS_AVAILABLE = False
+
+# 每个主机保持的连接数上限；超出时请求在连接池里排队，不再新建连接（新连接意味着新的 TLS 握手）
+MAX_CONNECTIONS_PER_HOST = 16
+# 同时保留连接池的主机数（镜像 + 图床，通常个位数）
+MAX_HOSTS = 32
+
+
+def proxies_for(proxy: str) -> Optional[Dict[str, str]]:
+    proxy = (proxy or '').strip()
+    if proxy.startswith("http://") or proxy.startswith("https://"):
+        return {"http": proxy, "https": proxy}
+    return None
+
+
+class SessionPool:
+    """进程级共享 HTTP 会话：搜索、封面等所有页面请求共用一个 cloudscraper 会话。
+
+    - keep-alive：按主机复用连接，只有第一次请求付出 TCP/TLS 握手；
+    - 每主机连接数上限 MAX_CONNECTIONS_PER_HOST，达到上限时排队等待空闲连接；
+    - Cookie（含 Cloudflare 挑战通过后的 cf_clearance）保存在同一个会话里，一次挑战全局生效。
+    requests 的 Session 可被多线程共用发起请求；代理按请求传入，不同代理的连接分别入池。
+    未安装 cloudscraper 时退化为普通 requests 会话。
+    """
+
+    def __init__(self, max_per_host: int = MAX_CONNECTIONS_PER_HOST, max_hosts: int = MAX_HOSTS):
+        self.max_per_host = max_per_host
+        self.max_hosts = max_hosts
+        self._session = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def available(self) -> bool:
+        return CLOUDSCRAPER_AVAILABLE or REQUESTS_AVAILABLE
+
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = self._create()
+            return self._session
+
+    def _pool_kwargs(self) -> Dict:
+        # 重试由 RetryPolicy 统一负责，连接层不再自行重试
+        return dict(pool_connections=self.max_hosts, pool_maxsize=self.max_per_host, pool_block=True,
+                    max_retries=0)
+
+    def _create(self):
+        if CLOUDSCRAPER_AVAILABLE:
+            session = cloudscraper.create_scraper()
+            # https 必须保留 cloudscraper 的 CipherSuiteAdapter（自定义密码套件与 ECDH 曲线是通过
+            # Cloudflare 检测的关键），只按同样的 TLS 参数重建一个带连接池上限的实例
+            old = session.get_adapter('https://')
+            if isinstance(old, CipherSuiteAdapter):
+                session.mount('https://', type(old)(
+                    cipherSuite=old.cipherSuite, ecdhCurve=old.ecdhCurve, server_hostname=old.server_hostname,
+                    source_address=old.source_address, ssl_context=old.ssl_context, **self._pool_kwargs()))
+                old.close()
+            session.mount('http://', HTTPAdapter(**self._pool_kwargs()))
+            return session
+        if REQUESTS_AVAILABLE:
+            session = requests.Session()
+            adapter = HTTPAdapter(**self._pool_kwargs())
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            return session
+        raise RuntimeError("未安装 cloudscraper/requests")
+
+    def get(self, url: str, timeout: float = 30, proxy: str = '', **kwargs):
+        session = self.session()
+        with self._stats_lock:
+            self.requests += 1
+        try:
+            return session.get(url, timeout=timeout, proxies=proxies_for(proxy), **kwargs)
+        except Exception:
+            with self._stats_lock:
+                self.errors += 1
+            raise
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {'requests': self.requests, 'errors': self.errors, 'open': self._session is not None}
+
+
+http_pool = SessionPool()
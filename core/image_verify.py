@@ -0,0 +1,79 @@
+import os
+from typing import Optional
+
+MIN_IMAGE_BYTES = 64
+_TAIL = 32
+# JPEG 结束标记之后常有填充或编辑器附加的数据，在更大的尾部窗口里找；不超过该大小的文件整份读入
+_JPEG_TAIL = 64 * 1024
+JPEG_EOI = b'\xff\xd9'
+JPEG_SOS = b'\xff\xda'
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_IEND = b'IEND\xaeB`\x82'
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """按文件头识别格式（不看后缀，转码/解码后后缀可能与内容不符）"""
+    if head[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if head[:8] == PNG_SIGNATURE:
+        return 'png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:2] == b'BM':
+        return 'bmp'
+    if head[4:8] == b'ftyp':
+        return 'avif'
+    return None
+
+
+def _jpeg_complete(tail: bytes) -> bool:
+    # 结束标记须在最后一个扫描段之后：EXIF 缩略图自带的结束标记不能替截断的主图过关
+    eoi = tail.rfind(JPEG_EOI)
+    return eoi >= 0 and eoi > tail.rfind(JPEG_SOS)
+
+
+def verify_image(path, decode: bool = False) -> Optional[str]:
+    """校验单张图片是否完整，返回 None 表示通过，否则返回原因。
+
+    默认只读文件头尾（大小、格式签名、结束标记/声明长度），代价与一次 stat 相当；
+    decode=True 时再用 Pillow 完整解码一遍（未安装 Pillow 时跳过这一步）。
+    可在子进程中执行。
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            n = _JPEG_TAIL if head[:3] == b'\xff\xd8\xff' else _TAIL
+            f.seek(max(0, size - n))
+            tail = f.read(n)
+    except OSError as e:
+        return f"无法读取: {e}"
+    if size < MIN_IMAGE_BYTES:
+        return f"文件过小（{size} B）"
+    kind = sniff(head)
+    if kind is None:
+        return "未知的图片格式"
+    if kind == 'jpeg' and not _jpeg_complete(tail):
+        return "JPEG 缺少结束标记（文件被截断）"
+    if kind == 'png' and not tail.endswith(PNG_IEND):
+        return "PNG 缺少 IEND（文件被截断）"
+    if kind == 'gif' and not tail.rstrip(b'\x00').endswith(b';'):
+        return "GIF 缺少结束符（文件被截断）"
+    if kind == 'webp' and int.from_bytes(head[4:8], 'little') + 8 > size:
+        return "WEBP 长度不足（文件被截断）"
+    if kind == 'bmp' and int.from_bytes(head[2:6], 'little') > size:
+        return "BMP 长度不足（文件被截断）"
+    if decode:
+        try:
+            from PIL import Image
+        except Exception:
+            return None
+        try:
+            with Image.open(path) as im:
+                im.load()
+        except Exception as e:
+            return f"解码失败: {e}"
+    return None
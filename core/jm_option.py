@@ -1,4 +1,14 @@
-from pathlib import Path
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from core.cancellation import DownloadCancelled
+from core.mirror_health import mirror_health
+from core.rate_limit import limiter
+from core.retry import RetryPolicy, status_of
 
 try:
     import jmcomic
@@ -8,16 +18,159 @@ except Exception:
     JM_AVAILABLE = False
 
 
-def create_jm_option(workspace: str, config_dir: Path | None = None):
-    """创建 jmcomic 的 Option。
-    为适配不同版本的 jmcomic，这里优先返回默认选项，不直接传入 path 等可能不兼容的参数。
-    下载目录通过 DownloadWorker 的工作目录切换与后续迁移逻辑确保正确落地。
+# 最多同时保留的配置数（下载目录或网络设置变化时才会产生新条目）
+_CACHE_SIZE = 4
+# 共享客户端按镜像健康表重排域名的间隔（秒）
+_RERANK_INTERVAL = 60.0
+_cache: 'OrderedDict[str, object]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def option_dict(proxy: str = '', timeout: int = 30, image_threads: int = 8, photo_threads: int = 3) -> Dict:
+    """按 jmcomic option 配置格式组装：代理、超时与图片/章节线程数。
+
+    不含 dir_rule：保存位置由 AlbumDownloader 的 save_path 决定（album_dir_for），jmcomic 不参与落盘路径。
+    客户端自身不重试（retry_times=0）：重试统一由外层 RetryPolicy 负责，
+    否则两层重试相乘，且限速器与镜像健康表只看得到外层的尝试。
     """
-    if not JM_AVAILABLE:
-        return None
+    meta: Dict = {'timeout': int(timeout)}
+    if proxy:
+        meta['proxies'] = {'http': proxy, 'https': proxy}
+    return {
+        'client': {'retry_times': 0, 'postman': {'meta_data': meta}},
+        'download': {'threading': {'image': int(image_threads), 'photo': int(photo_threads)}},
+    }
+
+
+def settings_option_dict(settings) -> Dict:
+    return option_dict(proxy=settings.get_proxy().strip(), timeout=settings.get_timeout(),
+                       image_threads=settings.get_image_threads(), photo_threads=settings.get_chapter_workers())
 
+
+def _build(cfg: Dict) -> Tuple[Optional[object], str]:
+    """返回 (option, 警告)。为适配不同版本的 jmcomic：完整配置构建失败时退回 JmOption.default()；
+    退回后代理、超时与线程数设置不会生效，警告说明原因，由调用方展示给用户。
+    """
     try:
-        # 始终返回默认配置，避免因 __init__ 签名变化导致报错
-        return jmcomic.JmOption.default()
+        return jmcomic.JmOption.construct(cfg), ''
+    except Exception as e:
+        warning = f"jmcomic 不接受当前网络设置（{e}），已退回默认配置：代理、超时与线程数设置未生效"
+    try:
+        return jmcomic.JmOption.default(), warning
     except Exception:
+        return None, warning
+
+
+class SharedClientOption:
+    """包装 JmOption：build_jm_client() 只构建一次，同一配置下的所有专辑共用一个客户端与连接池。
+
+    jmcomic 自身的下载器也是多线程共用一个客户端，这里沿用同样的用法。
+    客户端的域名列表定期按镜像健康表重排，最快的健康域名排在最前；详情接口经 call_api 请求，
+    其耗时与成败同样记入健康表。
+    """
+
+    def __init__(self, option, key: str, warning: str = ''):
+        self._option = option
+        self.key = key
+        # 非空表示完整配置构建失败、已退回默认配置
+        self.warning = warning
+        self._client = None
+        self._ranked_at = 0.0
+        self._lock = threading.Lock()
+
+    def build_jm_client(self, **kwargs):
+        if kwargs:
+            return self._option.build_jm_client(**kwargs)
+        with self._lock:
+            if self._client is None:
+                self._client = self._option.build_jm_client()
+            if time.monotonic() - self._ranked_at >= _RERANK_INTERVAL:
+                self._ranked_at = time.monotonic()
+                rank_client_domains(self._client)
+            return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._option, name)
+
+
+def rank_client_domains(client) -> None:
+    # 不同版本的 jmcomic 客户端不一定提供域名列表接口，缺失时保持原样
+    getter = getattr(client, 'get_domain_list', None)
+    setter = getattr(client, 'set_domain_list', None)
+    if not callable(getter) or not callable(setter):
+        return
+    try:
+        domains = list(getter() or [])
+        if len(domains) > 1:
+            setter(mirror_health.rank(domains))
+    except Exception:
+        pass
+
+
+def api_host(client) -> str:
+    """客户端当前请求的域名（域名列表第一项，客户端自身不重试时只用这一个）；取不到时为空串"""
+    getter = getattr(client, 'get_domain_list', None)
+    try:
+        domains = list(getter() or []) if callable(getter) else []
+    except Exception:
+        domains = []
+    return str(domains[0]) if domains else ''
+
+
+def call_api(client, fn: Callable, retry, token=None, on_retry=None):
+    """专辑/章节详情等接口请求：每次尝试都经过该域名的主机限速，与图片、搜索请求共用额度。
+
+    结果记入镜像健康表；域名本身的故障（超时、连接失败、限流或 5xx）后立即按健康表重排域名列表，
+    下一次尝试换到更健康的域名。专辑不存在等与域名无关的错误不计入。
+    """
+    def attempt():
+        host = api_host(client)
+        with limiter.slot(host or 'jmcomic-api', token) as slot:
+            start = time.monotonic()
+            try:
+                result = fn()
+            except DownloadCancelled:
+                raise
+            except Exception as e:
+                slot['status'] = status_of(e)
+                if host and RetryPolicy.is_retryable(e):
+                    mirror_health.record(host, None, False, str(e))
+                    rank_client_domains(client)
+                raise
+            if host:
+                mirror_health.record(host, time.monotonic() - start, True)
+            return result
+    return retry.call(attempt, token=token, on_retry=on_retry)
+
+
+def get_jm_option(settings=None):
+    """按设置构建并缓存 Option；以相关设置的哈希为键，设置不变时批量下载（含不同保存路径）复用同一个客户端"""
+    if not JM_AVAILABLE:
+        return None
+    cfg = settings_option_dict(settings) if settings is not None else option_dict()
+    key = hashlib.sha1(json.dumps(cfg, sort_keys=True).encode('utf-8')).hexdigest()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+    option, warning = _build(cfg)
+    if option is None:
+        return None
+    shared = SharedClientOption(option, key, warning)
+    with _cache_lock:
+        # 并发首次构建时以先写入的为准
+        shared = _cache.setdefault(key, shared)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return shared
+
+
+def create_jm_option():
+    """创建不带缓存的 Option（默认网络设置）。
+    下载根目录不经过 Option：由每个下载线程的 save_path 决定，不依赖进程工作目录。
+    """
+    if not JM_AVAILABLE:
         return None
+    return _build(option_dict())[0]
@@ -0,0 +1,186 @@
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.album_manifest import MANIFEST_NAME, AlbumManifest
+from core.cbz_writer import CBZ_SUFFIX, PART_SUFFIX, read_album_id
+
+# 已在库中的专辑再次加入下载时的处理方式
+POLICY_SKIP = 'skip'  # 完整的专辑直接跳过，不发任何请求
+POLICY_VERIFY = 'verify'  # 照常下载，续传校验已有图片、只补缺失部分
+POLICY_FORCE = 'force'  # 不续传，整本重新下载
+POLICIES = (POLICY_SKIP, POLICY_VERIFY, POLICY_FORCE)
+
+
+def _root_key(root) -> str:
+    return str(Path(root).resolve())
+
+
+def _mtime(path) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+class LibraryIndex:
+    """已下载索引（SQLite）：~/.jmcomic_downloader/library.db，(下载根目录, 专辑 ID) → 漫画库条目。
+
+    下载引擎每跑完一本专辑就登记一次（含是否完整）；scan() 按清单/归档的修改时间增量补录
+    手动放入或索引建立前下载的专辑，未变化的条目只 stat 一次。
+    入队与派发前据此判断专辑是否已在库中，跳过时不产生任何网络请求。
+    """
+
+    def __init__(self, config_dir: Path):
+        self.config_dir = Path(config_dir)
+        self.file = self.config_dir / "library.db"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def open(self) -> 'LibraryIndex':
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.file), check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS albums ("
+            " root TEXT NOT NULL,"
+            " album_id TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " kind TEXT NOT NULL DEFAULT 'folder',"
+            " title TEXT NOT NULL DEFAULT '',"
+            " images INTEGER NOT NULL DEFAULT 0,"
+            " complete INTEGER NOT NULL DEFAULT 0,"
+            " mtime REAL NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (root, album_id))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_albums_path ON albums(path)")
+        self._conn = conn
+        return self
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    @staticmethod
+    def _stamp_file(path: Path, kind: str) -> Path:
+        # 散图专辑以清单文件的修改时间为准，CBZ 以归档本身为准
+        return path / MANIFEST_NAME if kind == 'folder' else path
+
+    def record(self, root, album_id: str, path, kind: str = 'folder', title: str = '', images: int = 0,
+               complete: bool = False) -> None:
+        path = Path(path)
+        self._execute(
+            "INSERT OR REPLACE INTO albums(root, album_id, path, kind, title, images, complete, mtime, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (_root_key(root), str(album_id), str(path), kind, title or '', int(images), int(bool(complete)),
+             _mtime(self._stamp_file(path, kind)), time.time()))
+
+    def lookup(self, root, album_id: str) -> Optional[Dict]:
+        """返回库中条目；文件已被删除或移走的条目顺带清理并返回 None"""
+        row = self._execute("SELECT * FROM albums WHERE root=? AND album_id=?",
+                            (_root_key(root), str(album_id).strip())).fetchone()
+        if row is None:
+            return None
+        if not os.path.exists(row['path']):
+            self.forget_path(row['path'])
+            return None
+        return dict(row)
+
+    def forget_path(self, path) -> int:
+        return self._execute("DELETE FROM albums WHERE path=?", (str(path),)).rowcount
+
+    def count(self, root=None) -> int:
+        if root is None:
+            return self._execute("SELECT COUNT(*) FROM albums").fetchone()[0]
+        return self._execute("SELECT COUNT(*) FROM albums WHERE root=?", (_root_key(root),)).fetchone()[0]
+
+    # ---- 补录 ----
+    def scan(self, root, token=None) -> int:
+        """增量扫描下载根目录的第一层，返回新登记/更新的条目数；token 取消后在下一个条目前停止"""
+        root_key = _root_key(root)
+        known = {r['path']: r['mtime'] for r in
+                 self._execute("SELECT path, mtime FROM albums WHERE root=?", (root_key,)).fetchall()}
+        seen = set()
+        changed = 0
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            return 0
+        for entry in entries:
+            if token is not None and token.cancelled:
+                return changed
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                kind = 'folder'
+            elif entry.name.lower().endswith(CBZ_SUFFIX) or entry.name.lower().endswith(CBZ_SUFFIX + PART_SUFFIX):
+                kind = 'cbz'
+            else:
+                continue
+            path = Path(entry.path)
+            stamp = self._stamp_file(path, kind)
+            if kind == 'folder' and not stamp.exists():
+                continue
+            seen.add(str(path))
+            if str(path) in known and known[str(path)] == _mtime(stamp):
+                continue
+            info = self._read_folder(path) if kind == 'folder' else self._read_cbz(path)
+            if info is None:
+                continue
+            self.record(root, path=path, kind=kind, **info)
+            changed += 1
+        gone = [p for p in known if p not in seen and not os.path.exists(p)]
+        for p in gone:
+            self.forget_path(p)
+        return changed
+
+    @staticmethod
+    def _read_folder(path: Path) -> Optional[Dict]:
+        manifest = AlbumManifest(path).load()
+        album_id = manifest.meta.get('album_id')
+        if not album_id:
+            return None
+        images = manifest.images.values()
+        done = sum(1 for rec in images if rec.get('state') == 'done')
+        # 只有整本校验通过（verified）且没有失败记录的专辑才算完整
+        complete = bool(manifest.meta.get('verified')) and done == len(manifest.images) and done > 0
+        return dict(album_id=str(album_id), title=manifest.meta.get('title', ''), images=done, complete=complete)
+
+    @staticmethod
+    def _read_cbz(path: Path) -> Optional[Dict]:
+        try:
+            album_id = read_album_id(path)
+            with zipfile.ZipFile(path) as zf:
+                images = len(zf.namelist())
+        except (zipfile.BadZipFile, OSError):
+            return None
+        if not album_id:
+            return None
+        # 未完成的归档保持 .cbz.part 后缀
+        complete = path.name.lower().endswith(CBZ_SUFFIX)
+        title = path.name[:-len(CBZ_SUFFIX)] if complete else path.name[:-len(CBZ_SUFFIX + PART_SUFFIX)]
+        return dict(album_id=album_id, title=title, images=images, complete=complete)
+
+
+def should_skip(entry: Optional[Dict], policy: str) -> bool:
+    return entry is not None and bool(entry.get('complete')) and policy == POLICY_SKIP
+
+
+def skip_message(entry: Dict) -> str:
+    return f"漫画 {entry['album_id']} 已在漫画库中（{Path(entry['path']).name}，{entry['images']} 张），跳过"
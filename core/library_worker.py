@@ -0,0 +1,24 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.cancellation import CancelToken
+
+
+class LibraryScanWorker(QThread):
+    """后台补录已下载索引：大漫画库要逐个 stat 目录、读取清单与 CBZ 注释，不放在界面线程"""
+    scan_finished = pyqtSignal(str, int, str)  # 下载根目录，新登记/更新的条目数，错误信息
+
+    def __init__(self, index, root: str):
+        super().__init__()
+        self.index = index
+        self.root = root
+        self.token = CancelToken()
+
+    def stop(self):
+        self.token.cancel()
+
+    def run(self):
+        try:
+            changed = self.index.scan(self.root, token=self.token)
+            self.scan_finished.emit(self.root, changed, "")
+        except Exception as e:
+            self.scan_finished.emit(self.root, 0, f"扫描漫画库失败: {e}")
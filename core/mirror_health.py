@@ -0,0 +1,173 @@
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+CONFIG_DIR = Path.home() / ".jmcomic_downloader"
+
+# 连续失败达到该次数后隔离，隔离时长按次数翻倍，封顶 MAX_QUARANTINE 秒
+QUARANTINE_AFTER = 3
+BASE_QUARANTINE = 30.0
+MAX_QUARANTINE = 1800.0
+# 没有记录的镜像按该延迟参与排序：比已知慢的健康镜像优先，比已知出故障的靠前
+UNKNOWN_LATENCY = 1.5
+# 写盘节流（秒）；退出时再补写一次
+SAVE_INTERVAL = 10.0
+
+
+def host_of(url_or_host: str) -> str:
+    host = urlsplit(url_or_host).hostname if '://' in url_or_host else url_or_host
+    return (host or '').strip().lower()
+
+
+class MirrorStats:
+    """单个主机的健康统计：延迟与成功率为 EWMA，连续失败决定隔离"""
+
+    def __init__(self, data: Optional[Dict] = None):
+        data = data or {}
+        self.latency: Optional[float] = data.get('latency')
+        self.success_rate: float = float(data.get('success_rate', 1.0))
+        self.requests: int = int(data.get('requests', 0))
+        self.failures: int = int(data.get('failures', 0))
+        self.consecutive_failures: int = int(data.get('consecutive_failures', 0))
+        self.last_failure: float = float(data.get('last_failure', 0.0))
+        self.last_error: str = str(data.get('last_error', ''))
+        self.quarantined_until: float = float(data.get('quarantined_until', 0.0))
+
+    def record(self, latency: Optional[float], ok: bool, error: str = '', now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self.requests += 1
+        self.success_rate = self.success_rate * 0.8 + (0.2 if ok else 0.0)
+        if ok:
+            if latency is not None:
+                self.latency = latency if self.latency is None else self.latency * 0.7 + latency * 0.3
+            self.consecutive_failures = 0
+            self.quarantined_until = 0.0
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_failure = now
+        self.last_error = error[:200]
+        if self.consecutive_failures >= QUARANTINE_AFTER:
+            span = BASE_QUARANTINE * (2 ** (self.consecutive_failures - QUARANTINE_AFTER))
+            self.quarantined_until = now + min(MAX_QUARANTINE, span)
+
+    def quarantined(self, now: Optional[float] = None) -> bool:
+        return self.quarantined_until > (time.time() if now is None else now)
+
+    def score(self) -> float:
+        # 期望耗时：延迟 / 成功率（成功率低的镜像相当于要多试几次）
+        latency = self.latency if self.latency is not None else UNKNOWN_LATENCY
+        return latency / max(self.success_rate, 0.05)
+
+    def to_dict(self) -> Dict:
+        return {k: getattr(self, k) for k in ('latency', 'success_rate', 'requests', 'failures',
+                                                'consecutive_failures', 'last_failure', 'last_error',
+                                                'quarantined_until')}
+
+
+class MirrorHealth:
+    """进程级镜像健康表：~/.jmcomic_downloader/mirrors.json。
+
+    搜索、封面与图片下载在每次请求后记录耗时与成败；rank() 按期望耗时排序，
+    隔离中的镜像排到最后（仍作为最后手段保留）。统计跨进程重启保留，
+    启动后第一个请求就从历史上最快的健康镜像开始，不必每次重新发现故障。
+    """
+
+    def __init__(self, path: Optional[Path] = CONFIG_DIR / "mirrors.json"):
+        self.path = Path(path) if path else None
+        self._hosts: Dict[str, MirrorStats] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def configure(self, path: Optional[Path]) -> None:
+        """更换持久化位置；None 表示只在内存中统计（基准测试等场景）"""
+        with self._lock:
+            self.path = Path(path) if path else None
+            self._hosts = {}
+            self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with self.path.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._hosts = {host: MirrorStats(d) for host, d in data.items() if isinstance(d, dict)}
+        except Exception:
+            self._hosts = {}
+
+    def record(self, url_or_host: str, latency: Optional[float], ok: bool, error: str = '') -> None:
+        host = host_of(url_or_host)
+        if not host:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            stats = self._hosts.get(host)
+            if stats is None:
+                stats = self._hosts[host] = MirrorStats()
+            stats.record(latency, ok, error)
+            self._dirty = True
+            due = time.monotonic() - self._saved_at >= SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def get(self, url_or_host: str) -> Optional[MirrorStats]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._hosts.get(host_of(url_or_host))
+
+    def is_quarantined(self, url_or_host: str) -> bool:
+        stats = self.get(url_or_host)
+        return stats is not None and stats.quarantined()
+
+    def rank(self, mirrors: Iterable[str]) -> List[str]:
+        """按健康度排序（入参可以是 URL 或主机名，原样返回）；分数相同保持原顺序"""
+        mirrors = list(mirrors)
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            keys = []
+            for i, m in enumerate(mirrors):
+                stats = self._hosts.get(host_of(m))
+                if stats is None:
+                    keys.append((0, UNKNOWN_LATENCY, i))
+                else:
+                    keys.append((1 if stats.quarantined(now) else 0, stats.score(), i))
+        return [mirrors[k[2]] for k in sorted(keys)]
+
+    def save(self) -> None:
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = {host: s.to_dict() for host, s in self._hosts.items()}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        with self._save_lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + '.tmp')
+                with tmp.open('w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return {host: s.to_dict() for host, s in self._hosts.items()}
+
+
+mirror_health = MirrorHealth()
+atexit.register(mirror_health.save)
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+def format_bytes(n: float) -> str:
+    n = float(n or 0)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024.0
+    return f"{n:.1f} GB"
+
+
+def format_eta(seconds: float) -> str:
+    if seconds is None or seconds < 0:
+        return '--:--'
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+class ProgressTracker:
+    """单专辑下载进度统计：图片数、字节数、当前章节、瞬时/平均速度与剩余时间。
+
+    image_done() 可在任意下载线程中调用；回调按 min_interval 合并，
+    无论图片完成得多快，界面每秒只收到有限几次更新。
+    """
+
+    def __init__(self, on_emit: Optional[Callable[[Dict], None]] = None,
+                 min_interval: float = 0.25, window: float = 5.0):
+        self.on_emit = on_emit or (lambda _snap: None)
+        self.min_interval = min_interval
+        self.window = window
+        self.images_done = 0
+        # 续传跳过的图片：计入完成数，但不参与速度与剩余时间估算
+        self.images_skipped = 0
+        self.images_total = 0
+        self.bytes_done = 0
+        self.chapter = 0
+        self.chapter_name = ''
+        self.transcoded = 0
+        self.chapters_total = 0
+        self.chapters_done = 0
+        self.started = time.monotonic()
+        self.updated = self.started
+        self._samples = deque()  # (t, bytes)
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def set_total(self, n: int) -> None:
+        with self._lock:
+            self.images_total = max(int(n), self.images_done)
+        self._maybe_emit()
+
+    def set_chapter(self, index: int, name: str = '') -> None:
+        with self._lock:
+            self.chapter = index
+            self.chapter_name = name or ''
+        self._maybe_emit(force=True)
+
+    def set_chapters(self, n: int) -> None:
+        with self._lock:
+            self.chapters_total = int(n)
+        self._maybe_emit(force=True)
+
+    def chapter_done(self) -> None:
+        with self._lock:
+            self.chapters_done += 1
+        self._maybe_emit(force=True)
+
+    def image_done(self, nbytes: int = 0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.images_done += 1
+            self.images_total = max(self.images_total, self.images_done)
+            if nbytes:
+                self.bytes_done += nbytes
+                self._samples.append((now, nbytes))
+            self.updated = now
+        self._maybe_emit()
+
+    def image_skipped(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.images_done += 1
+            self.images_skipped += 1
+            self.images_total = max(self.images_total, self.images_done)
+            self.updated = now
+        self._maybe_emit()
+
+    def add_transcoded(self, n: int = 1) -> None:
+        with self._lock:
+            self.transcoded += n
+        self._maybe_emit()
+
+    def flush(self) -> None:
+        self._maybe_emit(force=True)
+
+    def snapshot(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            while self._samples and now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+            recent = sum(b for _t, b in self._samples)
+            span = min(self.window, max(now - self.started, 1e-6))
+            speed = recent / span
+            elapsed = now - self.started
+            avg_speed = self.bytes_done / elapsed if elapsed > 0 else 0.0
+            remaining = max(self.images_total - self.images_done, 0)
+            downloaded = self.images_done - self.images_skipped
+            eta = -1.0
+            if downloaded and remaining:
+                # 按本次实际下载的平均单图耗时估算，受个别慢图影响小；续传跳过的图片几乎不耗时，不计入
+                eta = elapsed / downloaded * remaining
+            elif self.images_total and not remaining:
+                eta = 0.0
+            return {
+                'images_done': self.images_done,
+                'images_skipped': self.images_skipped,
+                'images_total': self.images_total,
+                'bytes': self.bytes_done,
+                'chapter': self.chapter,
+                'chapter_name': self.chapter_name,
+                'speed': speed,
+                'avg_speed': avg_speed,
+                'eta': eta,
+                'elapsed': elapsed,
+                'idle': now - self.updated,
+                'transcoded': self.transcoded,
+                'chapters_done': self.chapters_done,
+                'chapters_total': self.chapters_total,
+            }
+
+    def _maybe_emit(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+        self.on_emit(self.snapshot())
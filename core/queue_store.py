@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# “立即下载”与“优先下载”使用的优先级；数值越大越先派发
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+
+class QueueStore:
+    """持久化下载队列（SQLite，WAL 模式）：~/.jmcomic_downloader/queue.db
+
+    每个专辑一行，记录状态、优先级、尝试次数与时间戳。派发顺序为 priority 降序、seq 升序，
+    由 (state, priority, seq) 索引支撑，入队/出队均为 O(log n)。
+    短作业优先时同一优先级内按页数升序（页数未知的排在最后），由 (state, priority, pages, seq) 索引支撑，
+    页数由专辑元数据预取写入。
+    程序崩溃后重启时，遗留的 running 状态会被恢复为 queued。
+    """
+    STATES = ('queued', 'running', 'done', 'failed', 'stopped')
+
+    def __init__(self, config_dir: Path):
+        self.config_dir = Path(config_dir)
+        self.file = self.config_dir / "queue.db"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def open(self) -> 'QueueStore':
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.file), check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " album_id TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL DEFAULT 'queued',"
+            " priority INTEGER NOT NULL DEFAULT 0,"
+            " seq INTEGER NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " last_error TEXT NOT NULL DEFAULT '',"
+            " pages INTEGER NOT NULL DEFAULT 0)"
+        )
+        # 旧版队列库没有 pages 列
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()}
+        if 'pages' not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN pages INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dispatch ON jobs(state, priority DESC, seq)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_shortest ON jobs(state, priority DESC, pages, seq)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_seq ON jobs(seq)")
+        self._conn = conn
+        # 崩溃恢复：上次未正常结束的任务重新排队
+        self._execute("UPDATE jobs SET state='queued', updated_at=? WHERE state='running'", (time.time(),))
+        return self
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _next_seq(self, front: bool) -> int:
+        if front:
+            row = self._conn.execute("SELECT MIN(seq) FROM jobs").fetchone()
+            return (row[0] if row[0] is not None else 1) - 1
+        row = self._conn.execute("SELECT MAX(seq) FROM jobs").fetchone()
+        return (row[0] if row[0] is not None else 0) + 1
+
+    # ---- 入队/出队 ----
+    def add(self, album_id: str, priority: int = 0, front: bool = False) -> bool:
+        """新增或重新排队；运行中的任务不受影响。返回是否进入 queued 状态"""
+        album_id = str(album_id).strip()
+        if not album_id:
+            return False
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT state FROM jobs WHERE album_id=?", (album_id,)).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO jobs(album_id, state, priority, seq, created_at, updated_at)"
+                        " VALUES (?, 'queued', ?, ?, ?, ?)",
+                        (album_id, int(priority), self._next_seq(front), now, now))
+                    added = True
+                elif row['state'] == 'running':
+                    added = False
+                elif front:
+                    self._conn.execute(
+                        "UPDATE jobs SET state='queued', priority=MAX(priority, ?), seq=?, updated_at=?"
+                        " WHERE album_id=?", (int(priority), self._next_seq(True), now, album_id))
+                    added = True
+                else:
+                    added = row['state'] != 'queued'
+                    if added:
+                        self._conn.execute("UPDATE jobs SET state='queued', updated_at=? WHERE album_id=?",
+                                           (now, album_id))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def requeue(self, states=('failed', 'stopped')) -> int:
+        marks = ','.join('?' for _ in states)
+        cur = self._execute(f"UPDATE jobs SET state='queued', updated_at=? WHERE state IN ({marks})",
+                            (time.time(), *states))
+        return cur.rowcount
+
+    def next_queued(self, exclude: Iterable[str] = (), shortest_first: bool = False) -> Optional[str]:
+        exclude = list(exclude)
+        sql = "SELECT album_id, priority FROM jobs WHERE state='queued'"
+        if exclude:
+            sql += f" AND album_id NOT IN ({','.join('?' for _ in exclude)})"
+        if not shortest_first:
+            row = self._execute(sql + " ORDER BY priority DESC, seq LIMIT 1", exclude).fetchone()
+            return row['album_id'] if row else None
+        # 页数已知与未知的分开取，两条查询分别由 idx_jobs_shortest / idx_jobs_dispatch 按序扫描，无需排序；
+        # 同一优先级内页数已知的先派发
+        known = self._execute(sql + " AND pages > 0 ORDER BY priority DESC, pages, seq LIMIT 1", exclude).fetchone()
+        unknown = self._execute(sql + " AND pages <= 0 ORDER BY priority DESC, seq LIMIT 1", exclude).fetchone()
+        if known is None or (unknown is not None and unknown['priority'] > known['priority']):
+            known = unknown
+        return known['album_id'] if known else None
+
+    def set_priority(self, album_ids: Iterable[str], priority: int) -> int:
+        ids = [str(a) for a in album_ids]
+        if not ids:
+            return 0
+        cur = self._execute(
+            f"UPDATE jobs SET priority=?, updated_at=? WHERE album_id IN ({','.join('?' for _ in ids)})",
+            (int(priority), time.time(), *ids))
+        return cur.rowcount
+
+    def set_pages(self, album_id: str, pages: int) -> None:
+        # 0 表示未知；获取失败记为 -1，避免反复预取
+        self._execute("UPDATE jobs SET pages=? WHERE album_id=?", (int(pages), album_id))
+
+    def missing_pages(self, limit: int = 50) -> List[str]:
+        rows = self._execute("SELECT album_id FROM jobs WHERE state='queued' AND pages=0"
+                             " ORDER BY priority DESC, seq LIMIT ?", (int(limit),)).fetchall()
+        return [r['album_id'] for r in rows]
+
+    def mark_running(self, album_id: str) -> None:
+        self._execute("UPDATE jobs SET state='running', attempts=attempts+1, updated_at=? WHERE album_id=?",
+                      (time.time(), album_id))
+
+    def set_state(self, album_id: str, state: str, error: str = '') -> None:
+        self._execute("UPDATE jobs SET state=?, last_error=?, updated_at=? WHERE album_id=?",
+                      (state, error or '', time.time(), album_id))
+
+    def remove(self, album_ids: Iterable[str]) -> int:
+        ids = [str(a) for a in album_ids]
+        if not ids:
+            return 0
+        cur = self._execute(
+            f"DELETE FROM jobs WHERE state != 'running' AND album_id IN ({','.join('?' for _ in ids)})", ids)
+        return cur.rowcount
+
+    def clear(self, states=('done',)) -> int:
+        marks = ','.join('?' for _ in states)
+        return self._execute(f"DELETE FROM jobs WHERE state IN ({marks})", tuple(states)).rowcount
+
+    # ---- 查询 ----
+    def get(self, album_id: str) -> Optional[Dict]:
+        row = self._execute("SELECT * FROM jobs WHERE album_id=?", (album_id,)).fetchone()
+        return dict(row) if row else None
+
+    def count(self, state: Optional[str] = None) -> int:
+        if state is None:
+            return self._execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return self._execute("SELECT COUNT(*) FROM jobs WHERE state=?", (state,)).fetchone()[0]
+
+    def list_jobs(self) -> List[Dict]:
+        rows = self._execute(
+            "SELECT album_id, state, priority, seq, pages, attempts, last_error FROM jobs ORDER BY priority DESC, seq"
+        ).fetchall()
+        return [dict(r) for r in rows]
@@ -0,0 +1,188 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from core.cancellation import DownloadCancelled
+from core.retry import status_of
+
+# 视为“被限流”的状态码：立即乘性退让
+THROTTLE_STATUS = {429, 503}
+
+
+class TokenBucket:
+    """令牌桶：平均 rate 次/秒，允许 burst 次突发"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def reserve(self) -> float:
+        """取走一个令牌，返回需要等待的秒数（令牌可预支，等待期间其他线程继续排在后面）"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1.0
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate if self.rate > 0 else 1.0
+
+
+class HostThrottle:
+    """单个主机的限速与自适应并发（AIMD）。
+
+    - 请求前先取令牌（rate 次/秒），再占用一个并发名额（limit 个）；
+    - 延迟与错误率健康时并发加法增长（每个完整窗口约 +1）；
+    - 遇到 429/503 并发与速率减半，且每个冷却期内只退让一次，避免连续踩踏。
+    """
+
+    def __init__(self, host: str, rate: float = 8.0, burst: float = 16.0, concurrency: float = 4.0,
+                 min_concurrency: float = 1.0, max_concurrency: float = 32.0,
+                 min_rate: float = 0.5, max_rate: float = 32.0, cooldown: float = 5.0):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.limit = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.cooldown = cooldown
+        self.inflight = 0
+        self.latency_ewma: Optional[float] = None
+        self.latency_floor: Optional[float] = None
+        self.error_ewma = 0.0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, token=None) -> None:
+        wait = self.bucket.reserve()
+        if wait > 0:
+            if token is not None:
+                if token.sleep(wait):
+                    raise DownloadCancelled()
+            else:
+                time.sleep(wait)
+        with self._cond:
+            while self.inflight >= max(1, int(self.limit)):
+                if token is not None and token.cancelled:
+                    raise DownloadCancelled()
+                self._cond.wait(0.5)
+            self.inflight += 1
+
+    def release(self, latency: float, ok: bool, status: Optional[int] = None) -> None:
+        now = time.monotonic()
+        with self._cond:
+            self.inflight = max(0, self.inflight - 1)
+            self.error_ewma = self.error_ewma * 0.9 + (0.0 if ok else 0.1)
+            if ok:
+                self.latency_ewma = latency if self.latency_ewma is None else self.latency_ewma * 0.8 + latency * 0.2
+                # 基线缓慢上浮，避免一次极快的请求把基线永久压低
+                floor = self.latency_floor
+                self.latency_floor = latency if floor is None else min(latency, floor * 1.01)
+            if status in THROTTLE_STATUS:
+                self.throttled += 1
+                self._decrease(now, 0.5, rate_factor=0.5)
+            elif not ok and self.error_ewma > 0.2:
+                self._decrease(now, 0.7)
+            elif ok:
+                slow = (self.latency_floor and self.latency_ewma
+                        and self.latency_ewma > self.latency_floor * 4 and self.latency_ewma > 1.0)
+                if slow:
+                    self._decrease(now, 0.9)
+                elif self.error_ewma < 0.05:
+                    self.limit = min(self.max_concurrency, self.limit + 1.0 / max(self.limit, 1.0))
+                    self.bucket.rate = min(self.max_rate, self.bucket.rate + 0.05)
+            self._cond.notify_all()
+
+    def abandon(self) -> None:
+        """请求被取消：只归还并发名额，不计入错误率与延迟，也不调节并发"""
+        with self._cond:
+            self.inflight = max(0, self.inflight - 1)
+            self._cond.notify_all()
+
+    def _decrease(self, now: float, factor: float, rate_factor: float = 1.0) -> None:
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit * factor)
+        self.bucket.rate = max(self.min_rate, self.bucket.rate * rate_factor)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'host': self.host,
+                'limit': round(self.limit, 2),
+                'rate': round(self.bucket.rate, 2),
+                'inflight': self.inflight,
+                'latency': self.latency_ewma,
+                'error_rate': round(self.error_ewma, 3),
+                'throttled': self.throttled,
+            }
+
+
+class HostLimiter:
+    """进程级主机限速表：搜索、封面与图片下载共用，按主机各自限速与调节并发"""
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self._hosts: Dict[str, HostThrottle] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **defaults) -> None:
+        """替换新主机的默认参数，并清空已有主机的限速状态（基准测试按场景重新开始）"""
+        with self._lock:
+            self.defaults = defaults
+            self._hosts.clear()
+
+    def get(self, url_or_host: str) -> HostThrottle:
+        host = urlsplit(url_or_host).hostname if '://' in url_or_host else url_or_host
+        host = (host or '').lower()
+        with self._lock:
+            throttle = self._hosts.get(host)
+            if throttle is None:
+                throttle = self._hosts[host] = HostThrottle(host, **self.defaults)
+            return throttle
+
+    @contextmanager
+    def slot(self, url: str, token=None):
+        """with limiter.slot(url) as s: resp = ...; s['status'] = resp.status_code"""
+        throttle = self.get(url)
+        throttle.acquire(token)
+        info = {'status': None}
+        start = time.monotonic()
+        ok = False
+        cancelled = False
+        try:
+            yield info
+            status = info['status']
+            ok = status is None or 200 <= status < 400
+        except DownloadCancelled:
+            cancelled = True
+            raise
+        except Exception as e:
+            # 调用方已写入的状态优先；否则从异常（requests / jmcomic）中取
+            if info['status'] is None:
+                info['status'] = status_of(e)
+            raise
+        finally:
+            if cancelled:
+                throttle.abandon()
+            else:
+                throttle.release(time.monotonic() - start, ok, info['status'])
+
+    def stats(self):
+        with self._lock:
+            hosts = list(self._hosts.values())
+        return [h.stats() for h in hosts]
+
+
+limiter = HostLimiter()
@@ -0,0 +1,175 @@
+import http.client
+import random
+import re
+import socket
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+from core.cancellation import DownloadCancelled
+
+# 可重试的 HTTP 状态：限流与网关/服务端临时错误
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 524}
+
+
+def _transient_errors() -> tuple:
+    """可重试的网络异常：超时、连接失败/中断、响应体不完整。
+
+    requests 与 curl_cffi（jmcomic 默认的 postman）的异常都继承 OSError，不能按 OSError 一概而论，
+    只收录各库中表示网络故障的那几类；未安装的库跳过。
+    """
+    errors = [TimeoutError, ConnectionError, socket.timeout, http.client.IncompleteRead, http.client.BadStatusLine]
+    for module, names in (('requests.exceptions', ('Timeout', 'ConnectionError', 'ChunkedEncodingError',
+                                                   'ContentDecodingError')),
+                          ('curl_cffi.requests.exceptions', ('Timeout', 'ConnectionError', 'IncompleteRead',
+                                                             'HTTPError', 'ChunkedEncodingError'))):
+        try:
+            mod = __import__(module, fromlist=list(names))
+        except Exception:
+            continue
+        errors.extend(getattr(mod, name) for name in names if isinstance(getattr(mod, name, None), type))
+    return tuple(errors)
+
+
+TRANSIENT_ERRORS = _transient_errors()
+
+
+class TransientError(Exception):
+    """调用方判定的临时失败（如下载内容校验不通过），需要重试"""
+
+
+class RetryableStatus(TransientError):
+    """响应状态码表示临时失败，需要重试"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {getattr(response, 'status_code', '?')}")
+        self.response = response
+
+
+# jmcomic 的报错信息里带的状态码，如“响应状态码为429”
+_STATUS_IN_MESSAGE = re.compile(r'(?:状态码[为:：]?\s*|HTTP\s*)(\d{3})\b')
+
+
+def response_of(error: Exception):
+    """取异常携带的原始响应：requests 的 e.response，或 jmcomic 异常的 resp（JmResp 包装则取其 .resp）。
+
+    jmcomic 重试耗尽时抛出的 RequestRetryAllFailException 取最后一次失败的异常。
+    """
+    for _ in range(4):
+        response = getattr(error, 'response', None)
+        if response is None:
+            context = getattr(error, 'context', None)
+            response = context.get('resp') if isinstance(context, dict) else None
+        if response is not None:
+            inner = getattr(response, 'resp', None)
+            return inner if inner is not None and not hasattr(response, 'status_code') else response
+        errors = getattr(error, 'errors', None)
+        if not errors or not isinstance(errors, list):
+            return None
+        error = (errors[-1] or {}).get('error') if isinstance(errors[-1], dict) else errors[-1]
+    return None
+
+
+def status_of(error: Exception) -> Optional[int]:
+    """异常对应的 HTTP 状态码；响应对象拿不到时从报错信息里解析，都没有则为 None"""
+    response = response_of(error)
+    status = getattr(response, 'status_code', None)
+    if isinstance(status, int):
+        return status
+    m = _STATUS_IN_MESSAGE.search(str(getattr(error, 'msg', '') or error))
+    return int(m.group(1)) if m else None
+
+
+def parse_retry_after(response) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期），无法解析时返回 None"""
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class RetryPolicy:
+    """搜索、封面、图片下载共用的重试策略：指数退避 + 全抖动，遵循 Retry-After。
+
+    retries 为失败后的重试次数（对应设置中的“重试次数”），总尝试次数为 retries + 1。
+    """
+
+    def __init__(self, retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 max_retry_after: float = 120.0):
+        self.retries = max(0, int(retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        # Full Jitter：在 [0, min(max, base * 2^attempt)] 内均匀取值，避免多线程同时重试
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def delay_for(self, attempt: int, error: Exception) -> float:
+        response = response_of(error)
+        if response is not None:
+            ra = parse_retry_after(response)
+            if ra is not None:
+                return min(ra, self.max_retry_after)
+        return self.backoff(attempt)
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """只重试临时故障：可重试状态码、超时与连接错误。
+        专辑不存在、页面解析失败、本地读写错误等重试也不会变好，立即失败。
+        """
+        if isinstance(error, DownloadCancelled):
+            return False
+        if isinstance(error, TransientError):
+            return True
+        status = status_of(error)
+        if status is not None:
+            return status in RETRY_STATUS
+        if isinstance(error, TRANSIENT_ERRORS):
+            return True
+        # jmcomic 自身重试耗尽：按最后一次失败的原因判断
+        errors = getattr(error, 'errors', None)
+        if isinstance(errors, list) and errors:
+            last = errors[-1].get('error') if isinstance(errors[-1], dict) else errors[-1]
+            if isinstance(last, Exception) and last is not error:
+                return RetryPolicy.is_retryable(last)
+        return False
+
+    def call(self, fn: Callable, *, check_response: bool = False, token=None,
+             on_retry: Optional[Callable[[int, Exception, float], None]] = None):
+        """执行 fn，失败时按策略重试；check_response=True 时把可重试状态码的响应也当作失败。
+
+        token 为 CancelToken 时，退避等待可被取消立即打断。
+        """
+        attempt = 0
+        while True:
+            try:
+                result = fn()
+                if check_response and getattr(result, 'status_code', 200) in RETRY_STATUS:
+                    raise RetryableStatus(result)
+                return result
+            except Exception as e:
+                if attempt >= self.retries or not self.is_retryable(e):
+                    if check_response and isinstance(e, RetryableStatus):
+                        # 重试耗尽：把最后一次响应交还调用方按状态码处理
+                        return e.response
+                    raise
+                delay = self.delay_for(attempt, e)
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(attempt, e, delay)
+                if token is not None:
+                    if token.sleep(delay):
+                        raise DownloadCancelled()
+                else:
+                    time.sleep(delay)
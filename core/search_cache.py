@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_TTL = 600.0
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+# 过期后仍可先展示再后台刷新的时长；超过则视为未命中并删除
+STALE_LIMIT = 24 * 3600.0
+MEMORY_ENTRIES = 64
+
+
+def normalize_keyword(keyword: str) -> str:
+    """全角/半角、大小写与多余空白不影响命中"""
+    return ' '.join(unicodedata.normalize('NFKC', keyword or '').casefold().split())
+
+
+class CacheHit:
+    def __init__(self, items: List[Dict], mirror: str, stored_at: float, ttl: float):
+        self.items = items
+        self.mirror = mirror
+        self.stored_at = stored_at
+        self.age = max(0.0, time.time() - stored_at)
+        self.fresh = self.age < ttl
+
+
+class SearchCache:
+    """搜索结果两级缓存：内存 LRU + 磁盘 SQLite（~/.jmcomic_downloader/search_cache.db）。
+
+    键为 (规范化关键词, 页码, 镜像)；同一关键词与页码取最新的一份。
+    TTL 内直接使用；过期但未超过 STALE_LIMIT 的先展示，再由调用方后台刷新（stale-while-revalidate）。
+    磁盘总大小超过 max_bytes 时按最近访问时间淘汰。可在搜索线程与界面线程间共用。
+    """
+
+    def __init__(self, config_dir: Path, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES,
+                 memory_entries: int = MEMORY_ENTRIES):
+        self.config_dir = Path(config_dir)
+        self.file = self.config_dir / "search_cache.db"
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+        self.memory_entries = max(1, int(memory_entries))
+        self._memory: 'OrderedDict[Tuple[str, int], Tuple[List[Dict], str, float]]' = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        # 磁盘层当前总字节数：打开时统计一次，之后随写入与删除增减，淘汰判断不再逐次 SUM
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def open(self) -> 'SearchCache':
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.file), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " keyword TEXT NOT NULL,"
+                " page INTEGER NOT NULL,"
+                " mirror TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " data TEXT NOT NULL,"
+                " PRIMARY KEY (keyword, page, mirror))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            self._conn = conn
+        except sqlite3.Error:
+            # 磁盘层不可用时只用内存层
+            self._conn = None
+        return self
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+    def configure(self, ttl: Optional[float] = None, max_bytes: Optional[int] = None) -> None:
+        if ttl is not None:
+            self.ttl = float(ttl)
+        if max_bytes is not None:
+            self.max_bytes = int(max_bytes)
+            with self._lock:
+                self._evict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, keyword: str, page: int) -> Optional[CacheHit]:
+        if not self.enabled:
+            return None
+        key = (normalize_keyword(keyword), int(page))
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT data, mirror, stored_at FROM entries WHERE keyword=? AND page=?"
+                    " ORDER BY stored_at DESC LIMIT 1", key).fetchone()
+                if row is not None:
+                    try:
+                        entry = (json.loads(row[0]), row[1], row[2])
+                    except ValueError:
+                        entry = None
+                    if entry is not None:
+                        self._remember(key, entry)
+            if entry is None:
+                return None
+            items, mirror, stored_at = entry
+            if now - stored_at > STALE_LIMIT:
+                self._drop(key)
+                return None
+            if self._conn is not None:
+                self._conn.execute("UPDATE entries SET accessed_at=? WHERE keyword=? AND page=? AND mirror=?",
+                                   (now, key[0], key[1], mirror))
+        return CacheHit(items, mirror, stored_at, self.ttl)
+
+    def put(self, keyword: str, page: int, mirror: str, items: List[Dict]) -> None:
+        # 空结果不缓存：可能是镜像临时异常，下次应重新请求
+        if not self.enabled or not items:
+            return
+        key = (normalize_keyword(keyword), int(page))
+        now = time.time()
+        data = json.dumps(items, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, (items, mirror or '', now))
+            if self._conn is None:
+                return
+            # 覆盖同一镜像的旧记录时先扣除其大小
+            old = self._conn.execute("SELECT size FROM entries WHERE keyword=? AND page=? AND mirror=?",
+                                     (key[0], key[1], mirror or '')).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries(keyword, page, mirror, stored_at, accessed_at, size, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", (key[0], key[1], mirror or '', now, now, len(data), data))
+            self._bytes += len(data) - (old[0] if old else 0)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM entries")
+                self._bytes = 0
+
+    def _remember(self, key, entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _drop(self, key) -> None:
+        self._memory.pop(key, None)
+        if self._conn is not None:
+            size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries WHERE keyword=? AND page=?",
+                                      key).fetchone()[0]
+            self._conn.execute("DELETE FROM entries WHERE keyword=? AND page=?", key)
+            self._bytes -= size
+
+    def _evict(self) -> None:
+        if self._conn is None:
+            return
+        if self._bytes <= self.max_bytes:
+            return
+        # 淘汰到上限的 90%，避免每次写入都触发
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT keyword, page, mirror, size FROM entries ORDER BY accessed_at").fetchall()
+        for keyword, page, mirror, size in rows:
+            if self._bytes <= target:
+                break
+            self._conn.execute("DELETE FROM entries WHERE keyword=? AND page=? AND mirror=?", (keyword, page, mirror))
+            self._memory.pop((keyword, page), None)
+            self._bytes -= size
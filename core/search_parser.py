@@ -0,0 +1,299 @@
+"""搜索结果页解析引擎。
+
+fast：正则分词一遍扫完整页，只为 a/img/span/div 解析属性，建立“位置区间”索引后
+按区间二分查找卡片内的封面、作者、标签与评分，不构建 DOM 树；
+bs4：原有的 BeautifulSoup 实现，作为兜底与对照（输出需与 fast 一致，见 bench/parse_bench.py）。
+"""
+import re
+from bisect import bisect_right
+from html import unescape
+from typing import Callable, Dict, List, Optional
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except Exception:
+    BeautifulSoup = None
+    BS4_AVAILABLE = False
+
+ALBUM_HREF = re.compile(r"/album/(\d+)")
+AUTHOR_HREF = re.compile(r"/search/.*(author|artist|uploader).*")
+TAG_CLASS = re.compile(r"(badge|tag|category)")
+SCORE_CLASS = re.compile(r"(score|rating)")
+MAX_TAGS = 6
+
+
+def _cover_url(img_attrs: Optional[Dict[str, str]], base: str) -> str:
+    if not img_attrs:
+        return ''
+    cover_url = img_attrs.get('data-original') or img_attrs.get('src') or None
+    if cover_url:
+        if cover_url.startswith('//'):
+            cover_url = 'https:' + cover_url
+        elif cover_url.startswith('/'):
+            cover_url = base.rstrip('/') + cover_url
+    return cover_url or ''
+
+
+# ---- bs4（兜底） ----
+def parse_bs4(html: str, base: str) -> List[Dict]:
+    soup = BeautifulSoup(html, "html.parser")
+    anchors = soup.find_all('a', href=re.compile(r"/album/\d+"))
+    seen = set()
+    items: List[Dict] = []
+    for a in anchors:
+        href = a.get('href') or ""
+        m = ALBUM_HREF.search(href)
+        if not m:
+            continue
+        album_id = m.group(1)
+        if album_id in seen:
+            continue
+        seen.add(album_id)
+
+        title = a.get('title') or a.get_text(strip=True) or f"专辑 {album_id}"
+        # 启发式卡片
+        card = a
+        for _ in range(3):
+            if card and not card.find('img'):
+                card = card.parent
+        img_tag = (card.find('img') if card else None) or a.find('img') or (a.parent.find('img') if a.parent else None)
+        cover_url = _cover_url(img_tag.attrs if img_tag else None, base)
+        # meta
+        author = '-'
+        score = '-'
+        tags: List[str] = []
+        if card:
+            author_a = card.find('a', href=AUTHOR_HREF)
+            if author_a and author_a.get_text(strip=True):
+                author = author_a.get_text(strip=True)
+            for tag_el in card.find_all(['a', 'span'], class_=TAG_CLASS):
+                t = tag_el.get_text(strip=True)
+                if t and len(tags) < MAX_TAGS:
+                    tags.append(t)
+            score_el = card.find(['span', 'div'], class_=SCORE_CLASS)
+            if score_el:
+                st = score_el.get_text(strip=True)
+                if st:
+                    score = st
+
+        items.append({'id': album_id, 'title': title, 'author': author or '-', 'tags': tags,
+                      'score': score or '-', 'cover': cover_url})
+    return items
+
+
+# ---- fast（单遍分词） ----
+_TOKEN = re.compile(
+    r'<!--.*?(?:-->|\Z)'  # 注释
+    r'|<(script|style)\b[^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*>.*?(?:</\1\s*>|\Z)'  # 内容原样跳过，其中的 "<a href=...>" 不算链接
+    r'|<[!?][^>]*>'  # doctype / 处理指令
+    r'|</([a-zA-Z][^\s/>]*)[^>]*>'  # 结束标签
+    r'|<([a-zA-Z][^\s/>]*)([^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*)>',  # 开始标签（属性值内可含 >）
+    re.S | re.I)
+_ATTR = re.compile(r'([^\s=/>][^\s=/>]*)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]*)))?')
+_VOID = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                   'param', 'source', 'track', 'wbr'))
+# 只有这些元素的属性会被用到
+_ATTR_TAGS = frozenset(('a', 'img', 'span', 'div'))
+
+
+def _parse_attrs(raw: str) -> Dict[str, str]:
+    attrs = {}
+    for m in _ATTR.finditer(raw):
+        value = m.group(2)
+        if value is None:
+            value = m.group(3)
+        if value is None:
+            value = m.group(4) or ''
+        attrs[m.group(1).lower()] = unescape(value) if '&' in value else value
+    return attrs
+
+
+class _Document:
+    """一遍扫描得到的扁平文档：每个开始标签与文本节点依次编号（pos），
+    元素 e 的后代位于 (start[e], end[e]] 区间内，子树查询均为二分查找。
+    """
+
+    def __init__(self, html: str):
+        self.start = [0]
+        self.end = [0]
+        self.parent = [-1]
+        self.attrs: List[Optional[Dict[str, str]]] = [None]
+        self.text_pos: List[int] = []
+        self.text: List[str] = []
+        self.img_pos: List[int] = []
+        self.img_el: List[int] = []
+        self.author_pos: List[int] = []
+        self.author_el: List[int] = []
+        self.tag_pos: List[int] = []
+        self.tag_el: List[int] = []
+        self.score_pos: List[int] = []
+        self.score_el: List[int] = []
+        self.albums: List[int] = []
+        self._tokenize(html)
+
+    def _tokenize(self, html: str) -> None:
+        start, end, parent, attrs = self.start, self.end, self.parent, self.attrs
+        text_pos, text = self.text_pos, self.text
+        stack = [0]
+        names = ['']
+        pos = 0
+        last = 0
+        for m in _TOKEN.finditer(html):
+            if m.start() > last:
+                chunk = html[last:m.start()].strip()
+                if chunk:
+                    pos += 1
+                    text_pos.append(pos)
+                    text.append(unescape(chunk) if '&' in chunk else chunk)
+            last = m.end()
+            close_name, open_name, raw = m.group(2, 3, 4)
+            if close_name is not None:
+                close_name = close_name.lower()
+                if names[-1] == close_name and len(stack) > 1:
+                    end[stack.pop()] = pos
+                    names.pop()
+                    continue
+                # 关闭最近的同名元素，途中未闭合的一并关闭；没有对应开始标签则忽略
+                for k in range(len(stack) - 2, 0, -1):
+                    if names[k] == close_name:
+                        for el in stack[k:]:
+                            end[el] = pos
+                        del stack[k:]
+                        del names[k:]
+                        break
+                continue
+            if open_name is None:
+                continue
+            name = open_name.lower()
+            pos += 1
+            el = len(start)
+            start.append(pos)
+            end.append(pos)
+            parent.append(stack[-1])
+            if name in _ATTR_TAGS:
+                a = _parse_attrs(raw)
+                attrs.append(a)
+                self._classify(name, a, el, pos)
+            else:
+                attrs.append(None)
+            if name in _VOID or raw.endswith('/'):
+                continue
+            stack.append(el)
+            names.append(name)
+        if last < len(html):
+            chunk = html[last:].strip()
+            if chunk:
+                pos += 1
+                text_pos.append(pos)
+                text.append(unescape(chunk) if '&' in chunk else chunk)
+        for el in stack:
+            end[el] = pos
+
+    def _classify(self, name: str, a: Dict[str, str], el: int, pos: int) -> None:
+        if name == 'img':
+            self.img_pos.append(pos)
+            self.img_el.append(el)
+            return
+        if name == 'a':
+            href = a.get('href')
+            if href is not None:
+                if ALBUM_HREF.search(href):
+                    self.albums.append(el)
+                if AUTHOR_HREF.search(href):
+                    self.author_pos.append(pos)
+                    self.author_el.append(el)
+        cls = a.get('class')
+        if cls is None:
+            return
+        if name in ('a', 'span') and TAG_CLASS.search(cls):
+            self.tag_pos.append(pos)
+            self.tag_el.append(el)
+        if name in ('span', 'div') and SCORE_CLASS.search(cls):
+            self.score_pos.append(pos)
+            self.score_el.append(el)
+
+    def first(self, positions: List[int], elements: List[int], el: int) -> int:
+        """el 子树中第一个命中的元素，没有则为 -1"""
+        k = bisect_right(positions, self.start[el])
+        if k < len(positions) and positions[k] <= self.end[el]:
+            return elements[k]
+        return -1
+
+    def within(self, positions: List[int], elements: List[int], el: int) -> List[int]:
+        lo = bisect_right(positions, self.start[el])
+        hi = bisect_right(positions, self.end[el])
+        return elements[lo:hi]
+
+    def get_text(self, el: int) -> str:
+        lo = bisect_right(self.text_pos, self.start[el])
+        hi = bisect_right(self.text_pos, self.end[el])
+        return ''.join(self.text[lo:hi])
+
+
+def parse_fast(html: str, base: str) -> List[Dict]:
+    doc = _Document(html)
+    parent, attrs = doc.parent, doc.attrs
+    seen = set()
+    items: List[Dict] = []
+    for a in doc.albums:
+        album_id = ALBUM_HREF.search(attrs[a]['href']).group(1)
+        if album_id in seen:
+            continue
+        seen.add(album_id)
+        title = attrs[a].get('title') or doc.get_text(a) or f"专辑 {album_id}"
+        # 卡片：自链接向上最多三层，直到包含图片
+        card = a
+        for _ in range(3):
+            if card >= 0 and doc.first(doc.img_pos, doc.img_el, card) < 0:
+                card = parent[card]
+        img = doc.first(doc.img_pos, doc.img_el, card) if card >= 0 else -1
+        if img < 0:
+            img = doc.first(doc.img_pos, doc.img_el, a)
+        if img < 0 and parent[a] >= 0:
+            img = doc.first(doc.img_pos, doc.img_el, parent[a])
+        author = '-'
+        score = '-'
+        tags: List[str] = []
+        if card >= 0:
+            author_a = doc.first(doc.author_pos, doc.author_el, card)
+            if author_a >= 0:
+                author = doc.get_text(author_a) or '-'
+            for tag_el in doc.within(doc.tag_pos, doc.tag_el, card):
+                t = doc.get_text(tag_el)
+                if t:
+                    tags.append(t)
+                    if len(tags) >= MAX_TAGS:
+                        break
+            score_el = doc.first(doc.score_pos, doc.score_el, card)
+            if score_el >= 0:
+                score = doc.get_text(score_el) or '-'
+        items.append({'id': album_id, 'title': title, 'author': author, 'tags': tags, 'score': score,
+                      'cover': _cover_url(attrs[img] if img >= 0 else None, base)})
+    return items
+
+
+# ---- 引擎注册 ----
+ENGINES: Dict[str, Callable[[str, str], List[Dict]]] = {'fast': parse_fast}
+if BS4_AVAILABLE:
+    ENGINES['bs4'] = parse_bs4
+DEFAULT_ENGINE = 'fast'
+FALLBACK_ENGINE = 'bs4'
+
+
+def register_engine(name: str, parser: Callable[[str, str], List[Dict]]) -> None:
+    ENGINES[name] = parser
+
+
+def parse_results(html: str, base: str, engine: str = DEFAULT_ENGINE) -> List[Dict]:
+    """用指定引擎解析；引擎出错，或页面里有专辑链接却一条也没解析出时改用 bs4 兜底"""
+    parser = ENGINES.get(engine) or ENGINES[DEFAULT_ENGINE]
+    try:
+        items = parser(html, base)
+    except Exception:
+        items = None
+    if items or engine == FALLBACK_ENGINE or FALLBACK_ENGINE not in ENGINES:
+        return items or []
+    if items is None or '/album/' in html:
+        return ENGINES[FALLBACK_ENGINE](html, base)
+    return items
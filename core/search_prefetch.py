@@ -0,0 +1,72 @@
+from PyQt5.QtCore import pyqtSignal
+
+from core.cover_cache import cover_cache, fetch_cover
+from core.search_worker import SearchWorker
+
+# 单次预取的流量预算（字节）：搜索页 + 封面合计，超出后不再预热剩余封面
+PREFETCH_BUDGET = 4 * 1024 * 1024
+# 当前页渲染完成后等待这么久（毫秒）仍无新操作才开始预取
+PREFETCH_IDLE_MS = 800
+
+
+class SearchPrefetcher(SearchWorker):
+    """空闲时预取下一页：请求并解析第 N+1 页写入 SearchCache，可选再把封面预热进 cover_cache。
+
+    不重试、不打扰界面：结果只进缓存，用户点“下一页”时直接命中。
+    关键词变化时由调用方 stop()，尚未开始的封面不再下载。
+    """
+    page_ready = pyqtSignal(str, int, int)  # keyword, page, 结果数（失败为 -1）
+
+    def __init__(self, keyword: str, page: int, cache, proxy: str = "", timeout: int = 30,
+                 warm_covers: bool = True, budget: int = PREFETCH_BUDGET):
+        super().__init__(keyword, page=page, proxy=proxy, timeout=timeout, retries=0, cache=cache)
+        self.warm_covers = warm_covers
+        self.budget = max(0, int(budget))
+        self.cover_bytes = 0
+
+    def stop(self):
+        # 进行中的搜索页请求直接断开连接，剩余封面不再下载
+        self.cancel()
+
+    @property
+    def stopped(self) -> bool:
+        return self.cancelled
+
+    @property
+    def bytes_used(self) -> int:
+        return self.bytes_received + self.cover_bytes
+
+    def run(self):
+        kw = self.keyword.strip()
+        items = None
+        try:
+            items = self._fetch_page(kw)
+        finally:
+            # 每条退出路径都要通知界面：用户可能正等着这一页（_awaiting_prefetch），失败时由界面照常搜索
+            self.page_ready.emit(kw, self.page, len(items) if items is not None else -1)
+        if not items or not self.warm_covers:
+            return
+        for item in items:
+            url = item.get('cover')
+            if self.stopped or self.bytes_used >= self.budget:
+                break
+            if not url or url in cover_cache:
+                continue
+            self.cover_bytes += len(fetch_cover(url, self.proxy, min(self.timeout, 15), retries=0))
+
+    def _fetch_page(self, kw: str):
+        """返回该页结果（可为空）；不预取、失败或已停止时为 None"""
+        if not kw or kw.isdigit() or self.cache is None or not self.cache.enabled:
+            return None
+        hit = self.cache.get(kw, self.page)
+        if hit is not None and hit.fresh:
+            return hit.items
+        try:
+            items = self._scrape_search(kw, self.page)
+        except Exception:
+            return None
+        if self.stopped:
+            return None
+        if items:
+            self.cache.put(kw, self.page, self.mirror, items)
+        return items
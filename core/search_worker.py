@@ -1,25 +1,84 @@
 from PyQt5.QtCore import QThread, pyqtSignal
-from typing import List, Dict
-import re
+from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from urllib.parse import quote_plus
 
-try:
-    import cloudscraper
-    from bs4 import BeautifulSoup
-    SCRAPER_AVAILABLE = True
-except Exception:
-    SCRAPER_AVAILABLE = False
+from core.cancellation import CancelToken, DownloadCancelled
+from core.http_pool import http_pool
+from core.mirror_health import mirror_health
+from core.rate_limit import limiter
+from core.retry import RetryableStatus, RetryPolicy
+from core.search_parser import ALBUM_HREF, DEFAULT_ENGINE, parse_results
+
+# 请求经由 core.http_pool 的共享会话，解析见 core.search_parser（bs4 只作兜底，不再是必需依赖）
+SCRAPER_AVAILABLE = http_pool.available
+
+
+# 搜索镜像，按顺序尝试
+MIRRORS = [
+    "https://18comic.vip",
+    "https://18comic.org",
+    "https://jmcomic1.me",
+    "https://jmcomic.me",
+]
+
+# 对冲延迟（秒）：当前镜像这么久还没有结果就加发下一个镜像
+HEDGE_DELAY = 1.0
+# 流式读取搜索页的分块大小；每块之间检查取消
+READ_CHUNK = 16 * 1024
+CANCEL_POLL = 0.5
+# 页面里有专辑链接却一条也没解析出（改版或不完整的页面）：不作为最终答案，继续等其他镜像
+_UNPARSED = object()
 
 
 class SearchWorker(QThread):
     search_finished = pyqtSignal(list, str)
 
-    def __init__(self, keyword: str, page: int = 1, proxy: str = "", timeout: int = 30):
+    def __init__(self, keyword: str, page: int = 1, proxy: str = "", timeout: int = 30, retries: int = 3,
+                 mirrors=None, hedge_delay: float = HEDGE_DELAY, cache=None, parser: str = DEFAULT_ENGINE,
+                 generation: int = 0):
         super().__init__()
         self.keyword = keyword or ""
         self.page = max(1, int(page) if isinstance(page, int) else 1)
         self.proxy = proxy.strip() if proxy else ""
         self.timeout = int(timeout) if timeout else 30
+        self.retry = RetryPolicy(retries)
+        self.mirrors = list(mirrors or MIRRORS)
+        self.hedge_delay = max(0.0, float(hedge_delay))
+        # SearchCache；成功的结果连同胜出镜像写入缓存
+        self.cache = cache
+        self.mirror = ''
+        # 解析引擎名，见 core.search_parser.ENGINES
+        self.parser = parser
+        # 收到的搜索页字节数（含落选镜像），供预取的流量预算统计
+        self.bytes_received = 0
+        self._bytes_lock = threading.Lock()
+        # 搜索代号：界面据此丢弃被新搜索取代的结果
+        self.generation = generation
+        self.token = CancelToken()
+        # 进行中的响应 → 所属竞速的取消事件；取消时直接关闭连接
+        self._responses = {}
+        self._responses_lock = threading.Lock()
+
+    def cancel(self):
+        """被新搜索取代：停止发起请求、中断进行中的读取（关闭套接字），且不再发出 search_finished"""
+        self.token.cancel()
+        self._abort()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def _abort(self, race: Optional[threading.Event] = None) -> None:
+        with self._responses_lock:
+            victims = [r for r, ev in self._responses.items() if race is None or ev is race]
+        for resp in victims:
+            try:
+                resp.close()
+            except Exception:
+                pass
 
     def run(self):
         try:
@@ -29,85 +88,136 @@ class SearchWorker(QThread):
                     {'id': kw, 'title': f'专辑 {kw}', 'author': '-', 'tags': [], 'score': '-', 'cover': ''}
                 ], "")
                 return
-            results = self._scrape_search(kw, self.page)
+            # 所有镜像都失败时整轮退避重试
+            results = self.retry.call(lambda: self._scrape_search(kw, self.page), token=self.token)
+            if self.cancelled:
+                return
+            if self.cache is not None:
+                try:
+                    self.cache.put(kw, self.page, self.mirror, results)
+                except Exception:
+                    pass
             self.search_finished.emit(results, "")
+        except DownloadCancelled:
+            return
         except Exception as e:
-            self.search_finished.emit([], f"搜索失败: {e}")
+            if not self.cancelled:
+                self.search_finished.emit([], f"搜索失败: {e}")
 
     def _scrape_search(self, keyword: str, page: int) -> List[Dict]:
+        """对冲请求：先请求排在最前的镜像，hedge_delay 内没有结果（或已失败）再加发下一个，
+        取最先给出答案的镜像，其余放弃。最坏耗时约为最快健康镜像的一次往返，而不是 N × 超时。
+        正常的空结果页（200 且没有任何专辑链接）同样是最终答案，不再等其他镜像。
+        """
         if not SCRAPER_AVAILABLE:
             return []
 
-        bases = [
-            "https://18comic.vip",
-            "https://18comic.org",
-            "https://jmcomic1.me",
-            "https://jmcomic.me",
-        ]
-
-        proxies = None
-        if self.proxy and (self.proxy.startswith("http://") or self.proxy.startswith("https://")):
-            proxies = {"http": self.proxy, "https": self.proxy}
-
-        scraper = cloudscraper.create_scraper()
+        # 历史最快的健康镜像排在最前，隔离中的镜像只作最后手段
+        bases = mirror_health.rank(self.mirrors)
         query = quote_plus(keyword)
-
-        for base in bases:
-            try:
-                url = f"{base}/search/photos?search_query={query}&page={page}"
-                resp = scraper.get(url, timeout=self.timeout, proxies=proxies)
-                if resp.status_code != 200 or not resp.text:
-                    continue
-                soup = BeautifulSoup(resp.text, "html.parser")
-                anchors = soup.find_all('a', href=re.compile(r"/album/\d+"))
-                seen = set()
-                items: List[Dict] = []
-                for a in anchors:
-                    href = a.get('href') or ""
-                    m = re.search(r"/album/(\d+)", href)
-                    if not m:
+        responded = False
+        last_error = None
+        cancel = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=max(1, len(bases)))
+        pending = set()
+        owners = {}
+        launched = 0
+        launch_next = True
+        try:
+            while not self.cancelled:
+                if launch_next and launched < len(bases):
+                    fut = pool.submit(self._fetch_mirror, bases[launched], query, page, cancel)
+                    owners[fut] = bases[launched]
+                    pending.add(fut)
+                    launched += 1
+                if not pending:
+                    break
+                # 还有备用镜像时只等 hedge_delay，超时即加发；都已发出则等到有结果为止（定期检查取消）
+                timeout = self.hedge_delay if launched < len(bases) else CANCEL_POLL
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                launch_next = True
+                for fut in done:
+                    try:
+                        items = fut.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if items is None:
                         continue
-                    album_id = m.group(1)
-                    if album_id in seen:
+                    responded = True
+                    if items is _UNPARSED:
                         continue
-                    seen.add(album_id)
-
-                    title = a.get('title') or a.get_text(strip=True) or f"专辑 {album_id}"
-                    # 启发式卡片
-                    card = a
-                    for _ in range(3):
-                        if card and not card.find('img'):
-                            card = card.parent
-                    img_tag = (card.find('img') if card else None) or a.find('img') or (a.parent.find('img') if a.parent else None)
-                    cover_url = None
-                    if img_tag:
-                        cover_url = img_tag.get('data-original') or img_tag.get('src') or None
-                        if cover_url:
-                            if cover_url.startswith('//'):
-                                cover_url = 'https:' + cover_url
-                            elif cover_url.startswith('/'):
-                                cover_url = base.rstrip('/') + cover_url
-                    # meta
-                    author = '-'
-                    score = '-'
-                    tags: List[str] = []
-                    if card:
-                        author_a = card.find('a', href=re.compile(r"/search/.*(author|artist|uploader).*"))
-                        if author_a and author_a.get_text(strip=True):
-                            author = author_a.get_text(strip=True)
-                        for tag_el in card.find_all(['a','span'], class_=re.compile(r"(badge|tag|category)")):
-                            t = tag_el.get_text(strip=True)
-                            if t and len(tags) < 6:
-                                tags.append(t)
-                        score_el = card.find(['span','div'], class_=re.compile(r"(score|rating)"))
-                        if score_el:
-                            st = score_el.get_text(strip=True)
-                            if st:
-                                score = st
-
-                    items.append({'id': album_id,'title': title,'author': author or '-', 'tags': tags,'score': score or '-', 'cover': cover_url or ''})
-                if items:
+                    self.mirror = owners[fut]
                     return items
-            except Exception:
-                continue
+        finally:
+            # 落选的镜像：未开始的直接取消，进行中的请求关闭连接、不再读取与解析
+            cancel.set()
+            for fut in pending:
+                fut.cancel()
+            self._abort(cancel)
+            pool.shutdown(wait=False)
+        if not responded and last_error is not None:
+            # 没有任何镜像正常响应：交给重试策略
+            raise last_error
         return []
+
+    def _fetch_mirror(self, base: str, query: str, page: int, cancel: threading.Event):
+        """请求并解析单个镜像的搜索页，返回结果列表（可为空）；已有其他镜像胜出或整个搜索被取消时返回 None，
+        有专辑链接却解析不出结果时返回 _UNPARSED"""
+        if cancel.is_set() or self.cancelled:
+            return None
+        url = f"{base}/search/photos?search_query={query}&page={page}"
+        # 共享会话：连接与 Cloudflare Cookie 跨搜索复用，不再每次重新握手、重新过挑战
+        with limiter.slot(url, token=self.token) as slot:
+            start = time.monotonic()
+            try:
+                resp = http_pool.get(url, timeout=self.timeout, proxy=self.proxy, stream=True)
+            except Exception as e:
+                if cancel.is_set() or self.cancelled:
+                    return None
+                mirror_health.record(base, None, False, str(e))
+                raise
+            slot['status'] = resp.status_code
+            html = self._read_body(resp, cancel)
+        if html is None:
+            # 读取途中被放弃：既非成功也非镜像故障，不计入健康统计
+            return None
+        ok = resp.status_code == 200 and bool(html)
+        # 落选镜像的完整响应同样计入健康统计
+        mirror_health.record(base, time.monotonic() - start, ok, '' if ok else f"HTTP {resp.status_code}")
+        if cancel.is_set() or self.cancelled:
+            return None
+        if not ok:
+            raise RetryableStatus(resp)
+        items = self._parse_results(html, base)
+        if not items and ALBUM_HREF.search(html):
+            return _UNPARSED
+        return items
+
+    def _read_body(self, resp, cancel: threading.Event) -> Optional[str]:
+        """分块读取响应体；取消时由 _abort() 关闭连接打断阻塞中的读取，返回 None"""
+        with self._responses_lock:
+            self._responses[resp] = cancel
+        try:
+            chunks = []
+            for chunk in resp.iter_content(READ_CHUNK):
+                if cancel.is_set() or self.cancelled:
+                    return None
+                chunks.append(chunk)
+        except Exception:
+            if cancel.is_set() or self.cancelled:
+                return None
+            raise
+        finally:
+            with self._responses_lock:
+                self._responses.pop(resp, None)
+            resp.close()
+        data = b''.join(chunks)
+        with self._bytes_lock:
+            self.bytes_received += len(data)
+        # 未声明字符集时按 UTF-8（站点页面均为 UTF-8，不采用 requests 对 text/html 的 ISO-8859-1 默认值）
+        declared = 'charset' in (resp.headers.get('content-type') or '').lower()
+        return data.decode(resp.encoding if declared and resp.encoding else 'utf-8', errors='replace')
+
+    def _parse_results(self, html: str, base: str) -> List[Dict]:
+        return parse_results(html, base, self.parser)
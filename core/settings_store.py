@@ -56,6 +56,24 @@ class SettingsStore:
     def set_thread_count(self, v: int) -> None:
         self.data['thread_count'] = int(v)
 
+    def get_image_threads(self) -> int:
+        try:
+            return max(1, int(self.data.get('image_threads', 8)))
+        except Exception:
+            return 8
+
+    def set_image_threads(self, v: int) -> None:
+        self.data['image_threads'] = int(v)
+
+    def get_chapter_workers(self) -> int:
+        try:
+            return max(1, int(self.data.get('chapter_workers', 3)))
+        except Exception:
+            return 3
+
+    def set_chapter_workers(self, v: int) -> None:
+        self.data['chapter_workers'] = int(v)
+
     def get_retry_count(self) -> int:
         try:
             return int(self.data.get('retry_count', 3))
@@ -65,12 +83,91 @@ class SettingsStore:
     def set_retry_count(self, v: int) -> None:
         self.data['retry_count'] = int(v)
 
+    def get_resume_download(self) -> bool:
+        return bool(self.data.get('resume_download', True))
+
+    def set_resume_download(self, enabled: bool) -> None:
+        self.data['resume_download'] = bool(enabled)
+
     def get_image_format(self) -> str:
         return str(self.data.get('image_format', '原始格式'))
 
     def set_image_format(self, fmt: str) -> None:
         self.data['image_format'] = fmt
 
+    def get_image_quality(self) -> int:
+        try:
+            return int(self.data.get('image_quality', 90))
+        except Exception:
+            return 90
+
+    def set_image_quality(self, v: int) -> None:
+        self.data['image_quality'] = int(v)
+
+    def get_output_mode(self) -> str:
+        mode = str(self.data.get('output_mode', 'folder'))
+        return mode if mode in ('folder', 'cbz') else 'folder'
+
+    def set_output_mode(self, mode: str) -> None:
+        self.data['output_mode'] = mode if mode in ('folder', 'cbz') else 'folder'
+
+    def get_verify_decode(self) -> bool:
+        return bool(self.data.get('verify_decode', False))
+
+    def set_verify_decode(self, enabled: bool) -> None:
+        self.data['verify_decode'] = bool(enabled)
+
+    def get_existing_policy(self) -> str:
+        # 已在库中的专辑：skip 跳过 / verify 校验并补全 / force 强制重新下载
+        policy = str(self.data.get('existing_policy', 'skip'))
+        return policy if policy in ('skip', 'verify', 'force') else 'skip'
+
+    def set_existing_policy(self, policy: str) -> None:
+        self.data['existing_policy'] = policy if policy in ('skip', 'verify', 'force') else 'skip'
+
+    def get_shortest_first(self) -> bool:
+        return bool(self.data.get('shortest_first', False))
+
+    def set_shortest_first(self, enabled: bool) -> None:
+        self.data['shortest_first'] = bool(enabled)
+
+    def get_dedupe(self) -> bool:
+        return bool(self.data.get('dedupe', False))
+
+    def set_dedupe(self, enabled: bool) -> None:
+        self.data['dedupe'] = bool(enabled)
+
+    def get_search_cache_ttl(self) -> int:
+        # 分钟，0 表示不缓存
+        try:
+            return max(0, int(self.data.get('search_cache_ttl', 10)))
+        except Exception:
+            return 10
+
+    def set_search_cache_ttl(self, minutes: int) -> None:
+        self.data['search_cache_ttl'] = max(0, int(minutes))
+
+    def get_search_cache_mb(self) -> int:
+        try:
+            return max(1, int(self.data.get('search_cache_mb', 20)))
+        except Exception:
+            return 20
+
+    def set_search_cache_mb(self, mb: int) -> None:
+        self.data['search_cache_mb'] = max(1, int(mb))
+
+    def get_search_prefetch(self) -> bool:
+        return bool(self.data.get('search_prefetch', True))
+
+    def set_search_prefetch(self, enabled: bool) -> None:
+        self.data['search_prefetch'] = bool(enabled)
+
+    def get_prefetch_covers(self) -> bool:
+        return bool(self.data.get('prefetch_covers', True))
+
+    def set_prefetch_covers(self, enabled: bool) -> None:
+        self.data['prefetch_covers'] = bool(enabled)
+
     # ui settings
     def get_theme(self) -> str:
         return str(self.data.get('theme', '深色主题'))
@@ -0,0 +1,209 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# 设置中的格式文本 -> (Pillow 格式名, 文件后缀, 视为同格式的后缀)
+FORMATS = {
+    'JPG': ('JPEG', '.jpg', {'.jpg', '.jpeg'}),
+    'PNG': ('PNG', '.png', {'.png'}),
+    'WEBP': ('WEBP', '.webp', {'.webp'}),
+    'AVIF': ('AVIF', '.avif', {'.avif'}),
+}
+ORIGINAL = '原始格式'
+
+
+def available_formats() -> Dict[str, bool]:
+    """当前环境下各目标格式是否可写（AVIF 需要 Pillow 11+ 或 pillow-avif-plugin）"""
+    result = {k: False for k in FORMATS}
+    try:
+        from PIL import features
+    except Exception:
+        return result
+    result['JPG'] = bool(features.check('jpg'))
+    result['PNG'] = bool(features.check('zlib'))
+    result['WEBP'] = bool(features.check('webp'))
+    try:
+        result['AVIF'] = bool(features.check('avif'))
+    except Exception:
+        result['AVIF'] = False
+    if not result['AVIF']:
+        try:
+            import pillow_avif  # noqa: F401
+            result['AVIF'] = True
+        except Exception:
+            pass
+    return result
+
+
+def needs_transcode(path, fmt: str) -> bool:
+    spec = FORMATS.get(fmt)
+    return bool(spec) and Path(path).suffix.lower() not in spec[2]
+
+
+def transcode_file(src: str, fmt: str, quality: int = 90) -> Tuple[str, int, int]:
+    """在子进程中执行：转码单个文件，先写临时文件再原子替换，返回 (新路径, 原字节数, 新字节数)"""
+    from PIL import Image
+    if fmt == 'AVIF':
+        try:
+            import pillow_avif  # noqa: F401
+        except Exception:
+            pass
+    pil_format, suffix, _aliases = FORMATS[fmt]
+    src_path = Path(src)
+    in_bytes = src_path.stat().st_size
+    if not needs_transcode(src_path, fmt):
+        return str(src_path), in_bytes, in_bytes
+    dst = src_path.with_suffix(suffix)
+    tmp = dst.with_name(dst.name + '.part')
+    with Image.open(src_path) as im:
+        im.load()
+        if pil_format == 'JPEG' and im.mode not in ('RGB', 'L'):
+            im = im.convert('RGB')
+        elif im.mode == 'P':
+            im = im.convert('RGBA')
+        params = {} if pil_format == 'PNG' else {'quality': int(quality)}
+        im.save(tmp, format=pil_format, **params)
+    os.replace(tmp, dst)
+    if dst != src_path:
+        try:
+            src_path.unlink()
+        except OSError:
+            pass
+    return str(dst), in_bytes, dst.stat().st_size
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    # 进程级共享：所有下载线程的转码与完整解码校验进入同一个进程池，CPU 密集的编解码不占用 GIL
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+        return _pool
+
+
+class Transcoder:
+    """下载后的转码阶段：图片落盘后提交到进程池，与后续网络下载并行，不阻塞下载线程。
+
+    进程池的回调线程只把结果放进就绪队列；on_done/on_error（哈希、入包、去重登记）由 drain() 在
+    专辑自己的下载线程中执行，wait() 收尾时处理剩余部分，一本专辑的慢登记不会拖住其他专辑的转码。
+    """
+
+    def __init__(self, fmt: str, quality: int = 90):
+        self.fmt = fmt if fmt in FORMATS else ORIGINAL
+        self.quality = max(1, min(100, int(quality)))
+        self.files = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.failed = 0
+        self._first_submit = 0.0
+        self._last_done = 0.0
+        self._pending = set()
+        self._ready: 'queue.Queue' = queue.Queue()
+        self._lock = threading.Condition()
+        self.error = ''
+        if self.fmt != ORIGINAL and not available_formats().get(self.fmt):
+            self.error = f"当前环境不支持 {self.fmt}，保持原始格式"
+            self.fmt = ORIGINAL
+
+    @property
+    def enabled(self) -> bool:
+        return self.fmt != ORIGINAL
+
+    def submit(self, src, on_done: Optional[Callable[[str, int, int], None]] = None,
+               on_error: Optional[Callable[[str, Exception], None]] = None) -> Optional[Future]:
+        if not self.enabled or not needs_transcode(src, self.fmt):
+            return None
+        fut = shared_pool().submit(transcode_file, str(src), self.fmt, self.quality)
+        with self._lock:
+            if not self._first_submit:
+                self._first_submit = time.monotonic()
+            self._pending.add(fut)
+
+        def _finish(f: Future):
+            # 在进程池的管理线程中执行：只交回结果，不做任何 I/O
+            self._ready.put((f, str(src), on_done, on_error))
+            with self._lock:
+                self._lock.notify_all()
+
+        fut.add_done_callback(_finish)
+        return fut
+
+    def drain(self) -> int:
+        """在调用线程中处理已完成的转码（调用 on_done/on_error），返回处理的个数"""
+        handled = 0
+        while True:
+            try:
+                f, src, on_done, on_error = self._ready.get_nowait()
+            except queue.Empty:
+                return handled
+            try:
+                self._handle(f, src, on_done, on_error)
+            except Exception as e:
+                # 回调出错不能打断调用方（通常是正在下载别的图片的线程）
+                with self._lock:
+                    self.error = f"转码结果处理失败: {e}"
+            finally:
+                # 回调执行完（含 on_done 写清单）才从 pending 移除，wait() 以此为准
+                with self._lock:
+                    self._pending.discard(f)
+                    self._lock.notify_all()
+            handled += 1
+
+    def _handle(self, f: Future, src: str, on_done, on_error) -> None:
+        if f.cancelled():
+            if on_error is not None:
+                on_error(src, RuntimeError('cancelled'))
+            return
+        try:
+            dst, n_in, n_out = f.result()
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+                self.error = str(e)
+            if on_error is not None:
+                on_error(src, e)
+            return
+        with self._lock:
+            self.files += 1
+            self.bytes_in += n_in
+            self.bytes_out += n_out
+            self._last_done = time.monotonic()
+        if on_done is not None:
+            on_done(dst, n_in, n_out)
+
+    def wait(self, cancel_pending: bool = False) -> None:
+        """等待已提交的转码全部完成并在调用线程中登记结果；
+        cancel_pending=True 时尚未开始的任务直接取消（文件保持原格式）"""
+        if cancel_pending:
+            with self._lock:
+                pending = list(self._pending)
+            for fut in pending:
+                fut.cancel()
+        while True:
+            self.drain()
+            with self._lock:
+                if not self._pending:
+                    return
+                if self._ready.empty():
+                    self._lock.wait(0.5)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            span = (self._last_done - self._first_submit) if self._last_done else 0.0
+            return {
+                'format': self.fmt,
+                'files': self.files,
+                'failed': self.failed,
+                'pending': len(self._pending),
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'files_per_sec': self.files / span if span > 0 else 0.0,
+            }
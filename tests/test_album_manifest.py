@@ -0,0 +1,102 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.album_manifest import MANIFEST_NAME, AlbumManifest, file_sha1
+
+
+class AlbumManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name) / 'album'
+        self.dir.mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _image(self, name, data=b'\xff\xd8 image \xff\xd9'):
+        path = self.dir / name
+        path.write_bytes(data)
+        return path
+
+    def _write(self, *records):
+        """按下载流程写一份清单后关闭，返回重新加载的清单"""
+        m = AlbumManifest(self.dir, '123')
+        m.open()
+        m.update_meta(album_id='123', title='标题')
+        for key, path, state in records:
+            m.record(key, path, state)
+        m.close()
+        return AlbumManifest(self.dir).load()
+
+    def test_record_and_reload(self):
+        a = self._image('00001.jpg')
+        m = self._write(('p1/00001', a, 'done'), ('p1/00002', self.dir / '00002.jpg', 'failed'))
+        self.assertEqual(m.meta, {'album_id': '123', 'title': '标题'})
+        self.assertEqual(m.done_count(), 1)
+        rec = m.get('p1/00001')
+        self.assertEqual(rec['file'], '00001.jpg')
+        self.assertEqual(rec['size'], a.stat().st_size)
+        self.assertEqual(rec['sha1'], file_sha1(a))
+        self.assertEqual(m.get('p1/00002')['state'], 'failed')
+
+    def test_resume_skips_verified_images(self):
+        a = self._image('00001.jpg')
+        b = self._image('00002.jpg', b'other')
+        m = self._write(('p1/00001', a, 'done'), ('p1/00002', b, 'done'))
+        self.assertTrue(m.is_verified('p1/00001', a))
+        self.assertTrue(m.is_verified('p1/00002', b, deep=False))
+        # 未记录或未完成的图片需要重新下载
+        self.assertFalse(m.is_verified('p1/00003', self.dir / '00003.jpg'))
+
+    def test_resume_detects_changed_files(self):
+        a = self._image('00001.jpg', b'aaaa')
+        b = self._image('00002.jpg', b'bbbb')
+        m = self._write(('p1/00001', a, 'done'), ('p1/00002', b, 'done'))
+        a.write_bytes(b'aaaaa')
+        b.write_bytes(b'cccc')
+        self.assertFalse(m.is_verified('p1/00001', a, deep=False))
+        # 大小相同内容不同：只有深度校验能发现
+        self.assertTrue(m.is_verified('p1/00002', b, deep=False))
+        self.assertFalse(m.is_verified('p1/00002', b))
+        b.unlink()
+        self.assertFalse(m.is_verified('p1/00002', b, deep=False))
+
+    def test_converted_file_is_followed(self):
+        webp = self._image('00001.webp')
+        m = self._write(('p1/00001', webp, 'done'))
+        # 调用方按原后缀询问，清单记录的是转码后的实际文件
+        self.assertEqual(m.file_of('p1/00001', self.dir / '00001.jpg'), webp)
+        self.assertTrue(m.is_verified('p1/00001', self.dir / '00001.jpg'))
+
+    def test_last_record_wins(self):
+        a = self._image('00001.jpg')
+        m = AlbumManifest(self.dir, '123')
+        m.open()
+        m.record('p1/00001', a, 'failed', error='timeout')
+        m.record('p1/00001', a, 'done')
+        m.update('p1/00001', checked=True)
+        m.close()
+        rec = AlbumManifest(self.dir).load().get('p1/00001')
+        self.assertEqual(rec['state'], 'done')
+        self.assertTrue(rec['checked'])
+        self.assertEqual(rec['sha1'], file_sha1(a))
+
+    def test_truncated_last_line_is_ignored(self):
+        a = self._image('00001.jpg')
+        self._write(('p1/00001', a, 'done'))
+        with open(self.dir / MANIFEST_NAME, 'a', encoding='utf-8') as f:
+            f.write('{"key": "p1/00002", "sta')
+        m = AlbumManifest(self.dir).load()
+        self.assertEqual(list(m.images), ['p1/00001'])
+        self.assertTrue(m.is_verified('p1/00001', a))
+
+    def test_missing_manifest(self):
+        m = AlbumManifest(self.dir).load()
+        self.assertEqual(m.images, {})
+        self.assertEqual(m.done_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
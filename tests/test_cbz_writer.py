@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from core.cbz_writer import CbzWriter, read_album_id
+
+
+class CbzWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.cbz = self.root / 'out' / '标题.cbz'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _src(self, name, data=b'image-bytes'):
+        path = self.root / name
+        path.write_bytes(data)
+        return path
+
+    def _names(self, path):
+        with zipfile.ZipFile(path) as zf:
+            return sorted(zf.namelist())
+
+    def test_complete_archive(self):
+        w = CbzWriter(self.cbz, '123').open()
+        src = self._src('a.jpg', b'12345')
+        self.assertEqual(w.add_file(src, '00001.jpg'), 5)
+        self.assertFalse(src.exists())
+        w.add_file(self._src('b.jpg'), '00002.jpg')
+        self.assertTrue(w.part.exists())
+        self.assertFalse(self.cbz.exists())
+        w.close(complete=True)
+        self.assertFalse(w.part.exists())
+        self.assertEqual(self._names(self.cbz), ['00001.jpg', '00002.jpg'])
+        self.assertEqual(read_album_id(self.cbz), '123')
+        with zipfile.ZipFile(self.cbz) as zf:
+            self.assertTrue(all(i.compress_type == zipfile.ZIP_STORED for i in zf.infolist()))
+
+    def test_resume_part(self):
+        w = CbzWriter(self.cbz, '123').open()
+        w.add_file(self._src('a.jpg'), '00001.webp')
+        w.close()
+        self.assertEqual(read_album_id(w.part), '123')
+
+        w = CbzWriter(self.cbz, '123').open()
+        self.assertTrue(w.recovered)
+        # 按不含后缀的名字判断，转码改变后缀不影响续传
+        self.assertTrue(w.has_stem('00001'))
+        self.assertFalse(w.has_stem('00002'))
+        w.add_file(self._src('a.jpg'), '00001.webp')
+        w.add_file(self._src('b.jpg'), '00002.webp')
+        w.close(complete=True)
+        self.assertEqual(self._names(self.cbz), ['00001.webp', '00002.webp'])
+
+    def test_resume_complete_archive(self):
+        w = CbzWriter(self.cbz, '123').open()
+        w.add_file(self._src('a.jpg'), '00001.jpg')
+        w.close(complete=True)
+        w = CbzWriter(self.cbz, '123').open()
+        # 补页期间成品先移回 .part
+        self.assertFalse(self.cbz.exists())
+        self.assertTrue(w.has_stem('00001'))
+        w.add_file(self._src('b.jpg'), '00002.jpg')
+        w.close(complete=True)
+        self.assertEqual(self._names(self.cbz), ['00001.jpg', '00002.jpg'])
+
+    def test_broken_part_is_discarded(self):
+        self.cbz.parent.mkdir(parents=True)
+        part = self.cbz.with_name(self.cbz.name + '.part')
+        part.write_bytes(b'PK\x03\x04 truncated by a crash')
+        w = CbzWriter(self.cbz).open()
+        self.assertFalse(w.recovered)
+        self.assertFalse(w.has_stem('00001'))
+        w.add_file(self._src('a.jpg'), '00001.jpg')
+        w.close(complete=True)
+        self.assertEqual(self._names(self.cbz), ['00001.jpg'])
+        self.assertEqual(read_album_id(self.cbz), '')
+
+    def test_no_resume_starts_over(self):
+        w = CbzWriter(self.cbz).open()
+        w.add_file(self._src('a.jpg'), '00001.jpg')
+        w.close(complete=True)
+        w = CbzWriter(self.cbz).open(resume=False)
+        self.assertFalse(self.cbz.exists())
+        w.add_file(self._src('b.jpg'), '00002.jpg')
+        w.close(complete=True)
+        self.assertEqual(self._names(self.cbz), ['00002.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
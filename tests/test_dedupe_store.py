@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.album_manifest import file_sha1
+from core.dedupe_store import STORE_DIR, ContentStore, dedupe_library, delete_album, dir_usage
+
+
+class DedupeStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.store = ContentStore(self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _image(self, rel, data):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def test_link_in(self):
+        a = self._image('A/00001.jpg', b'same content')
+        b = self._image('B/00001.jpg', b'same content')
+        c = self._image('B/00002.jpg', b'different!!!')
+        # 第一次登记只建立仓库对象
+        self.assertEqual(self.store.link_in(a), 0)
+        obj = self.store.object_path(file_sha1(a))
+        self.assertTrue(os.path.samefile(a, obj))
+        self.assertEqual(self.store.link_in(b), len(b'same content'))
+        self.assertTrue(os.path.samefile(a, b))
+        self.assertEqual(b.read_bytes(), b'same content')
+        self.assertEqual(self.store.link_in(c), 0)
+        self.assertFalse(os.path.samefile(b, c))
+        # 重复登记无副作用
+        self.assertEqual(self.store.link_in(b), 0)
+
+    def test_prune_and_delete_album(self):
+        a = self._image('A/00001.jpg', b'shared')
+        b = self._image('B/00001.jpg', b'shared')
+        u = self._image('B/00002.jpg', b'only in B')
+        for p in (a, b, u):
+            self.store.link_in(p)
+        self.assertEqual(dir_usage(self.root / 'B')['shared_bytes'], len(b'shared'))
+        # B 独有的图片对象随之清理；与 A 共享的对象保留
+        self.assertEqual(delete_album(self.root, self.root / 'B'), len(b'only in B'))
+        self.assertFalse((self.root / 'B').exists())
+        self.assertTrue(self.store.object_path(file_sha1(a)).exists())
+        self.assertEqual(delete_album(self.root, self.root / 'A'), len(b'shared'))
+        self.assertEqual(list((self.root / STORE_DIR).iterdir()), [])
+
+    def test_delete_cbz(self):
+        cbz = self._image('album.cbz', b'PK')
+        self.assertEqual(delete_album(self.root, cbz), 0)
+        self.assertFalse(cbz.exists())
+
+    def test_dedupe_library(self):
+        a = self._image('A/00001.jpg', b'x' * 100)
+        b = self._image('B/00001.jpg', b'x' * 100)
+        c = self._image('C/00001.jpg', b'x' * 100)
+        self._image('C/00002.jpg', b'y' * 100)
+        self._image('C/00003.jpg', b'z' * 50)
+        self._image('C/notes.txt', b'x' * 100)
+        progress = []
+        result = dedupe_library(self.root, workers=1, on_progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(result['scanned'], 5)
+        # 大小唯一的文件不计算哈希
+        self.assertEqual(result['hashed'], 4)
+        self.assertEqual(result['linked'], 2)
+        self.assertEqual(result['bytes_reclaimed'], 200)
+        self.assertFalse(result['cancelled'])
+        self.assertEqual(progress[0], (0, 4))
+        self.assertEqual(progress[-1], (4, 4))
+        self.assertTrue(os.path.samefile(a, b) and os.path.samefile(a, c))
+        # 第二轮：已是硬链接的文件不再重复计入
+        again = dedupe_library(self.root, workers=1)
+        self.assertEqual((again['linked'], again['bytes_reclaimed']), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
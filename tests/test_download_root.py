@@ -0,0 +1,59 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from bench.bench_client import BenchOption
+from bench.mirror_server import MirrorConfig, MirrorServer
+from core.album_downloader import AlbumDownloader
+from core.mirror_health import mirror_health
+
+
+class DownloadRootTest(unittest.TestCase):
+    """下载根目录随每个下载显式传入：不切换进程工作目录，并行下载各自落在自己的保存路径下"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        # 本地镜像不计入镜像健康统计，不写入用户的 mirrors.json
+        patcher = mock.patch.object(mirror_health, 'record')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cfg = MirrorConfig(albums=2, chapters=2, images=3, image_kb=4, latency_ms=0)
+        self.server = MirrorServer(cfg).start()
+        self.addCleanup(self.server.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_parallel_downloads_keep_cwd(self):
+        cwd = os.getcwd()
+        before = set(os.listdir(cwd))
+        option = BenchOption(self.server.base_url)
+        roots = {album_id: self.base / f'root{n}' for n, album_id in enumerate(self.server.album_ids())}
+        results = {}
+
+        def run(album_id):
+            results[album_id] = AlbumDownloader(album_id, option, str(roots[album_id]), resume=False).run()
+
+        with mock.patch('os.chdir', side_effect=AssertionError("下载不应切换工作目录")):
+            threads = [threading.Thread(target=run, args=(album_id,)) for album_id in roots]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(60)
+
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(set(os.listdir(cwd)), before)
+        for album_id, root in roots.items():
+            self.assertTrue(results[album_id][0], results[album_id])
+            images = [p for p in root.rglob('*.jpg') if '.jm_' not in str(p.relative_to(root))]
+            # 2 章 × 3 张，全部在本专辑的保存路径下
+            self.assertEqual(len(images), 6, images)
+            self.assertEqual(len({p.relative_to(root).parts[0] for p in images}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
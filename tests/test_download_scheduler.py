@@ -0,0 +1,171 @@
+import tempfile
+import unittest
+
+from core.queue_store import QueueStore
+
+try:
+    from PyQt5.QtCore import QCoreApplication, QObject, pyqtSignal
+    from core.download_scheduler import DownloadScheduler
+    QT_AVAILABLE = True
+except Exception:
+    QT_AVAILABLE = False
+    QObject = object
+
+    def pyqtSignal(*_args):
+        return None
+
+
+class FakeWorker(QObject):
+    """不启动线程的 DownloadWorker 替身，只记录调度器的调用"""
+    status_changed = pyqtSignal(str)
+    progress_detail = pyqtSignal(dict)
+    download_finished = pyqtSignal(bool, str)
+    finished = pyqtSignal()
+
+    def __init__(self, album_id):
+        super().__init__()
+        self.album_id = album_id
+        self.cancelled = False
+        self.started = False
+        self.paused = False
+        self.alive = False
+
+    def start(self):
+        self.started = True
+
+    def pause(self):
+        self.paused = True
+
+    def resume_download(self):
+        self.paused = False
+
+    def stop(self):
+        self.cancelled = True
+
+    def wait(self, _msecs):
+        return not self.alive
+
+    def finish(self, ok=True):
+        self.download_finished.emit(ok, '')
+        self.finished.emit()
+
+
+@unittest.skipUnless(QT_AVAILABLE, "需要 PyQt5")
+class SchedulerTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = QueueStore(self._tmp.name).open()
+        self.workers = {}
+        self.scheduler = DownloadScheduler(self._make_worker, self.store, max_workers=2)
+        self.preempted = []
+        self.resumed = []
+        self.scheduler.job_preempted.connect(self.preempted.append)
+        self.scheduler.job_resumed.connect(self.resumed.append)
+        self.summaries = []
+        self.scheduler.all_finished.connect(lambda ok, failed: self.summaries.append((ok, failed)))
+
+    def tearDown(self):
+        self.scheduler.stop()
+        self.store.close()
+        self._tmp.cleanup()
+
+    def _make_worker(self, album_id):
+        worker = self.workers[album_id] = FakeWorker(album_id)
+        return worker
+
+    def _start(self, *album_ids):
+        for album_id in album_ids:
+            self.scheduler.enqueue(album_id)
+        self.scheduler.start()
+
+
+class PreemptionTest(SchedulerTestCase):
+
+    def test_download_now_preempts_latest_normal_job(self):
+        self._start('1', '2', '3')
+        self.assertEqual(self.scheduler.active_ids(), ['1', '2'])
+        self.assertTrue(self.scheduler.download_now('9'))
+        # 让位的是最晚开始的普通任务，线程保留、只是暂停
+        self.assertEqual(self.preempted, ['2'])
+        self.assertTrue(self.workers['2'].paused)
+        self.assertTrue(self.workers['9'].started)
+        self.assertEqual(sorted(self.scheduler.active_ids()), ['1', '2', '9'])
+        self.assertEqual(self.store.get('2')['state'], 'running')
+
+    def test_preempted_job_resumes_before_queue(self):
+        self._start('1', '2', '3')
+        self.scheduler.download_now('9')
+        self.workers['9'].finish()
+        # 空出的名额先还给被抢占的任务，而不是排队中的 3
+        self.assertEqual(self.resumed, ['2'])
+        self.assertFalse(self.workers['2'].paused)
+        self.assertNotIn('3', self.workers)
+        self.assertEqual(self.store.get('9')['state'], 'done')
+
+    def test_no_preemption_with_free_slot_or_equal_priority(self):
+        self._start('1')
+        self.scheduler.download_now('9')
+        self.assertEqual(self.preempted, [])
+        self.scheduler.download_now('8')
+        # 同为高优先级，不互相抢占
+        self.assertEqual(self.preempted, ['1'])
+        self.scheduler.download_now('7')
+        self.assertEqual(self.preempted, ['1'])
+        self.assertEqual(self.store.get('7')['state'], 'queued')
+
+    def test_no_preemption_while_paused(self):
+        self._start('1', '2')
+        self.scheduler.pause()
+        self.scheduler.download_now('9')
+        self.assertEqual(self.preempted, [])
+        self.assertNotIn('9', self.workers)
+
+
+class StopTest(SchedulerTestCase):
+
+    def test_stop_with_queued_items_summarizes_after_last_worker(self):
+        self._start('1', '2', '3')
+        self.workers['1'].finish()
+        self.scheduler.stop()
+        self.assertFalse(self.scheduler._ticker.isActive())
+        self.assertTrue(self.workers['2'].cancelled)
+        self.assertEqual(self.summaries, [])
+        self.workers['3'].finish(ok=False)
+        self.assertEqual(self.summaries, [])
+        self.workers['2'].finish(ok=False)
+        # 排队项保留，最后一个线程退出后发出汇总，且只发一次
+        self.assertEqual(self.summaries, [(1, 0)])
+        self.assertEqual(self.store.get('2')['state'], 'stopped')
+        self.assertFalse(self.scheduler._ticker.isActive())
+        self.scheduler.stop()
+        self.assertEqual(self.summaries, [(1, 0)])
+
+    def test_each_batch_summarized_once(self):
+        self._start('1')
+        self.workers['1'].finish()
+        self.assertEqual(self.summaries, [(1, 0)])
+        self.scheduler.enqueue('2')
+        self.scheduler.start()
+        self.scheduler.stop()
+        self.workers['2'].finish(ok=False)
+        self.assertEqual(self.summaries, [(1, 0), (0, 0)])
+
+    def test_wait_all_reports_threads_still_running(self):
+        self._start('1', '2')
+        self.scheduler.stop()
+        self.assertTrue(self.scheduler.wait_all(0))
+        self.workers['2'].alive = True
+        self.assertFalse(self.scheduler.wait_all(0))
+        self.workers['1'].finish(ok=False)
+        self.assertFalse(self.scheduler.wait_all(0))
+        self.workers['2'].finish(ok=False)
+        self.assertTrue(self.scheduler.wait_all(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
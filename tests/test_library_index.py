@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.album_manifest import AlbumManifest
+from core.cbz_writer import CbzWriter
+from core.library_index import POLICY_FORCE, POLICY_SKIP, POLICY_VERIFY, LibraryIndex, should_skip
+
+
+class LibraryIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.root = base / 'downloads'
+        self.root.mkdir()
+        self.index = LibraryIndex(base / 'config').open()
+
+    def tearDown(self):
+        self.index.close()
+        self._tmp.cleanup()
+
+    def _folder(self, name, album_id, verified=True, failed=False):
+        album_dir = self.root / name
+        album_dir.mkdir()
+        img = album_dir / '00001.jpg'
+        img.write_bytes(b'image')
+        m = AlbumManifest(album_dir, album_id)
+        m.open()
+        m.update_meta(album_id=album_id, title=name)
+        m.record('p1/00001', img)
+        if failed:
+            m.record('p1/00002', album_dir / '00002.jpg', 'failed')
+        if verified:
+            m.update_meta(verified=True)
+        m.close()
+        return album_dir
+
+    def _cbz(self, name, album_id, complete=True):
+        src = self.root / 'src.jpg'
+        src.write_bytes(b'image')
+        w = CbzWriter(self.root / name, album_id).open()
+        w.add_file(src, '00001.jpg')
+        w.close(complete=complete)
+        return w.path if complete else w.part
+
+    def test_record_and_lookup(self):
+        album_dir = self._folder('a', '100')
+        self.index.record(self.root, '100', album_dir, images=1, complete=True)
+        entry = self.index.lookup(self.root, ' 100 ')
+        self.assertEqual(entry['path'], str(album_dir))
+        self.assertTrue(entry['complete'])
+        self.assertIsNone(self.index.lookup(self.root, '999'))
+        self.assertIsNone(self.index.lookup(self.root / 'other', '100'))
+
+    def test_lookup_forgets_removed_album(self):
+        album_dir = self._folder('a', '100')
+        self.index.record(self.root, '100', album_dir, complete=True)
+        shutil.rmtree(album_dir)
+        self.assertIsNone(self.index.lookup(self.root, '100'))
+        self.assertEqual(self.index.count(), 0)
+
+    def test_scan(self):
+        self._folder('complete', '100')
+        self._folder('unverified', '101', verified=False)
+        self._folder('with failures', '102', failed=True)
+        self._cbz('archive.cbz', '200')
+        self._cbz('partial.cbz', '201', complete=False)
+        (self.root / 'no manifest').mkdir()
+        (self.root / '.jm_store').mkdir()
+
+        self.assertEqual(self.index.scan(self.root), 5)
+        complete = {aid: bool(self.index.lookup(self.root, aid)['complete'])
+                    for aid in ('100', '101', '102', '200', '201')}
+        self.assertEqual(complete, {'100': True, '101': False, '102': False, '200': True, '201': False})
+        entry = self.index.lookup(self.root, '200')
+        self.assertEqual((entry['kind'], entry['title'], entry['images']), ('cbz', 'archive', 1))
+
+    def test_incremental_scan(self):
+        self._folder('a', '100', verified=False)
+        self.assertEqual(self.index.scan(self.root), 1)
+        # 未变化的条目不再读取
+        self.assertEqual(self.index.scan(self.root), 0)
+        m = AlbumManifest(self.root / 'a', '100')
+        m.open()
+        m.update_meta(verified=True)
+        m.close()
+        stamp = self.root / 'a' / '.jm_manifest.jsonl'
+        st = stamp.stat()
+        os.utime(stamp, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual(self.index.scan(self.root), 1)
+        self.assertTrue(self.index.lookup(self.root, '100')['complete'])
+        shutil.rmtree(self.root / 'a')
+        self.assertEqual(self.index.scan(self.root), 0)
+        self.assertEqual(self.index.count(self.root), 0)
+
+    def test_should_skip(self):
+        entry = {'complete': 1}
+        self.assertTrue(should_skip(entry, POLICY_SKIP))
+        self.assertFalse(should_skip(entry, POLICY_VERIFY))
+        self.assertFalse(should_skip(entry, POLICY_FORCE))
+        self.assertFalse(should_skip({'complete': 0}, POLICY_SKIP))
+        self.assertFalse(should_skip(None, POLICY_SKIP))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import tempfile
+import unittest
+
+from core.queue_store import PRIORITY_HIGH, QueueStore
+
+
+class QueueStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = QueueStore(self._tmp.name).open()
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def _drain(self, shortest_first=False):
+        order = []
+        while True:
+            album_id = self.store.next_queued(shortest_first=shortest_first)
+            if album_id is None:
+                return order
+            self.store.mark_running(album_id)
+            order.append(album_id)
+
+    def test_fifo_within_priority(self):
+        for album_id in ('1', '2', '3'):
+            self.assertTrue(self.store.add(album_id))
+        self.assertEqual(self._drain(), ['1', '2', '3'])
+
+    def test_priority_and_front(self):
+        self.store.add('1')
+        self.store.add('2')
+        self.store.add('3', priority=PRIORITY_HIGH)
+        self.store.add('4', front=True)
+        self.assertEqual(self._drain(), ['3', '4', '1', '2'])
+
+    def test_front_moves_existing_job(self):
+        for album_id in ('1', '2', '3'):
+            self.store.add(album_id)
+        self.store.set_state('3', 'failed', 'boom')
+        self.assertTrue(self.store.add('3', priority=PRIORITY_HIGH, front=True))
+        self.assertEqual(self.store.get('3')['priority'], PRIORITY_HIGH)
+        self.assertEqual(self._drain(), ['3', '1', '2'])
+
+    def test_add_existing(self):
+        self.store.add('1')
+        # 已在排队中：不重复入队
+        self.assertFalse(self.store.add('1'))
+        self.store.mark_running('1')
+        # 运行中的任务不受影响
+        self.assertFalse(self.store.add('1', front=True))
+        self.assertEqual(self.store.get('1')['state'], 'running')
+        self.store.set_state('1', 'done')
+        self.assertTrue(self.store.add('1'))
+        self.assertEqual(self.store.get('1')['state'], 'queued')
+        self.assertEqual(self.store.count(), 1)
+
+    def test_exclude(self):
+        self.store.add('1')
+        self.store.add('2')
+        self.assertEqual(self.store.next_queued(exclude=['1']), '2')
+        self.assertIsNone(self.store.next_queued(exclude=['1', '2']))
+
+    def test_set_priority(self):
+        for album_id in ('1', '2', '3'):
+            self.store.add(album_id)
+        self.assertEqual(self.store.set_priority(['3'], PRIORITY_HIGH), 1)
+        self.assertEqual(self._drain(), ['3', '1', '2'])
+
+    def test_shortest_first(self):
+        for album_id, pages in (('1', 0), ('2', 30), ('3', 5), ('4', -1), ('5', 5)):
+            self.store.add(album_id)
+            self.store.set_pages(album_id, pages)
+        # 页数已知的按页数升序（同页数按入队顺序），未知（0 或获取失败 -1）的按入队顺序排在后面
+        self.assertEqual(self._drain(shortest_first=True), ['3', '5', '2', '1', '4'])
+
+    def test_shortest_first_respects_priority(self):
+        self.store.add('1')
+        self.store.set_pages('1', 3)
+        self.store.add('2', priority=PRIORITY_HIGH)
+        self.store.add('3', priority=PRIORITY_HIGH)
+        self.store.set_pages('3', 100)
+        self.assertEqual(self._drain(shortest_first=True), ['3', '2', '1'])
+
+    def test_missing_pages(self):
+        self.store.add('1')
+        self.store.add('2')
+        self.store.add('3')
+        self.store.set_pages('2', 12)
+        self.store.set_pages('3', -1)
+        self.assertEqual(self.store.missing_pages(), ['1'])
+
+    def test_crash_recovery(self):
+        self.store.add('1')
+        self.store.add('2')
+        self.store.mark_running('1')
+        self.store.close()
+        self.store = QueueStore(self._tmp.name).open()
+        job = self.store.get('1')
+        self.assertEqual(job['state'], 'queued')
+        self.assertEqual(job['attempts'], 1)
+        self.assertEqual(self._drain(), ['1', '2'])
+
+    def test_requeue_remove_clear(self):
+        for album_id in ('1', '2', '3', '4'):
+            self.store.add(album_id)
+        self.store.set_state('1', 'failed', 'x')
+        self.store.set_state('2', 'stopped')
+        self.store.set_state('3', 'done')
+        self.store.mark_running('4')
+        self.assertEqual(self.store.requeue(), 2)
+        # 运行中的任务不会被删除
+        self.assertEqual(self.store.remove(['1', '4']), 1)
+        self.assertEqual(self.store.clear(('done',)), 1)
+        self.assertEqual([j['album_id'] for j in self.store.list_jobs()], ['2', '4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
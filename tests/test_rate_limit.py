@@ -0,0 +1,177 @@
+import unittest
+
+from core.cancellation import CancelToken, DownloadCancelled
+from core.rate_limit import HostLimiter, HostThrottle, TokenBucket
+from core.retry import RetryPolicy, status_of
+
+try:
+    from jmcomic.jm_client_interface import JmImageResp
+    from jmcomic.jm_exception import ExceptionTool, RequestRetryAllFailException, ResponseUnexpectedException
+    JM_AVAILABLE = True
+except Exception:
+    JM_AVAILABLE = False
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b''
+        self.text = ''
+        self.url = 'https://cdn.example.com/media/photos/1/00001.webp'
+
+
+class HttpError(Exception):
+    """requests 风格：状态码在 e.response 上"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+def jm_image_error(status, headers=None):
+    """按 jmcomic 下载图片失败时的真实路径构造异常：JmImageResp.require_success → raises_resp"""
+    resp = JmImageResp(FakeResponse(status, headers))
+    try:
+        resp.require_success()
+    except ResponseUnexpectedException as e:
+        return e
+    raise AssertionError('require_success 未抛出异常')
+
+
+class StatusOfTest(unittest.TestCase):
+
+    def test_requests_style_response(self):
+        self.assertEqual(status_of(HttpError(FakeResponse(503))), 503)
+
+    def test_message_only(self):
+        self.assertEqual(status_of(Exception("请求失败，响应状态码为429，URL=[x]")), 429)
+        self.assertIsNone(status_of(ConnectionError("connection reset")))
+
+    @unittest.skipUnless(JM_AVAILABLE, "需要 jmcomic")
+    def test_jmcomic_image_error(self):
+        e = jm_image_error(429, {'Retry-After': '7'})
+        self.assertEqual(status_of(e), 429)
+        # Retry-After 取自 jmcomic 包装的原始响应
+        self.assertEqual(RetryPolicy(max_retry_after=60).delay_for(0, e), 7.0)
+
+    @unittest.skipUnless(JM_AVAILABLE, "需要 jmcomic")
+    def test_jmcomic_retry_all_failed(self):
+        inner = jm_image_error(503)
+        e = RequestRetryAllFailException('请求重试全部失败', {
+            ExceptionTool.CONTEXT_KEY_RETRY_ERRORS: [{'url': inner.resp.url, 'retry': 0, 'error': inner}],
+        })
+        self.assertEqual(status_of(e), 503)
+
+
+class SlotStatusTest(unittest.TestCase):
+
+    def _fail_in_slot(self, limiter, error):
+        with self.assertRaises(type(error)):
+            with limiter.slot('https://cdn.example.com/a.jpg'):
+                raise error
+
+    def test_status_from_exception_triggers_backoff(self):
+        limiter = HostLimiter(concurrency=8.0, rate=8.0)
+        self._fail_in_slot(limiter, HttpError(FakeResponse(429)))
+        throttle = limiter.get('cdn.example.com')
+        self.assertEqual(throttle.throttled, 1)
+        self.assertEqual(throttle.limit, 4.0)
+        self.assertEqual(throttle.bucket.rate, 4.0)
+
+    @unittest.skipUnless(JM_AVAILABLE, "需要 jmcomic")
+    def test_jmcomic_error_triggers_backoff(self):
+        limiter = HostLimiter(concurrency=8.0)
+        self._fail_in_slot(limiter, jm_image_error(503))
+        self.assertEqual(limiter.get('cdn.example.com').throttled, 1)
+
+    def test_status_written_by_caller_wins(self):
+        limiter = HostLimiter(concurrency=8.0)
+        with self.assertRaises(IOError):
+            with limiter.slot('https://cdn.example.com/a.jpg') as slot:
+                slot['status'] = 429
+                raise IOError('写入失败')
+        self.assertEqual(limiter.get('cdn.example.com').throttled, 1)
+
+    def test_cancellation_only_releases_slot(self):
+        limiter = HostLimiter(concurrency=8.0, rate=8.0)
+        throttle = limiter.get('cdn.example.com')
+        for _ in range(5):
+            self._fail_in_slot(limiter, DownloadCancelled())
+        # 取消不是主机的错误：不计入错误率，也不调节并发与速率
+        self.assertEqual(throttle.inflight, 0)
+        self.assertEqual(throttle.error_ewma, 0.0)
+        self.assertEqual((throttle.limit, throttle.bucket.rate), (8.0, 8.0))
+        self.assertIsNone(throttle.latency_ewma)
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10.0, burst=2.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        # 令牌可预支：后来者依次排得更靠后
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.02)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, delta=0.02)
+
+
+class AimdTest(unittest.TestCase):
+
+    def _request(self, throttle, ok=True, status=None, latency=0.05):
+        throttle.acquire()
+        throttle.release(latency, ok, status)
+
+    def test_429_halves_concurrency_and_rate(self):
+        throttle = HostThrottle('cdn.example.com', rate=8.0, concurrency=8.0)
+        self._request(throttle, ok=False, status=429)
+        self.assertEqual(throttle.limit, 4.0)
+        self.assertEqual(throttle.bucket.rate, 4.0)
+        self.assertEqual(throttle.throttled, 1)
+
+    def test_one_decrease_per_cooldown(self):
+        throttle = HostThrottle('cdn.example.com', rate=8.0, concurrency=8.0, cooldown=60.0)
+        for _ in range(3):
+            self._request(throttle, ok=False, status=503)
+        self.assertEqual(throttle.limit, 4.0)
+        self.assertEqual(throttle.throttled, 3)
+        throttle.cooldown = 0.0
+        self._request(throttle, ok=False, status=429)
+        self.assertEqual(throttle.limit, 2.0)
+
+    def test_floor(self):
+        throttle = HostThrottle('cdn.example.com', rate=1.0, concurrency=2.0, cooldown=0.0,
+                                min_concurrency=1.0, min_rate=0.5)
+        for _ in range(4):
+            self._request(throttle, ok=False, status=429)
+        self.assertEqual(throttle.limit, 1.0)
+        self.assertEqual(throttle.bucket.rate, 0.5)
+
+    def test_additive_increase(self):
+        throttle = HostThrottle('cdn.example.com', burst=100.0, concurrency=4.0)
+        for _ in range(4):
+            self._request(throttle)
+        # 一个完整窗口（limit 次成功）约 +1
+        self.assertTrue(4.9 < throttle.limit < 5.0, throttle.limit)
+        self.assertEqual(throttle.inflight, 0)
+
+    def test_recovers_after_backoff(self):
+        throttle = HostThrottle('cdn.example.com', burst=100.0, concurrency=8.0)
+        self._request(throttle, ok=False, status=429)
+        throttle.error_ewma = 0.0
+        for _ in range(20):
+            self._request(throttle)
+        self.assertTrue(throttle.limit > 6.0, throttle.limit)
+
+    def test_waiting_for_slot_can_be_cancelled(self):
+        throttle = HostThrottle('cdn.example.com', concurrency=1.0)
+        throttle.acquire()
+        token = CancelToken()
+        token.cancel()
+        with self.assertRaises(DownloadCancelled):
+            throttle.acquire(token)
+        self.assertEqual(throttle.inflight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import socket
+import time
+import unittest
+from email.utils import formatdate
+
+from core.cancellation import CancelToken, DownloadCancelled
+from core.retry import RetryPolicy, RetryableStatus, TransientError, parse_retry_after
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except Exception:
+    REQUESTS_AVAILABLE = False
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HttpError(Exception):
+    """requests 风格：状态码在 e.response 上"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+class Flaky:
+    """前 failures 次调用抛出 error，之后返回 result"""
+
+    def __init__(self, error, failures, result='ok'):
+        self.error = error
+        self.failures = failures
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return self.result
+
+
+class ClassificationTest(unittest.TestCase):
+
+    def assertRetryable(self, error, expected=True):
+        self.assertIs(RetryPolicy.is_retryable(error), expected, repr(error))
+
+    def test_transient_network_errors(self):
+        for error in (TimeoutError(), socket.timeout(), ConnectionResetError(), ConnectionRefusedError(),
+                      TransientError("图片校验失败")):
+            self.assertRetryable(error)
+
+    def test_retryable_status(self):
+        for status in (408, 429, 500, 502, 503, 504):
+            self.assertRetryable(HttpError(FakeResponse(status)))
+        self.assertRetryable(RetryableStatus(FakeResponse(503)))
+        self.assertRetryable(Exception("请求失败，响应状态码为502"))
+
+    def test_permanent_failures(self):
+        for status in (400, 401, 403, 404):
+            self.assertRetryable(HttpError(FakeResponse(status)), False)
+        for error in (FileNotFoundError(), PermissionError(), IsADirectoryError(), ValueError("解析失败"),
+                      KeyError('album'), Exception("专辑不存在")):
+            self.assertRetryable(error, False)
+        self.assertRetryable(DownloadCancelled(), False)
+
+    def test_last_inner_error_decides(self):
+        class RetryAllFail(Exception):
+            def __init__(self, errors):
+                super().__init__("请求重试全部失败")
+                self.errors = errors
+
+        self.assertRetryable(RetryAllFail([{'error': ValueError()}, {'error': TimeoutError()}]))
+        self.assertRetryable(RetryAllFail([{'error': TimeoutError()}, {'error': ValueError()}]), False)
+
+    @unittest.skipUnless(REQUESTS_AVAILABLE, "需要 requests")
+    def test_requests_errors(self):
+        self.assertRetryable(requests.exceptions.ConnectTimeout())
+        self.assertRetryable(requests.exceptions.ConnectionError())
+        self.assertRetryable(requests.exceptions.ChunkedEncodingError())
+        self.assertRetryable(requests.exceptions.InvalidURL(), False)
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after(FakeResponse(429, {'Retry-After': '12'})), 12.0)
+        self.assertEqual(parse_retry_after(FakeResponse(429, {'Retry-After': '-3'})), 0.0)
+
+    def test_http_date(self):
+        value = formatdate(time.time() + 30, usegmt=True)
+        delay = parse_retry_after(FakeResponse(503, {'Retry-After': value}))
+        self.assertTrue(25 <= delay <= 31, delay)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(parse_retry_after(FakeResponse(429)))
+        self.assertIsNone(parse_retry_after(FakeResponse(429, {'Retry-After': 'soon'})))
+        self.assertIsNone(parse_retry_after(object()))
+
+    def test_delay_for(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0, max_retry_after=60)
+        self.assertEqual(policy.delay_for(0, HttpError(FakeResponse(429, {'Retry-After': '600'}))), 60)
+        for attempt in range(6):
+            self.assertTrue(0 <= policy.delay_for(attempt, TimeoutError()) <= 4.0)
+
+
+class CallTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(retries=3, base_delay=0)
+
+    def test_retries_until_success(self):
+        fn = Flaky(TimeoutError(), failures=2)
+        retried = []
+        self.assertEqual(self.policy.call(fn, on_retry=lambda n, e, d: retried.append(n)), 'ok')
+        self.assertEqual(fn.calls, 3)
+        self.assertEqual(retried, [1, 2])
+
+    def test_gives_up_after_retries(self):
+        fn = Flaky(ConnectionResetError(), failures=10)
+        with self.assertRaises(ConnectionResetError):
+            self.policy.call(fn)
+        self.assertEqual(fn.calls, 4)
+
+    def test_permanent_error_fails_fast(self):
+        fn = Flaky(HttpError(FakeResponse(404)), failures=10)
+        with self.assertRaises(HttpError):
+            self.policy.call(fn)
+        self.assertEqual(fn.calls, 1)
+
+    def test_check_response_returns_last_response(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return FakeResponse(503)
+
+        resp = self.policy.call(fetch, check_response=True)
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(len(calls), 4)
+        # 非可重试状态码直接交还
+        self.assertEqual(self.policy.call(lambda: FakeResponse(404), check_response=True).status_code, 404)
+
+    def test_cancel_interrupts_backoff(self):
+        token = CancelToken()
+        token.cancel()
+        fn = Flaky(TimeoutError(), failures=10)
+        with self.assertRaises(DownloadCancelled):
+            RetryPolicy(retries=3, base_delay=30).call(fn, token=token)
+        self.assertEqual(fn.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
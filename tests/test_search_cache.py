@@ -0,0 +1,115 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from core.search_cache import STALE_LIMIT, SearchCache, normalize_keyword
+
+ITEMS = [{'id': '100', 'title': '标题', 'author': '-', 'tags': [], 'score': '-', 'cover': ''}]
+
+
+class SearchCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = SearchCache(self._tmp.name, ttl=600).open()
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def _later(self, seconds):
+        return mock.patch('core.search_cache.time.time', return_value=time.time() + seconds)
+
+    def test_normalize_keyword(self):
+        self.assertEqual(normalize_keyword('  ＡＢＣ　全彩  Color '), 'abc 全彩 color')
+        self.assertEqual(normalize_keyword(None), '')
+
+    def test_hit_after_normalization(self):
+        self.cache.put('Full Color', 1, 'mirror-a', ITEMS)
+        hit = self.cache.get('  ｆｕｌｌ   COLOR', 1)
+        self.assertIsNotNone(hit)
+        self.assertTrue(hit.fresh)
+        self.assertEqual(hit.items, ITEMS)
+        self.assertEqual(hit.mirror, 'mirror-a')
+        self.assertIsNone(self.cache.get('full color', 2))
+
+    def test_empty_results_not_cached(self):
+        self.cache.put('nothing', 1, 'mirror-a', [])
+        self.assertIsNone(self.cache.get('nothing', 1))
+
+    def test_disabled(self):
+        self.cache.configure(ttl=0)
+        self.cache.put('kw', 1, 'mirror-a', ITEMS)
+        self.assertIsNone(self.cache.get('kw', 1))
+
+    def test_stale_while_revalidate(self):
+        self.cache.put('kw', 1, 'mirror-a', ITEMS)
+        with self._later(601):
+            hit = self.cache.get('kw', 1)
+        # 过期仍先展示，由调用方后台刷新
+        self.assertFalse(hit.fresh)
+        self.assertEqual(hit.items, ITEMS)
+        with self._later(STALE_LIMIT + 1):
+            self.assertIsNone(self.cache.get('kw', 1))
+        self.assertIsNone(self.cache.get('kw', 1))
+
+    def test_persisted_on_disk(self):
+        self.cache.put('kw', 1, 'mirror-a', ITEMS)
+        self.cache.put('kw', 1, 'mirror-b', ITEMS + ITEMS)
+        self.cache.close()
+        self.cache = SearchCache(self._tmp.name, ttl=600).open()
+        hit = self.cache.get('kw', 1)
+        # 同一关键词与页码取最新的一份
+        self.assertEqual(hit.mirror, 'mirror-b')
+        self.assertEqual(len(hit.items), 2)
+
+    def test_memory_layer_without_disk(self):
+        cache = SearchCache(self._tmp.name)
+        self.assertIsNone(cache._conn)
+        cache.put('kw', 1, 'mirror-a', ITEMS)
+        self.assertEqual(cache.get('kw', 1).items, ITEMS)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.configure(max_bytes=10 ** 6)
+        for page in range(1, 4):
+            self.cache.put('kw', page, 'mirror-a', ITEMS)
+        row = self.cache._conn.execute("SELECT size FROM entries LIMIT 1").fetchone()
+        size = row[0]
+        with self._later(1):
+            self.cache.get('kw', 1)
+        with self._later(2):
+            # 3 份放不下，淘汰到上限的 90%：最久未访问的第 2 页先被淘汰
+            self.cache.configure(max_bytes=size * 3 - 1)
+        self.cache._memory.clear()
+        self.assertIsNotNone(self.cache.get('kw', 1))
+        self.assertIsNone(self.cache.get('kw', 2))
+        self.assertIsNotNone(self.cache.get('kw', 3))
+
+    def test_clear(self):
+        self.cache.put('kw', 1, 'mirror-a', ITEMS)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('kw', 1))
+        self.assertEqual(self.cache._bytes, 0)
+
+    def test_running_byte_total(self):
+        def on_disk():
+            return self.cache._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        self.cache.put('kw', 1, 'mirror-a', ITEMS)
+        self.cache.put('kw', 2, 'mirror-a', ITEMS)
+        # 覆盖同一镜像的记录、另一镜像的新记录
+        self.cache.put('kw', 1, 'mirror-a', ITEMS + ITEMS)
+        self.cache.put('kw', 1, 'mirror-b', ITEMS)
+        self.assertEqual(self.cache._bytes, on_disk())
+        with self._later(STALE_LIMIT + 1):
+            self.assertIsNone(self.cache.get('kw', 1))
+        self.assertEqual(self.cache._bytes, on_disk())
+        self.cache.close()
+        self.cache = SearchCache(self._tmp.name, ttl=600).open()
+        self.assertEqual(self.cache._bytes, on_disk())
+        self.assertGreater(self.cache._bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import unittest
+from pathlib import Path
+
+from core.search_parser import BS4_AVAILABLE, ENGINES, parse_bs4, parse_fast, parse_results, register_engine
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / 'bench' / 'fixtures' / 'search'
+BASE_URL = 'https://18comic.vip'
+
+
+def fixtures():
+    for path in sorted(FIXTURES_DIR.glob('*.html')):
+        expected = json.loads(path.with_suffix('.json').read_text(encoding='utf-8'))
+        yield path.stem, path.read_text(encoding='utf-8'), expected
+
+
+class SearchParserTest(unittest.TestCase):
+
+    def test_fixtures_present(self):
+        self.assertGreaterEqual(len(list(fixtures())), 3)
+
+    def test_fast_matches_expected(self):
+        for name, html, expected in fixtures():
+            with self.subTest(fixture=name):
+                self.assertEqual(parse_fast(html, BASE_URL), expected)
+
+    @unittest.skipUnless(BS4_AVAILABLE, "需要 beautifulsoup4")
+    def test_bs4_matches_expected(self):
+        for name, html, expected in fixtures():
+            with self.subTest(fixture=name):
+                self.assertEqual(parse_bs4(html, BASE_URL), expected)
+
+    def test_edge_cases(self):
+        html = (FIXTURES_DIR / 'edge_cases.html').read_text(encoding='utf-8')
+        items = {item['id']: item for item in parse_fast(html, BASE_URL)}
+        # 脚本与注释里的链接不算，重复的专辑只取第一次
+        self.assertNotIn('100001', items)
+        self.assertNotIn('100002', items)
+        self.assertEqual(items['100010']['title'], '大写标签 & 单引号属性')
+        self.assertEqual(items['100010']['cover'], 'https://cdn.example.com/covers/100010.jpg')
+        self.assertEqual(items['100011']['cover'], BASE_URL + '/media/albums/100011.jpg')
+        self.assertEqual(len(items['100011']['tags']), 6)
+        self.assertEqual(items['100013']['cover'], '')
+
+    def test_no_results(self):
+        self.assertEqual(parse_results('<html><body>没有结果</body></html>', BASE_URL), [])
+
+    @unittest.skipUnless(BS4_AVAILABLE, "需要 beautifulsoup4")
+    def test_falls_back_to_bs4(self):
+        html = (FIXTURES_DIR / 'edge_cases.html').read_text(encoding='utf-8')
+
+        def broken(_html, _base):
+            raise ValueError('解析失败')
+
+        register_engine('broken', broken)
+        register_engine('empty', lambda _html, _base: [])
+        try:
+            expected = parse_bs4(html, BASE_URL)
+            self.assertEqual(parse_results(html, BASE_URL, engine='broken'), expected)
+            # 页面里有专辑链接却一条也没解析出
+            self.assertEqual(parse_results(html, BASE_URL, engine='empty'), expected)
+        finally:
+            ENGINES.pop('broken', None)
+            ENGINES.pop('empty', None)
+
+
+if __name__ == '__main__':
+    unittest.main()
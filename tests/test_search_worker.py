@@ -0,0 +1,97 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core.search_cache import SearchCache
+
+try:
+    from core import search_worker
+    from core.search_prefetch import SearchPrefetcher
+    from core.search_worker import SearchWorker
+    QT_AVAILABLE = True
+except Exception:
+    QT_AVAILABLE = False
+
+ITEMS = [{'id': '100', 'title': '标题', 'author': '-', 'tags': [], 'score': '-', 'cover': ''}]
+
+
+@unittest.skipUnless(QT_AVAILABLE, "需要 PyQt5")
+class HedgingTest(unittest.TestCase):
+    """_fetch_mirror 以各镜像的预设答案替代网络请求"""
+
+    def _search(self, answers, hedge_delay=0.05):
+        worker = SearchWorker('kw', mirrors=list(answers), hedge_delay=hedge_delay, retries=0)
+
+        def fetch(base, _query, _page, cancel: threading.Event):
+            delay, result = answers[base]
+            cancel.wait(delay)
+            return None if cancel.is_set() else result
+
+        worker._fetch_mirror = fetch
+        start = time.monotonic()
+        with mock.patch.object(search_worker, 'SCRAPER_AVAILABLE', True):
+            items = worker._scrape_search('kw', 1)
+        return items, worker.mirror, time.monotonic() - start
+
+    def test_first_results_win(self):
+        items, mirror, _elapsed = self._search({'https://a': (0.5, ITEMS), 'https://b': (0.0, ITEMS)})
+        self.assertEqual((items, mirror), (ITEMS, 'https://b'))
+
+    def test_empty_page_is_final(self):
+        # 正常的空结果页即是答案，不等慢镜像
+        items, mirror, elapsed = self._search({'https://a': (0.0, []), 'https://b': (2.0, ITEMS)})
+        self.assertEqual((items, mirror), ([], 'https://a'))
+        self.assertLess(elapsed, 1.0)
+
+    def test_unparsed_page_waits_for_other_mirrors(self):
+        items, mirror, _elapsed = self._search({'https://a': (0.0, search_worker._UNPARSED),
+                                                'https://b': (0.2, ITEMS)})
+        self.assertEqual((items, mirror), (ITEMS, 'https://b'))
+
+
+@unittest.skipUnless(QT_AVAILABLE, "需要 PyQt5")
+class PrefetchReadyTest(unittest.TestCase):
+    """界面可能正等着预取的页：每条退出路径都要发出 page_ready"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = SearchCache(self._tmp.name).open()
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def _run(self, prefetcher, scrape=None):
+        ready = []
+        prefetcher.page_ready.connect(lambda kw, page, n: ready.append((kw, page, n)))
+        if scrape is not None:
+            prefetcher._scrape_search = scrape
+        prefetcher.run()
+        return ready
+
+    def test_cached_page(self):
+        self.cache.put('kw', 2, 'https://a', ITEMS)
+        prefetcher = SearchPrefetcher(' kw ', 2, self.cache, warm_covers=False)
+        self.assertEqual(self._run(prefetcher), [('kw', 2, 1)])
+
+    def test_early_exits(self):
+        self.assertEqual(self._run(SearchPrefetcher('kw', 2, None)), [('kw', 2, -1)])
+        self.assertEqual(self._run(SearchPrefetcher('123', 2, self.cache)), [('123', 2, -1)])
+        self.cache.configure(ttl=0)
+        self.assertEqual(self._run(SearchPrefetcher('kw', 2, self.cache)), [('kw', 2, -1)])
+
+    def test_failed_or_stopped(self):
+        def fail(_kw, _page):
+            raise TimeoutError()
+
+        self.assertEqual(self._run(SearchPrefetcher('kw', 2, self.cache), fail), [('kw', 2, -1)])
+        prefetcher = SearchPrefetcher('kw', 2, self.cache)
+        prefetcher.stop()
+        self.assertEqual(self._run(prefetcher, lambda _kw, _page: ITEMS), [('kw', 2, -1)])
+        self.assertIsNone(self.cache.get('kw', 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
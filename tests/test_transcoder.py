@@ -0,0 +1,56 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from core.transcoder import Transcoder, available_formats
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = available_formats()['JPG']
+except Exception:
+    PIL_AVAILABLE = False
+
+
+@unittest.skipUnless(PIL_AVAILABLE, "需要 Pillow")
+class TranscoderTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _png(self, name):
+        path = self.root / name
+        Image.new('RGB', (8, 8), (200, 10, 10)).save(path, 'PNG')
+        return path
+
+    def test_callbacks_run_on_waiting_thread(self):
+        transcoder = Transcoder('JPG')
+        done = []
+        for i in range(3):
+            transcoder.submit(self._png(f'{i}.png'),
+                              lambda dst, *_: done.append((dst, threading.current_thread())))
+        transcoder.wait()
+        # 登记在调用 wait() 的线程中完成，而不是进程池的管理线程
+        self.assertEqual(len(done), 3)
+        self.assertTrue(all(t is threading.current_thread() for _dst, t in done))
+        self.assertTrue(all(dst.endswith('.jpg') and Path(dst).exists() for dst, _t in done))
+        self.assertEqual(transcoder.files, 3)
+
+    def test_callback_error_recorded(self):
+        transcoder = Transcoder('JPG')
+
+        def on_done(*_args):
+            raise OSError("磁盘已满")
+
+        transcoder.submit(self._png('a.png'), on_done)
+        transcoder.wait()
+        self.assertIn("磁盘已满", transcoder.error)
+        self.assertEqual(transcoder.drain(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import sys
 import os
 import subprocess
-from PyQt5.QtWidgets import QMainWindow, QTableWidgetItem, QPushButton, QFileDialog, QListWidgetItem, QLabel
+from PyQt5.QtWidgets import QMainWindow, QTableWidgetItem, QPushButton, QFileDialog, QLabel
 from PyQt5.QtGui import QPixmap, QPainter
 from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt5.uic import loadUi
@@ -22,6 +22,22 @@ class MainWindow(QMainWindow):
         self.search_debounce.setSingleShot(True)
         self.search_debounce.setInterval(400)
         self.search_debounce.timeout.connect(lambda: self.start_search(self.current_page))
+        # 搜索代号：每次发起搜索 +1，被取代的搜索线程立即断开连接，其结果按代号丢弃
+        self.search_thread = None
+        self._search_generation = 0
+        self._retired_searches = []
+        # 渲染代号：换一批结果后，上一批逐条渲染的回调不再继续
+        self._render_generation = 0
+        # 下一页预取：当前页渲染完成并空闲一段时间后开始，关键词变化即取消
+        from core.search_prefetch import PREFETCH_IDLE_MS
+        self._prefetcher = None
+        self._retired_prefetchers = []
+        self._prefetch_pending = None  # (关键词, 页码)：预取已发出、结果尚未返回
+        self._awaiting_prefetch = None  # 用户翻到的正是在途预取的页，等它返回
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(PREFETCH_IDLE_MS)
+        self._prefetch_timer.timeout.connect(self._start_prefetch)
 
         # 事件绑定
         if hasattr(self, 'search_btn'):
@@ -49,6 +65,48 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
 
+        # 并发下载调度器（首次开始下载时按设置创建），线程数可在设置页实时调整
+        self._scheduler = None
+        self._download_save_path = ''
+        self._batch_done = 0
+        self._job_fractions = {}
+        # 持久化下载队列（崩溃/退出后保留），列表视图直接渲染自队列库
+        from pathlib import Path
+        from core.queue_store import QueueStore
+        from ui.queue_model import QueueListModel
+        self._queue_store = QueueStore(Path.home() / ".jmcomic_downloader").open()
+        self._queue_model = QueueListModel(self._queue_store, self)
+        self._queue_model.reload()
+        if hasattr(self, 'download_list'):
+            self.download_list.setModel(self._queue_model)
+        # 已下载索引：专辑 ID → 漫画库条目，入队/派发前据此跳过已有专辑
+        from core.library_index import LibraryIndex
+        self._library_index = LibraryIndex(Path.home() / ".jmcomic_downloader").open()
+        # 短作业优先所需的页数预取（只请求专辑详情）
+        self._meta_worker = None
+        self._meta_attempted = set()
+        self._option_warned = set()
+        self._scanned_roots = set()
+        # 已下载索引的后台补录：同一时间只跑一个扫描线程，其余目录与扫描完成后的回调排队
+        self._scan_worker = None
+        self._scan_waiters = []
+        # 搜索结果缓存（内存 LRU + 磁盘），有效期与上限在加载设置时生效
+        from core.search_cache import SearchCache
+        self._search_cache = SearchCache(Path.home() / ".jmcomic_downloader").open()
+        self._stores_closed = False
+        if hasattr(self, 'prioritize_queue_btn'):
+            self.prioritize_queue_btn.clicked.connect(self._prioritize_queue_selected)
+        if hasattr(self, 'thread_count_spin'):
+            self.thread_count_spin.valueChanged.connect(self._on_thread_count_changed)
+        if hasattr(self, 'pause_download_btn'):
+            self.pause_download_btn.clicked.connect(self._toggle_pause_download)
+        # 漫画库去重（后台线程 + 多进程哈希）
+        self._dedupe_worker = None
+        self._delete_worker = None
+        if hasattr(self, 'dedupe_btn'):
+            self.dedupe_btn.clicked.connect(self._start_dedupe)
+        self._init_settings()
+
     # ========== 阅读器功能 ==========
     def _reader_update_page_label(self):
         if hasattr(self, 'reader_page_label') and hasattr(self, '_reader_files'):
@@ -68,7 +126,7 @@ class MainWindow(QMainWindow):
             return
         img = files[idx]
         if hasattr(self, 'reader_image_label'):
-            pix = QPixmap(img)
+            pix = self._reader_pixmap(img)
             if not pix.isNull():
                 lab_size = self.reader_image_label.size()
                 use_offset = self._drag_offset if offset is None else offset
@@ -98,6 +156,20 @@ class MainWindow(QMainWindow):
                 self.reader_image_label.setText("无法加载图片")
         self._reader_update_page_label()
 
+    @staticmethod
+    def _reader_pixmap(entry) -> QPixmap:
+        # 阅读器条目：散图为文件路径，CBZ 为 (归档路径, 条目名)，直接从归档读取不解压
+        if isinstance(entry, tuple):
+            pix = QPixmap()
+            try:
+                import zipfile
+                with zipfile.ZipFile(entry[0]) as zf:
+                    pix.loadFromData(zf.read(entry[1]))
+            except Exception:
+                pass
+            return pix
+        return QPixmap(entry)
+
     def _center_offset(self, pw: int, ph: int, lw: int, lh: int):
         # 将图片在标签内居中（若图片小于容器）
         x = (lw - pw) // 2 if pw < lw else 0
@@ -189,7 +261,7 @@ class MainWindow(QMainWindow):
                             files = getattr(self, '_reader_files', [])
                             idx = getattr(self, '_reader_index', 0)
                             if files and 0 <= idx < len(files):
-                                pix = QPixmap(files[idx])
+                                pix = self._reader_pixmap(files[idx])
                                 if not pix.isNull():
                                     lab = self.reader_image_label.size()
                                     self._drag_offset = self._center_offset(pix.width(), pix.height(), lab.width(), lab.height())
@@ -229,10 +301,8 @@ class MainWindow(QMainWindow):
 
         self.update_pagination_ui()
 
-        # 线程占位
-        self.search_thread = None
-        self.download_thread = None
-        # 初始化设置存储
+    def _init_settings(self):
+        # 初始化设置存储并绑定信号：只在构造时执行一次，窗口缩放不会重置控件或重复连接
         from pathlib import Path
         self._settings = SettingsStore(Path.home() / ".jmcomic_downloader")
         data = self._settings.load()
@@ -268,6 +338,35 @@ class MainWindow(QMainWindow):
             idx = self.image_format_combo.findText(fmt)
             if idx >= 0:
                 self.image_format_combo.setCurrentIndex(idx)
+        if hasattr(self, 'image_quality_spin'):
+            self.image_quality_spin.setValue(self._settings.get_image_quality())
+        if hasattr(self, 'resume_download_check'):
+            self.resume_download_check.setChecked(self._settings.get_resume_download())
+        if hasattr(self, 'output_mode_combo'):
+            self.output_mode_combo.setCurrentIndex(1 if self._settings.get_output_mode() == 'cbz' else 0)
+        if hasattr(self, 'dedupe_check'):
+            self.dedupe_check.setChecked(self._settings.get_dedupe())
+        if hasattr(self, 'chapter_workers_spin'):
+            self.chapter_workers_spin.setValue(self._settings.get_chapter_workers())
+        if hasattr(self, 'verify_decode_check'):
+            self.verify_decode_check.setChecked(self._settings.get_verify_decode())
+        if hasattr(self, 'image_threads_spin'):
+            self.image_threads_spin.setValue(self._settings.get_image_threads())
+        if hasattr(self, 'shortest_first_check'):
+            self.shortest_first_check.setChecked(self._settings.get_shortest_first())
+        if hasattr(self, 'search_prefetch_check'):
+            self.search_prefetch_check.setChecked(self._settings.get_search_prefetch())
+        if hasattr(self, 'prefetch_covers_check'):
+            self.prefetch_covers_check.setChecked(self._settings.get_prefetch_covers())
+        if hasattr(self, 'search_cache_ttl_spin'):
+            self.search_cache_ttl_spin.setValue(self._settings.get_search_cache_ttl())
+        if hasattr(self, 'search_cache_mb_spin'):
+            self.search_cache_mb_spin.setValue(self._settings.get_search_cache_mb())
+        self._search_cache.configure(ttl=self._settings.get_search_cache_ttl() * 60,
+                                     max_bytes=self._settings.get_search_cache_mb() * 1024 * 1024)
+        if hasattr(self, 'existing_policy_combo'):
+            self.existing_policy_combo.setCurrentIndex(
+                ('skip', 'verify', 'force').index(self._settings.get_existing_policy()))
         if hasattr(self, 'theme_combo'):
             theme = self._settings.get_theme()
             idx = self.theme_combo.findText(theme)
@@ -285,7 +384,7 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'save_settings_btn'):
             self.save_settings_btn.clicked.connect(self._save_settings)
         if hasattr(self, 'library_refresh_btn'):
-            self.library_refresh_btn.clicked.connect(self._refresh_library)
+            self.library_refresh_btn.clicked.connect(lambda: self._refresh_library(scan=True))
         if hasattr(self, 'library_list'):
             self.library_list.itemClicked.connect(self._on_library_item_clicked)
             # 兼容键盘/程序改变选中项
@@ -305,6 +404,8 @@ class MainWindow(QMainWindow):
             self.reader_jump_input.returnPressed.connect(self._reader_jump)
         if hasattr(self, 'remove_queue_btn'):
             self.remove_queue_btn.clicked.connect(self._remove_queue_selected)
+        if hasattr(self, 'clear_finished_queue_btn'):
+            self.clear_finished_queue_btn.clicked.connect(self._clear_finished_queue)
         if hasattr(self, 'stop_download_btn'):
             self.stop_download_btn.clicked.connect(self._stop_download)
 
@@ -335,7 +436,7 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
         # 初始刷新一次，保证无需额外操作即可浏览
-        self._refresh_library()
+        self._refresh_library(scan=True)
 
     # ========== 搜索逻辑 ==========
     def on_search_clicked(self):
@@ -344,6 +445,9 @@ class MainWindow(QMainWindow):
 
     def on_search_text_changed(self, _text: str):
         self.current_page = 1
+        self._cancel_prefetch()
+        # 关键词已变，旧关键词的搜索不必等防抖结束
+        self._cancel_search()
         if self.search_input.text().strip():
             self.search_debounce.start()
         else:
@@ -359,18 +463,70 @@ class MainWindow(QMainWindow):
         except Exception:
             return
 
-        if hasattr(self, 'search_btn'):
-            self.search_btn.setEnabled(False)
-        if hasattr(self, 'statusbar'):
-            self.statusbar.showMessage(f"正在搜索: {kw}（第 {page} 页）")
+        gen = self._cancel_search()
+
+        # 正在预取的就是这一页：不重复请求，等预取返回后从缓存渲染
+        self._prefetch_timer.stop()
+        if self._prefetch_pending == (kw, page):
+            self._awaiting_prefetch = (kw, page)
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage(f"正在搜索: {kw}（第 {page} 页）")
+            return
+        if self._prefetcher is not None and self._prefetcher.keyword != kw:
+            self._cancel_prefetch()
+
+        # 缓存命中立即渲染；未过期则不再请求，过期的在后台刷新（结果有变化才重新渲染）
+        hit = self._search_cache.get(kw, page)
+        if hit is not None:
+            self._search_shown_ids = [it.get('id') for it in hit.items]
+            self.on_search_finished(hit.items, "")
+            if hit.fresh:
+                return
+        else:
+            if hasattr(self, 'search_btn'):
+                self.search_btn.setEnabled(False)
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage(f"正在搜索: {kw}（第 {page} 页）")
 
         # 使用设置中的代理与超时
         proxy = self._settings.get_proxy() if hasattr(self, '_settings') else ''
         timeout = self._settings.get_timeout() if hasattr(self, '_settings') else 30
-        self.search_thread = SearchWorker(kw, page=page, proxy=proxy, timeout=timeout)
-        self.search_thread.search_finished.connect(self.on_search_finished)
+        retries = self._settings.get_retry_count() if hasattr(self, '_settings') else 3
+        self.search_thread = SearchWorker(kw, page=page, proxy=proxy, timeout=timeout, retries=retries,
+                                          cache=self._search_cache, generation=gen)
+        handler = self._on_search_revalidated if hit is not None else self.on_search_finished
+        self.search_thread.search_finished.connect(
+            lambda results, error, gen=gen, handler=handler: self._on_search_result(gen, handler, results, error))
         self.search_thread.start()
 
+    def _cancel_search(self) -> int:
+        """取代当前搜索：代号 +1，进行中的搜索线程断开连接且不再发出结果；返回新代号"""
+        self._search_generation += 1
+        worker = self.search_thread
+        if worker is not None and worker.isRunning():
+            worker.cancel()
+            # 运行中的线程对象须保留到结束
+            self._retired_searches = [w for w in self._retired_searches if w.isRunning()]
+            self._retired_searches.append(worker)
+        self.search_thread = None
+        if hasattr(self, 'search_btn'):
+            self.search_btn.setEnabled(True)
+        return self._search_generation
+
+    def _on_search_result(self, gen: int, handler, results, error: str):
+        if gen != self._search_generation:
+            # 已被更新的搜索取代（取消前已在途的信号）
+            return
+        handler(results, error)
+
+    def _on_search_revalidated(self, results, error: str):
+        # 后台刷新失败时保留已展示的缓存结果
+        if error or not results:
+            return
+        if [it.get('id') for it in results] == getattr(self, '_search_shown_ids', None):
+            return
+        self.on_search_finished(results, "")
+
     def on_search_finished(self, results, error: str):
         if hasattr(self, 'search_btn'):
             self.search_btn.setEnabled(True)
@@ -379,13 +535,19 @@ class MainWindow(QMainWindow):
             return
 
         # 顺序加载：每次渲染一行并等待封面加载完成再继续，避免卡顿
+        self._render_generation += 1
+        self._search_shown_ids = [it.get('id') for it in results]
+        self._last_result_count = len(results)
         if hasattr(self, 'search_table'):
             self.search_table.setRowCount(0)
             self._pending_results = list(results)
             self._start_sequential_results()
 
-    def _start_sequential_results(self):
-        # 启动或继续逐条渲染
+    def _start_sequential_results(self, gen: int = None):
+        # 启动或继续逐条渲染；gen 为上一条所属的渲染代号，已换批则停止
+        if gen is not None and gen != self._render_generation:
+            return
+        gen = self._render_generation
         if not hasattr(self, '_pending_results'):
             return
         if not self._pending_results:
@@ -393,6 +555,8 @@ class MainWindow(QMainWindow):
                 total = getattr(self, '_last_result_count', 0)
                 self.statusbar.showMessage(f"搜索完成，找到 {total} 个结果")
             self.update_pagination_ui()
+            if getattr(self, '_last_result_count', 0) > 0:
+                self._prefetch_timer.start()
             return
         if not hasattr(self, '_cover_loaders'):
             self._cover_loaders = []
@@ -428,16 +592,75 @@ class MainWindow(QMainWindow):
         self.search_table.setCellWidget(row, 6, op_widget)
 
         # 封面：加载完成后继续下一条；没有封面则立即继续
-        if item.get('cover'):
-            loader = _CoverLoader(row, item['cover'], self._settings.get_proxy() if hasattr(self, '_settings') else '', self._settings.get_timeout() if hasattr(self, '_settings') else 15)
+        from core.cover_cache import cover_cache
+        cached = cover_cache.get(item['cover']) if item.get('cover') else None
+        if cached is not None:
+            # 已预取或刚看过的封面直接显示
+            self._on_cover_loaded(row, cached)
+            QTimer.singleShot(0, lambda: self._start_sequential_results(gen))
+        elif item.get('cover'):
+            loader = _CoverLoader(row, item['cover'], self._settings.get_proxy() if hasattr(self, '_settings') else '', self._settings.get_timeout() if hasattr(self, '_settings') else 15,
+                                  self._settings.get_retry_count() if hasattr(self, '_settings') else 3)
             def _after_loaded(r: int, data: bytes):
+                if gen != self._render_generation:
+                    # 表格已换成新的结果，行号不再对应
+                    return
                 self._on_cover_loaded(r, data)
-                QTimer.singleShot(0, self._start_sequential_results)
+                QTimer.singleShot(0, lambda: self._start_sequential_results(gen))
             loader.loaded.connect(_after_loaded)
             self._cover_loaders.append(loader)
             loader.start()
         else:
-            QTimer.singleShot(0, self._start_sequential_results)
+            QTimer.singleShot(0, lambda: self._start_sequential_results(gen))
+
+    def _start_prefetch(self):
+        if not hasattr(self, '_settings') or not self._settings.get_search_prefetch():
+            return
+        if not self._search_cache.enabled:
+            return
+        search_thread = getattr(self, 'search_thread', None)
+        if search_thread is not None and search_thread.isRunning():
+            return
+        kw = self.search_input.text().strip() if hasattr(self, 'search_input') else ''
+        page = self.current_page + 1
+        if not kw or kw.isdigit():
+            return
+        if self._prefetcher is not None and self._prefetcher.isRunning() \
+                and (self._prefetcher.keyword, self._prefetcher.page) == (kw, page):
+            return
+        self._cancel_prefetch()
+        try:
+            from core.search_prefetch import SearchPrefetcher
+        except Exception:
+            return
+        self._prefetcher = SearchPrefetcher(kw, page, self._search_cache,
+                                            proxy=self._settings.get_proxy(),
+                                            timeout=self._settings.get_timeout(),
+                                            warm_covers=self._settings.get_prefetch_covers())
+        self._prefetcher.page_ready.connect(self._on_prefetch_ready)
+        self._prefetch_pending = (kw, page)
+        self._prefetcher.start()
+
+    def _on_prefetch_ready(self, keyword: str, page: int, _count: int):
+        if self._prefetch_pending != (keyword, page):
+            return
+        self._prefetch_pending = None
+        if self._awaiting_prefetch == (keyword, page):
+            self._awaiting_prefetch = None
+            # 预取成功时直接命中缓存；失败则照常发起搜索
+            self.start_search(page)
+
+    def _cancel_prefetch(self):
+        self._prefetch_timer.stop()
+        self._prefetch_pending = None
+        self._awaiting_prefetch = None
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            # 运行中的线程对象须保留到结束
+            self._retired_prefetchers = [p for p in self._retired_prefetchers if p.isRunning()]
+            if self._prefetcher.isRunning():
+                self._retired_prefetchers.append(self._prefetcher)
+            self._prefetcher = None
 
     def go_prev_page(self):
         if self.current_page > 1:
@@ -460,42 +683,129 @@ class MainWindow(QMainWindow):
         if path and hasattr(self, 'download_path_input'):
             self.download_path_input.setText(path)
 
+    # 队列：持久化于 QueueStore，download_list 为其视图
+    def _queue_add(self, album_id: str, front: bool = False) -> bool:
+        if not album_id:
+            return False
+        skip = self._library_skip_reason(album_id)
+        if skip:
+            if hasattr(self, 'log_output'):
+                self.log_output.append(skip)
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage(skip)
+            return False
+        if self._scheduler is not None and self._scheduler.is_running():
+            # 下载进行中：交给调度器，有空闲名额时立即派发
+            added = self._scheduler.enqueue(album_id, front=front)
+        else:
+            added = self._queue_store.add(album_id, front=front)
+        self._queue_model.upsert(album_id)
+        if added:
+            self._prefetch_page_counts()
+        return added
+
+    def _existing_policy(self) -> str:
+        return self._settings.get_existing_policy() if hasattr(self, '_settings') else 'skip'
+
+    def _library_entry(self, album_id: str, root: str = ''):
+        root = root or (self.download_path_input.text().strip() if hasattr(self, 'download_path_input') else '')
+        if not root:
+            return None
+        try:
+            return self._library_index.lookup(root, album_id)
+        except Exception:
+            return None
+
+    def _library_skip_reason(self, album_id: str, root: str = ''):
+        # 只查本地索引，不发网络请求
+        from core.library_index import should_skip, skip_message
+        entry = self._library_entry(album_id, root)
+        return skip_message(entry) if should_skip(entry, self._existing_policy()) else None
+
+    def _queue_set_state(self, album_id: str, state: str, detail: str = None, error: str = None):
+        self._queue_model.set_state(album_id, state, detail=detail, error=error)
+
     def _add_to_queue(self):
-        if not hasattr(self, 'album_id_input') or not hasattr(self, 'download_list'):
+        if not hasattr(self, 'album_id_input'):
             return
         album_id = self.album_id_input.text().strip()
         if not album_id:
             if hasattr(self, 'statusbar'):
                 self.statusbar.showMessage("请输入漫画ID")
             return
-        for i in range(self.download_list.count()):
-            if album_id in self.download_list.item(i).text():
-                return
-        self.download_list.addItem(QListWidgetItem(f"漫画ID: {album_id}"))
+        self._queue_add(album_id)
 
     def _add_id_to_queue(self, album_id: str):
-        if not album_id or not hasattr(self, 'download_list'):
+        if not album_id:
             return
-        for i in range(self.download_list.count()):
-            if album_id in self.download_list.item(i).text():
-                return
-        self.download_list.addItem(QListWidgetItem(f"漫画ID: {album_id}"))
+        self._queue_add(album_id)
 
-    def _start_download(self, album_id_override: str = ""):
-        # 简化：取队列第一个或输入框（仅在成功启动后再移除队列项）
-        album_id = album_id_override or None
-        deque_index = None
-        if album_id is None and hasattr(self, 'download_list') and self.download_list.count() > 0:
-            text = self.download_list.item(0).text()
-            album_id = ''.join(ch for ch in text if ch.isdigit())
-            deque_index = 0
-        if not album_id and hasattr(self, 'album_id_input'):
-            album_id = self.album_id_input.text().strip()
-        if not album_id:
-            if hasattr(self, 'statusbar'):
-                self.statusbar.showMessage("请输入漫画ID")
+    def _ensure_scheduler(self):
+        if self._scheduler is None:
+            from core.download_scheduler import DownloadScheduler
+            n = self._settings.get_thread_count() if hasattr(self, '_settings') else 3
+            if hasattr(self, 'thread_count_spin'):
+                n = self.thread_count_spin.value()
+            self._scheduler = DownloadScheduler(self._create_download_worker, self._queue_store, max_workers=n, parent=self,
+                                                precheck=lambda aid: self._library_skip_reason(aid, self._download_save_path))
+            self._scheduler.job_started.connect(self._on_job_started)
+            self._scheduler.job_status.connect(self._on_job_status)
+            self._scheduler.job_progress.connect(self._on_job_progress)
+            self._scheduler.job_finished.connect(self._on_download_finished)
+            self._scheduler.job_stopped.connect(self._on_download_stopped)
+            self._scheduler.job_skipped.connect(self._on_download_skipped)
+            self._scheduler.job_preempted.connect(self._on_job_preempted)
+            self._scheduler.job_resumed.connect(self._on_job_resumed)
+            self._scheduler.set_shortest_first(self._shortest_first())
+            self._scheduler.throughput_changed.connect(self._on_throughput_changed)
+            self._scheduler.all_finished.connect(self._on_all_downloads_finished)
+        return self._scheduler
+
+    def _create_download_worker(self, album_id: str):
+        from core.download_worker import DownloadWorker
+        from core.jm_option import get_jm_option
+        save_path = self._download_save_path
+        # 按已保存的设置构建并缓存，设置不变时整批下载共用同一个客户端
+        jm_option = get_jm_option(self._settings if hasattr(self, '_settings') else None)
+        if jm_option is None:
+            raise RuntimeError("JMComic 配置创建失败")
+        self._warn_option(jm_option)
+        resume = self._settings.get_resume_download() if hasattr(self, '_settings') else True
+        if self._existing_policy() == 'force' and self._library_entry(album_id, save_path) is not None:
+            # 强制重新下载：库中已有的专辑不续传
+            resume = False
+        retries = self._settings.get_retry_count() if hasattr(self, '_settings') else 3
+        from core.transcoder import Transcoder
+        fmt = self._settings.get_image_format() if hasattr(self, '_settings') else '原始格式'
+        quality = self._settings.get_image_quality() if hasattr(self, '_settings') else 90
+        output = self._settings.get_output_mode() if hasattr(self, '_settings') else 'folder'
+        dedupe = self._settings.get_dedupe() if hasattr(self, '_settings') else False
+        chapter_workers = self._settings.get_chapter_workers() if hasattr(self, '_settings') else 3
+        verify_decode = self._settings.get_verify_decode() if hasattr(self, '_settings') else False
+        image_workers = self._settings.get_image_threads() if hasattr(self, '_settings') else 8
+        return DownloadWorker(album_id, save_path, jm_option, workspace_dir=save_path, resume=resume, retries=retries,
+                              transcoder=Transcoder(fmt, quality), output=output, dedupe=dedupe,
+                              chapter_workers=chapter_workers, verify_decode=verify_decode,
+                              image_workers=image_workers, index=self._library_index)
+
+    def _warn_option(self, option):
+        # 完整配置构建失败、已退回默认配置：每个配置只提示一次
+        warning = getattr(option, 'warning', '')
+        if not warning or option.key in self._option_warned:
             return
+        self._option_warned.add(option.key)
+        if hasattr(self, 'log_output'):
+            self.log_output.append(warning)
+        if hasattr(self, 'statusbar'):
+            self.statusbar.showMessage(warning)
+
+    def _on_thread_count_changed(self, n: int):
+        if self._scheduler is not None:
+            self._scheduler.set_max_workers(n)
 
+    def _start_download(self, album_id_override: str = ""):
+        # 队列中所有待下载项交给调度器；指定 ID（搜索页“下载”）时插到队首
+        album_id_override = album_id_override or ""
         save_path = self.download_path_input.text().strip() if hasattr(self, 'download_path_input') else ""
         if not save_path:
             if hasattr(self, 'statusbar'):
@@ -508,62 +818,187 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            from core.download_worker import DownloadWorker
-            from core.jm_option import create_jm_option
-            jm_option = create_jm_option(save_path)
-            if jm_option is None:
-                raise RuntimeError("JMComic 配置创建失败")
+            from core.jm_option import JM_AVAILABLE
+            if not JM_AVAILABLE:
+                raise RuntimeError("未安装 jmcomic 库")
+            scheduler = self._ensure_scheduler()
         except Exception as e:
             if hasattr(self, 'log_output'):
                 self.log_output.append(f"无法开始下载: {e}")
             if hasattr(self, 'statusbar'):
                 self.statusbar.showMessage(f"无法开始下载: {e}")
             return
+        self._download_save_path = save_path
+        # 派发前的已下载检测依赖索引：新的保存目录先在后台补录一次，完成后再派发
+        if save_path not in self._scanned_roots and hasattr(self, 'statusbar'):
+            self.statusbar.showMessage("正在扫描漫画库，完成后开始下载...")
+        self._scan_library(save_path, then=lambda: self._dispatch_download(scheduler, album_id_override))
 
-        self.download_thread = DownloadWorker(album_id, save_path, jm_option, workspace_dir=save_path)
-        self.download_thread.progress_updated.connect(self._update_progress)
-        self.download_thread.status_changed.connect(self._update_status)
-        self.download_thread.download_finished.connect(self._on_download_finished)
-        self.progress_bar.setRange(0, 0)
-        if hasattr(self, 'start_download_btn'):
-            self.start_download_btn.setEnabled(False)
-        # 成功启动后再移除队列项
-        if deque_index is not None and hasattr(self, 'download_list') and self.download_list.count() > deque_index and not album_id_override:
-            self.download_list.takeItem(deque_index)
-        self.download_thread.start()
+    def _dispatch_download(self, scheduler, album_id_override: str = ""):
+        if not scheduler.is_running():
+            # 新批次：重置批次进度
+            self._batch_done = 0
+            self._job_fractions = {}
+        if album_id_override:
+            # 立即下载：最高优先级插队，名额已满时暂停低优先级任务让位
+            scheduler.download_now(album_id_override)
+        else:
+            # 失败/已停止的条目随本批次重新排队
+            self._queue_store.requeue(('failed', 'stopped'))
+            if not self._queue_store.count('queued') and hasattr(self, 'album_id_input'):
+                typed = self.album_id_input.text().strip()
+                if typed:
+                    scheduler.enqueue(typed)
+        self._queue_model.reload()
+        if not scheduler.pending_count() and not scheduler.active_ids():
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage("请输入漫画ID")
+            return
+        self._update_batch_progress()
+        scheduler.start()
+        self._prefetch_page_counts()
 
     def _download_single(self, album_id: str):
         if not album_id:
             return
-        # 直接下载，不移除队列
+        # 直接下载：插到调度队首，与队列共享并发额度
         self._start_download(album_id_override=album_id)
 
     def _remove_queue_selected(self):
         if not hasattr(self, 'download_list'):
             return
-        for item in self.download_list.selectedItems():
-            row = self.download_list.row(item)
-            self.download_list.takeItem(row)
+        # 运行中的条目不删除，需先停止
+        ids = [self._queue_model.album_id_at(idx.row()) for idx in self.download_list.selectionModel().selectedRows()]
+        if self._queue_store.remove(ids):
+            self._queue_model.reload()
+
+    def _clear_finished_queue(self):
+        # 已完成的条目只从队列移除，不影响漫画库
+        n = self._queue_store.clear(('done',))
+        if n:
+            self._queue_model.reload()
+        if hasattr(self, 'statusbar'):
+            self.statusbar.showMessage(f"已清除 {n} 个已完成任务")
+
+    def _prioritize_queue_selected(self):
+        if not hasattr(self, 'download_list'):
+            return
+        from core.queue_store import PRIORITY_HIGH
+        ids = [self._queue_model.album_id_at(idx.row()) for idx in self.download_list.selectionModel().selectedRows()]
+        if not ids:
+            return
+        if self._scheduler is not None:
+            self._scheduler.prioritize(ids)
+        else:
+            self._queue_store.set_priority(ids, PRIORITY_HIGH)
+        self._queue_model.reload()
+
+    def _shortest_first(self) -> bool:
+        return self._settings.get_shortest_first() if hasattr(self, '_settings') else False
+
+    def _prefetch_page_counts(self):
+        # 仅在短作业优先时预取；已在库中会被跳过的专辑不请求
+        if not self._shortest_first():
+            return
+        if self._meta_worker is not None and self._meta_worker.isRunning():
+            return
+        save_path = self.download_path_input.text().strip() if hasattr(self, 'download_path_input') else ''
+        if not save_path:
+            return
+        ids = []
+        for album_id in self._queue_store.missing_pages():
+            if album_id in self._meta_attempted:
+                continue
+            if self._library_skip_reason(album_id, save_path):
+                self._queue_store.set_pages(album_id, -1)
+            else:
+                ids.append(album_id)
+        if not ids:
+            return
+        self._meta_attempted.update(ids)
+        try:
+            from core.jm_option import get_jm_option
+            option = get_jm_option(self._settings if hasattr(self, '_settings') else None)
+            if option is None:
+                return
+            from core.album_meta_worker import AlbumMetaWorker
+            retries = self._settings.get_retry_count() if hasattr(self, '_settings') else 1
+            self._meta_worker = AlbumMetaWorker(ids, option, retries=min(retries, 1))
+        except Exception:
+            return
+        self._meta_worker.meta_ready.connect(self._on_page_count_ready)
+        self._meta_worker.finished.connect(self._on_meta_worker_finished)
+        self._meta_worker.start()
+
+    def _on_page_count_ready(self, album_id: str, pages: int):
+        self._queue_store.set_pages(album_id, pages)
+
+    def _on_meta_worker_finished(self):
+        self._queue_model.reload()
+        # 预取期间新加入的排队项（每个专辑只尝试一次，失败的按页数未知排序）
+        self._prefetch_page_counts()
 
     def _stop_download(self):
-        # 尝试终止当前下载线程（尽力而为，第三方库可能阻塞）
-        if hasattr(self, 'download_thread') and self.download_thread:
+        # 协作式停止：不再派发新任务（排队项保留），运行中的线程在当前图片写完后自行退出
+        # 等待索引扫描完成的下载一并取消，扫描本身照常进行
+        self._scan_waiters = [(root, None) for root, _then in self._scan_waiters]
+        if self._scheduler is not None:
+            stopping = self._scheduler.active_ids()
             try:
-                if self.download_thread.isRunning():
-                    self.download_thread.requestInterruption()
-                    # 不推荐但作为最后手段
-                    self.download_thread.terminate()
-                    self.download_thread.wait(1000)
-                    if hasattr(self, 'statusbar'):
-                        self.statusbar.showMessage("下载已停止")
+                self._scheduler.stop()
             except Exception:
                 pass
-        if hasattr(self, 'start_download_btn'):
-            self.start_download_btn.setEnabled(True)
+            if stopping and hasattr(self, 'statusbar'):
+                self.statusbar.showMessage("正在停止下载…")
+        if hasattr(self, 'pause_download_btn'):
+            self.pause_download_btn.setText("暂停")
         if hasattr(self, 'progress_bar'):
             self.progress_bar.setRange(0, 100)
             self.progress_bar.setValue(0)
 
+    def _toggle_pause_download(self):
+        if self._scheduler is None:
+            return
+        if self._scheduler.is_paused():
+            self._scheduler.resume()
+            preempted = self._scheduler.preempted_ids()
+            for album_id in self._scheduler.active_ids():
+                if album_id not in preempted:
+                    self._queue_set_state(album_id, 'running')
+            if hasattr(self, 'pause_download_btn'):
+                self.pause_download_btn.setText("暂停")
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage("下载已继续")
+        else:
+            self._scheduler.pause()
+            for album_id in self._scheduler.active_ids():
+                self._queue_set_state(album_id, 'paused')
+            if hasattr(self, 'pause_download_btn'):
+                self.pause_download_btn.setText("继续")
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage("下载已暂停")
+
+    def _on_job_preempted(self, album_id: str):
+        self._queue_set_state(album_id, 'paused', detail="让位给优先任务")
+        if hasattr(self, 'log_output'):
+            self.log_output.append(f"漫画 {album_id} 暂停，让位给优先任务")
+
+    def _on_job_resumed(self, album_id: str):
+        self._queue_set_state(album_id, 'running')
+
+    def _on_download_skipped(self, album_id: str, message: str):
+        self._queue_set_state(album_id, 'done')
+        self._batch_done += 1
+        self._update_batch_progress()
+        if hasattr(self, 'log_output'):
+            self.log_output.append(message)
+
+    def _on_download_stopped(self, album_id: str, message: str):
+        self._job_fractions.pop(album_id, None)
+        self._queue_set_state(album_id, 'stopped')
+        if hasattr(self, 'log_output'):
+            self.log_output.append(message)
+
     def _update_progress(self, cur: int, total: int):
         if total <= 0:
             self.progress_bar.setRange(0, 0)
@@ -578,17 +1013,58 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'statusbar'):
             self.statusbar.showMessage(msg)
 
-    def _on_download_finished(self, success: bool, message: str):
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(100 if success else 0)
+    def _on_job_started(self, album_id: str):
+        self._queue_set_state(album_id, 'running')
+
+    def _on_job_progress(self, album_id: str, snap: dict):
+        from core.progress import format_bytes, format_eta
+        done = snap.get('images_done', 0)
+        total = snap.get('images_total', 0)
+        chapters = f"章节 {snap.get('chapters_done', 0)}/{snap['chapters_total']}" if snap.get('chapters_total') \
+            else f"第{snap.get('chapter', 0)}章"
+        detail = f"{done}/{total or '?'} 张 · {chapters} · {format_bytes(snap.get('speed', 0))}/s · 剩余 {format_eta(snap.get('eta', -1))}"
+        if snap.get('transcoded'):
+            detail += f" · 已转码 {snap['transcoded']}"
+        self._queue_model.set_detail(album_id, detail)
+        self._job_fractions[album_id] = (done / total) if total else 0.0
+        self._update_batch_progress()
+
+    def _update_batch_progress(self):
+        # 批次进度 = 已结束专辑 + 运行中专辑的图片完成比例
+        running = sum(self._job_fractions.values())
+        active = len(self._scheduler.active_ids()) if self._scheduler is not None else 0
+        total = max(self._batch_done + active + self._queue_store.count('queued'), 1)
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(int(min(self._batch_done + running, total) * 1000 / total))
+
+    def _on_job_status(self, album_id: str, msg: str):
         if hasattr(self, 'log_output'):
-            self.log_output.append(message)
+            self.log_output.append(f"[{album_id}] {msg}")
+
+    def _on_throughput_changed(self, text: str):
         if hasattr(self, 'statusbar'):
-            self.statusbar.showMessage(message)
+            self.statusbar.showMessage(text)
+
+    def _on_download_finished(self, album_id: str, success: bool, message: str):
+        self._queue_set_state(album_id, 'done' if success else 'failed', error='' if success else message)
+        self._job_fractions.pop(album_id, None)
+        self._batch_done += 1
+        self._update_batch_progress()
+        if hasattr(self, 'log_output'):
+            self.log_output.append(message)
         # 刷新漫画库
         self._refresh_library()
-        if hasattr(self, 'start_download_btn'):
-            self.start_download_btn.setEnabled(True)
+
+    def _on_all_downloads_finished(self, succeeded: int, failed: int):
+        pending = self._scheduler.pending_count() if self._scheduler is not None else 0
+        if pending:
+            msg = f"下载已停止：成功 {succeeded}，失败 {failed}，队列中还有 {pending} 个"
+        else:
+            msg = f"全部下载结束：成功 {succeeded}，失败 {failed}"
+        if hasattr(self, 'log_output'):
+            self.log_output.append(msg)
+        if hasattr(self, 'statusbar'):
+            self.statusbar.showMessage(msg)
 
     # ========== 设置 & 漫画库 ==========
     def _save_settings(self):
@@ -604,6 +1080,37 @@ class MainWindow(QMainWindow):
             self._settings.set_retry_count(self.retry_count_spin.value())
         if hasattr(self, 'image_format_combo'):
             self._settings.set_image_format(self.image_format_combo.currentText())
+        if hasattr(self, 'image_quality_spin'):
+            self._settings.set_image_quality(self.image_quality_spin.value())
+        if hasattr(self, 'resume_download_check'):
+            self._settings.set_resume_download(self.resume_download_check.isChecked())
+        if hasattr(self, 'output_mode_combo'):
+            self._settings.set_output_mode('cbz' if self.output_mode_combo.currentIndex() == 1 else 'folder')
+        if hasattr(self, 'dedupe_check'):
+            self._settings.set_dedupe(self.dedupe_check.isChecked())
+        if hasattr(self, 'chapter_workers_spin'):
+            self._settings.set_chapter_workers(self.chapter_workers_spin.value())
+        if hasattr(self, 'verify_decode_check'):
+            self._settings.set_verify_decode(self.verify_decode_check.isChecked())
+        if hasattr(self, 'image_threads_spin'):
+            self._settings.set_image_threads(self.image_threads_spin.value())
+        if hasattr(self, 'search_cache_ttl_spin'):
+            self._settings.set_search_cache_ttl(self.search_cache_ttl_spin.value())
+        if hasattr(self, 'search_cache_mb_spin'):
+            self._settings.set_search_cache_mb(self.search_cache_mb_spin.value())
+        self._search_cache.configure(ttl=self._settings.get_search_cache_ttl() * 60,
+                                     max_bytes=self._settings.get_search_cache_mb() * 1024 * 1024)
+        if hasattr(self, 'search_prefetch_check'):
+            self._settings.set_search_prefetch(self.search_prefetch_check.isChecked())
+        if hasattr(self, 'prefetch_covers_check'):
+            self._settings.set_prefetch_covers(self.prefetch_covers_check.isChecked())
+        if hasattr(self, 'shortest_first_check'):
+            self._settings.set_shortest_first(self.shortest_first_check.isChecked())
+            if self._scheduler is not None:
+                self._scheduler.set_shortest_first(self.shortest_first_check.isChecked())
+            self._prefetch_page_counts()
+        if hasattr(self, 'existing_policy_combo'):
+            self._settings.set_existing_policy(('skip', 'verify', 'force')[max(0, self.existing_policy_combo.currentIndex())])
         if hasattr(self, 'theme_combo'):
             self._settings.set_theme(self.theme_combo.currentText())
         if hasattr(self, 'auto_update_check'):
@@ -638,8 +1145,66 @@ class MainWindow(QMainWindow):
             self._settings.save()
         except Exception:
             pass
+        # 退出前协作式停止下载，给当前图片留出写完的时间，避免残留半截文件
+        stopped = True
+        if self._scheduler is not None:
+            try:
+                self._scheduler.stop()
+                stopped = self._scheduler.wait_all(3000)
+            except Exception:
+                stopped = False
+        # 退出时不再派发等待扫描完成的下载
+        self._scan_waiters = []
+        threads = []
+        for worker in (self._dedupe_worker, self._meta_worker, self._scan_worker):
+            if worker is not None and worker.isRunning():
+                worker.stop()
+                threads.append(worker)
+                stopped = worker.wait(3000) and stopped
+        self._cancel_prefetch()
+        self._cancel_search()
+        for worker in self._retired_prefetchers + self._retired_searches:
+            threads.append(worker)
+            stopped = worker.wait(1000) and stopped
+        if stopped:
+            self._close_stores()
+        else:
+            # 仍有线程在运行：它们的结束处理还要写队列、漫画库与搜索缓存，留到全部结束后再关闭
+            self._close_stores_when_idle(threads)
+        from core.mirror_health import mirror_health
+        mirror_health.save()
         super().closeEvent(event)
 
+    def _close_stores(self):
+        if self._stores_closed:
+            return
+        self._stores_closed = True
+        self._queue_store.close()
+        self._library_index.close()
+        self._search_cache.close()
+
+    def _close_stores_when_idle(self, threads):
+        def alive(thread) -> bool:
+            try:
+                return not thread.isFinished()
+            except RuntimeError:
+                # 结束处理中已 deleteLater
+                return False
+
+        def check(*_args):
+            if any(alive(t) for t in threads):
+                return
+            if self._scheduler is not None and self._scheduler.active_ids():
+                return
+            self._close_stores()
+        for worker in threads:
+            worker.finished.connect(check)
+        if self._scheduler is not None:
+            # 调度器在最后一个下载线程的结束处理（写队列状态）之后发出汇总
+            self._scheduler.all_finished.connect(check)
+        # 在等待期间已结束的线程不会再发出 finished
+        QTimer.singleShot(0, check)
+
     def _apply_theme(self, theme_text: str):
         try:
             from PyQt5.QtGui import QPalette, QColor
@@ -649,7 +1214,47 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
-    def _refresh_library(self):
+    def _scan_library(self, root: str, force: bool = False, then=None):
+        # 增量补录已下载索引（未变化的条目只 stat 一次），在后台线程进行；同一目录每次运行只自动扫描一次，
+        # 之后的下载由下载线程自行登记。then 在该目录补录完成（线程退出）后于界面线程调用
+        if not root:
+            return
+        if root in self._scanned_roots and not force:
+            if then is not None:
+                then()
+            return
+        self._scan_waiters.append((root, then))
+        if self._scan_worker is None:
+            self._start_next_scan()
+
+    def _start_next_scan(self):
+        from core.library_worker import LibraryScanWorker
+        root = self._scan_waiters[0][0]
+        self._scan_worker = LibraryScanWorker(self._library_index, root)
+        self._scan_worker.scan_finished.connect(self._on_scan_finished)
+        self._scan_worker.finished.connect(lambda: self._on_scan_thread_finished(root))
+        self._scan_worker.start()
+
+    def _on_scan_finished(self, root: str, changed: int, error: str):
+        if error and hasattr(self, 'statusbar'):
+            self.statusbar.showMessage(error)
+
+    def _on_scan_thread_finished(self, root: str):
+        if self._scan_worker is not None:
+            self._scan_worker.deleteLater()
+            self._scan_worker = None
+        # 扫描失败也照常派发：已下载检测只是少跳过几本，不影响下载本身
+        self._scanned_roots.add(root)
+        callbacks = [then for r, then in self._scan_waiters if r == root]
+        self._scan_waiters = [(r, then) for r, then in self._scan_waiters if r != root]
+        for then in callbacks:
+            if then is not None:
+                then()
+        if self._scan_waiters and self._scan_worker is None:
+            self._start_next_scan()
+
+    def _refresh_library(self, scan: bool = False):
+        # 只列目录；scan=True（启动、手动刷新）时同时在后台补录已下载索引
         if not hasattr(self, 'library_list'):
             return
         self.library_list.clear()
@@ -657,10 +1262,15 @@ class MainWindow(QMainWindow):
         if not root:
             return
         import os
+        if scan:
+            self._scan_library(root, force=True)
         try:
             for name in os.listdir(root):
                 p = os.path.join(root, name)
-                if os.path.isdir(p):
+                if name.startswith('.'):
+                    # 下载暂存目录等隐藏项不展示
+                    continue
+                if os.path.isdir(p) or (os.path.isfile(p) and name.lower().endswith('.cbz')):
                     self.library_list.addItem(name)
         except Exception:
             pass
@@ -675,25 +1285,29 @@ class MainWindow(QMainWindow):
         import os
         import math
         sel_path = os.path.join(root, item.text())
-        # 统计文件数与体积
-        total_files = 0
-        total_size = 0
+        if os.path.isfile(sel_path) and sel_path.lower().endswith('.cbz'):
+            self._show_cbz_entry(sel_path)
+            return
+        # 统计文件数与体积（去重后与其他专辑共享的部分单独列出）
+        from core.dedupe_store import dir_usage
+        usage = dir_usage(sel_path)
         first_image = None
         exts = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
         for r, _ds, fs in os.walk(sel_path):
-            for f in fs:
-                total_files += 1
-                fp = os.path.join(r, f)
-                try:
-                    total_size += os.path.getsize(fp)
-                except Exception:
-                    pass
-                if not first_image and os.path.splitext(f)[1].lower() in exts:
-                    first_image = fp
+            for f in sorted(fs):
+                if os.path.splitext(f)[1].lower() in exts:
+                    first_image = os.path.join(r, f)
+                    break
+            if first_image:
+                break
         # 详情
         if hasattr(self, 'details_text'):
-            mb = total_size / (1024 * 1024.0)
-            self.details_text.setPlainText(f"目录: {sel_path}\n文件数: {total_files}\n大小: {mb:.2f} MB")
+            mb = usage['bytes'] / (1024 * 1024.0)
+            text = f"目录: {sel_path}\n文件数: {usage['files']}\n大小: {mb:.2f} MB"
+            if usage['shared_bytes']:
+                shared_mb = usage['shared_bytes'] / (1024 * 1024.0)
+                text += f"\n与其他专辑共享: {shared_mb:.2f} MB（删除不会释放这部分空间）"
+            self.details_text.setPlainText(text)
         # 预览
         if hasattr(self, 'reader_image_label'):
             if first_image:
@@ -714,6 +1328,38 @@ class MainWindow(QMainWindow):
         self._reader_index = 0
         self._reader_update_page_label()
 
+    def _show_cbz_entry(self, cbz_path: str):
+        # CBZ 条目：按归档目录统计与预览，阅读器按条目名排序逐页读取
+        import zipfile
+        exts = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.avif'}
+        names = []
+        try:
+            with zipfile.ZipFile(cbz_path) as zf:
+                infos = zf.infolist()
+        except Exception:
+            infos = []
+        for info in infos:
+            if not info.is_dir() and os.path.splitext(info.filename)[1].lower() in exts:
+                names.append(info.filename)
+        # 章节序号按数值排序，避免 10 排在 2 前面
+        names.sort(key=lambda n: [(0, int(p), '') if p.isdigit() else (1, 0, p) for p in n.replace('.', '/').split('/')])
+        if hasattr(self, 'details_text'):
+            try:
+                mb = os.path.getsize(cbz_path) / (1024 * 1024.0)
+            except OSError:
+                mb = 0.0
+            self.details_text.setPlainText(f"文件: {cbz_path}\n图片数: {len(names)}\n大小: {mb:.2f} MB")
+        self._reader_files = [(cbz_path, n) for n in names]
+        if hasattr(self, 'reader_image_label'):
+            pix = self._reader_pixmap(self._reader_files[0]) if self._reader_files else QPixmap()
+            if not pix.isNull():
+                target = pix.scaled(self.reader_image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                self.reader_image_label.setPixmap(target)
+            else:
+                self.reader_image_label.setText("预览不可用" if self._reader_files else "无图片")
+        self._reader_index = 0
+        self._reader_update_page_label()
+
     def _on_library_row_changed(self, row: int):
         try:
             if row < 0 or not hasattr(self, 'library_list'):
@@ -747,13 +1393,64 @@ class MainWindow(QMainWindow):
         root = self.download_path_input.text().strip() if hasattr(self, 'download_path_input') else ''
         if not root:
             return
-        sel_path = os.path.join(root, item.text())
-        try:
-            import shutil
-            shutil.rmtree(sel_path)
-            self._refresh_library()
-        except Exception:
-            pass
+        if self._delete_worker is not None and self._delete_worker.isRunning():
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage("正在删除，请稍候")
+            return
+        # 删除目录并清理仅剩仓库引用的去重对象，均在后台线程进行
+        from core.dedupe_worker import DeleteWorker
+        self._delete_worker = DeleteWorker(root, item.text())
+        self._delete_worker.delete_finished.connect(self._on_delete_finished)
+        if hasattr(self, 'statusbar'):
+            self.statusbar.showMessage(f"正在删除: {item.text()}")
+        self._delete_worker.start()
+
+    def _on_delete_finished(self, name: str, freed: int, error: str):
+        from core.progress import format_bytes
+        if hasattr(self, 'statusbar'):
+            self.statusbar.showMessage(error or (f"已删除: {name}" + (f"，释放 {format_bytes(freed)}" if freed else "")))
+        self._refresh_library()
+
+    def _start_dedupe(self):
+        root = self.download_path_input.text().strip() if hasattr(self, 'download_path_input') else ''
+        if not root or not os.path.isdir(root):
+            if hasattr(self, 'statusbar'):
+                self.statusbar.showMessage("请先选择保存目录")
+            return
+        if self._dedupe_worker is not None and self._dedupe_worker.isRunning():
+            # 再次点击取消正在进行的去重
+            self._dedupe_worker.stop()
+            return
+        from core.dedupe_worker import DedupeWorker
+        self._dedupe_worker = DedupeWorker(root)
+        self._dedupe_worker.progress_updated.connect(self._on_dedupe_progress)
+        self._dedupe_worker.dedupe_finished.connect(self._on_dedupe_finished)
+        if hasattr(self, 'dedupe_btn'):
+            self.dedupe_btn.setText("取消去重")
+        if hasattr(self, 'statusbar'):
+            self.statusbar.showMessage("正在扫描漫画库...")
+        self._dedupe_worker.start()
+
+    def _on_dedupe_progress(self, done: int, total: int):
+        if hasattr(self, 'statusbar'):
+            self.statusbar.showMessage(f"去重中：{done}/{total} 张可能重复的图片")
+
+    def _on_dedupe_finished(self, stats: dict, error: str):
+        from core.progress import format_bytes
+        if hasattr(self, 'dedupe_btn'):
+            self.dedupe_btn.setText("去重")
+        if hasattr(self, 'statusbar'):
+            if error:
+                self.statusbar.showMessage(error)
+            elif stats.get('cancelled'):
+                self.statusbar.showMessage(f"去重已取消，已回收 {format_bytes(stats.get('bytes_reclaimed', 0))}")
+            else:
+                self.statusbar.showMessage(f"去重完成：扫描 {stats.get('scanned', 0)} 张，合并 {stats.get('linked', 0)} 张，"
+                                           f"回收 {format_bytes(stats.get('bytes_reclaimed', 0))}")
+        if self._dedupe_worker is not None:
+            self._dedupe_worker.deleteLater()
+            self._dedupe_worker = None
+        self._refresh_library()
 
     def _on_cover_loaded(self, row: int, data: bytes):
         try:
@@ -771,30 +1468,18 @@ class MainWindow(QMainWindow):
 class _CoverLoader(QThread):
     loaded = pyqtSignal(int, bytes)  # row, image bytes
 
-    def __init__(self, row: int, url: str, proxy: str = "", timeout: int = 15):
+    def __init__(self, row: int, url: str, proxy: str = "", timeout: int = 15, retries: int = 3):
         super().__init__()
         self.row = row
         self.url = url
         self.proxy = proxy
         self.timeout = timeout
+        self.retries = retries
 
     def run(self):
         try:
-            try:
-                import cloudscraper
-            except Exception:
-                self.loaded.emit(self.row, QPixmap())
-                return
-            proxies = None
-            if self.proxy and (self.proxy.startswith("http://") or self.proxy.startswith("https://")):
-                proxies = {"http": self.proxy, "https": self.proxy}
-            scraper = cloudscraper.create_scraper()
-            resp = scraper.get(self.url, timeout=self.timeout, proxies=proxies)
-            if resp.status_code != 200:
-                self.loaded.emit(self.row, QPixmap())
-                return
-            data = resp.content or b''
-            self.loaded.emit(self.row, data)
+            from core.cover_cache import fetch_cover
+            self.loaded.emit(self.row, fetch_cover(self.url, self.proxy, self.timeout, self.retries))
         except Exception:
             self.loaded.emit(self.row, b'')
 
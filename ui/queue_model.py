@@ -0,0 +1,124 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from core.queue_store import QueueStore
+
+
+class QueueListModel(QAbstractListModel):
+    """下载队列视图模型：行数据来自 QueueStore，单行状态/进度更新按 ID 定位为 O(1)"""
+    ID_ROLE = Qt.UserRole
+    STATE_ROLE = Qt.UserRole + 1
+
+    STATE_TEXT = {
+        'queued': '排队中',
+        'running': '下载中',
+        'done': '完成',
+        'failed': '失败',
+        'stopped': '已停止',
+        'paused': '已暂停',
+    }
+
+    def __init__(self, store: QueueStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._rows = []
+        self._index = {}
+        self._detail = {}
+
+    def reload(self) -> None:
+        self.beginResetModel()
+        self._rows = self.store.list_jobs()
+        self._index = {r['album_id']: i for i, r in enumerate(self._rows)}
+        self._detail = {k: v for k, v in self._detail.items() if k in self._index}
+        self.endResetModel()
+
+    @staticmethod
+    def _order(row) -> tuple:
+        # 与 QueueStore.list_jobs 的排序一致：priority 降序、seq 升序
+        return -row.get('priority', 0), row.get('seq', 0)
+
+    def _reindex(self, start: int) -> None:
+        for i in range(start, len(self._rows)):
+            self._index[self._rows[i]['album_id']] = i
+
+    def upsert(self, album_id: str) -> None:
+        """入队/重新排队后只同步这一行：按派发顺序插入或移动，不重置整个模型"""
+        rec = self.store.get(album_id)
+        if rec is None:
+            return
+        row = {k: rec[k] for k in ('album_id', 'state', 'priority', 'seq', 'pages', 'attempts', 'last_error')}
+        i = self._index.get(album_id)
+        if i is not None:
+            if self._order(self._rows[i]) == self._order(row):
+                self._rows[i] = row
+                idx = self.index(i)
+                self.dataChanged.emit(idx, idx)
+                return
+            self.beginRemoveRows(QModelIndex(), i, i)
+            del self._rows[i]
+            del self._index[album_id]
+            self.endRemoveRows()
+            self._reindex(i)
+        key = self._order(row)
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._order(self._rows[mid]) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.beginInsertRows(QModelIndex(), lo, lo)
+        self._rows.insert(lo, row)
+        self.endInsertRows()
+        self._reindex(lo)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            text = f"漫画ID: {row['album_id']}  [{self.STATE_TEXT.get(row['state'], row['state'])}]"
+            if row.get('priority', 0) > 0:
+                text = "★ " + text
+            if row.get('pages', 0) > 0 and row['state'] == 'queued':
+                text += f"  {row['pages']} 页"
+            detail = self._detail.get(row['album_id'])
+            if detail:
+                text += f"  {detail}"
+            elif row['state'] == 'failed' and row.get('last_error'):
+                text += f"  {row['last_error']}"
+            return text
+        if role == Qt.ToolTipRole:
+            return f"尝试次数: {row.get('attempts', 0)}\n{row.get('last_error') or ''}".strip()
+        if role == self.ID_ROLE:
+            return row['album_id']
+        if role == self.STATE_ROLE:
+            return row['state']
+        return None
+
+    def album_id_at(self, row: int) -> str:
+        return self._rows[row]['album_id'] if 0 <= row < len(self._rows) else ''
+
+    def set_state(self, album_id: str, state: str, detail: str = None, error: str = None) -> None:
+        i = self._index.get(album_id)
+        if i is None:
+            return
+        self._rows[i]['state'] = state
+        if error is not None:
+            self._rows[i]['last_error'] = error
+        if detail is not None:
+            self._detail[album_id] = detail
+        elif state != 'running':
+            self._detail.pop(album_id, None)
+        idx = self.index(i)
+        self.dataChanged.emit(idx, idx)
+
+    def set_detail(self, album_id: str, detail: str) -> None:
+        i = self._index.get(album_id)
+        if i is None:
+            return
+        self._detail[album_id] = detail
+        idx = self.index(i)
+        self.dataChanged.emit(idx, idx)